@@ -0,0 +1,133 @@
+"""
+Пакетная минимизация файлов автоматов Мили в пуле процессов.
+
+Для каждого входного файла (таблица в формате machine_io) в выходную папку
+пишутся минимизированная таблица <имя>.min.txt и таблица автомата Мура
+<имя>.moore.txt. Файлы пишутся через временные имена, поэтому после
+прерванного запуска готовыми считаются только полностью записанные
+результаты: при повторном запуске файл пропускается, если оба результата
+существуют и не старше входного файла.
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from equivalence import check_equivalence
+from machine_io import format_mealy_table, format_moore_table, read_mealy_table, renumbered, write_lines
+from mealy_core import IntMealy
+from minimization import minimize_int
+from moore import mealy_to_moore
+
+MINIMIZED_SUFFIX = ".min.txt"
+MOORE_SUFFIX = ".moore.txt"
+
+
+class FileResult:
+    """
+    Итог обработки одного файла.
+
+    path     - входной файл
+    status   - 'done', 'skipped' или 'failed'
+    states   - число состояний исходного и минимизированного автоматов Мили
+               и автомата Мура (None, если файл не обрабатывался)
+    seconds  - время обработки
+    error    - текст ошибки для status == 'failed'
+    """
+
+    def __init__(self, path, status, states=None, seconds=0.0, error=None):
+        self.path = path
+        self.status = status
+        self.states = states
+        self.seconds = seconds
+        self.error = error
+
+
+def output_paths(path, output_dir):
+    stem = os.path.basename(path)
+    if stem.endswith(".txt"):
+        stem = stem[:-len(".txt")]
+    base = os.path.join(output_dir, stem)
+    return base + MINIMIZED_SUFFIX, base + MOORE_SUFFIX
+
+
+def is_up_to_date(path, output_dir):
+    try:
+        source_time = os.path.getmtime(path)
+        return all(os.path.getmtime(target) >= source_time for target in output_paths(path, output_dir))
+    except OSError:
+        return False
+
+
+def collect_inputs(sources, pattern="*.txt", output_dir=None):
+    """
+    Входные файлы по списку папок (файлы по шаблону pattern), шаблонов glob
+    и путей; без повторов и без собственных результатов в output_dir.
+    """
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(glob.glob(os.path.join(source, pattern)))
+        else:
+            paths.extend(glob.glob(source) if glob.has_magic(source) else [source])
+    skip_dir = os.path.abspath(output_dir) if output_dir is not None else None
+    result = []
+    seen = set()
+    for path in sorted(paths):
+        full = os.path.abspath(path)
+        if full in seen or os.path.isdir(full):
+            continue
+        if skip_dir is not None and os.path.dirname(full) == skip_dir \
+                and path.endswith((MINIMIZED_SUFFIX, MOORE_SUFFIX)):
+            continue
+        seen.add(full)
+        result.append(path)
+    return result
+
+
+def minimize_file(path, output_dir, alphabet=None, verify=False):
+    """
+    Минимизирует один файл и пишет результаты. Выполняется в процессе пула.
+    """
+    started = time.perf_counter()
+    try:
+        mealy, alphabet = read_mealy_table(path, alphabet)
+        machine = IntMealy.from_dict(mealy, alphabet, '1')
+        min_machine, _, _, _ = minimize_int(machine)
+        if verify:
+            verification = check_equivalence(machine, min_machine)
+            if not verification.equivalent:
+                raise ValueError(f"минимизация нарушила эквивалентность: {verification.describe()}")
+        min_mealy = renumbered(min_machine.to_dict())
+        moore_states, moore_transitions, moore_initial = mealy_to_moore(min_mealy, alphabet, '1')
+        minimized_path, moore_path = output_paths(path, output_dir)
+        write_lines(minimized_path, format_mealy_table(min_mealy, alphabet))
+        write_lines(moore_path, format_moore_table(moore_states, moore_transitions, moore_initial, alphabet))
+    except (OSError, ValueError) as e:
+        return FileResult(path, 'failed', seconds=time.perf_counter() - started, error=str(e))
+    states = (machine.n_states, min_machine.n_states, len(moore_states))
+    return FileResult(path, 'done', states, time.perf_counter() - started)
+
+
+def minimize_files(paths, output_dir, alphabet=None, workers=None, force=False, verify=False):
+    """
+    Обрабатывает файлы в пуле из workers процессов (по умолчанию - по числу
+    ядер). Уже обработанные файлы пропускаются, если не задан force.
+    Результаты (FileResult) выдаются в порядке входных файлов.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    skipped = [not force and is_up_to_date(path, output_dir) for path in paths]
+    pending = [path for path, skip in zip(paths, skipped) if not skip]
+    if not pending or workers == 1:
+        for path, skip in zip(paths, skipped):
+            yield FileResult(path, 'skipped') if skip else minimize_file(path, output_dir, alphabet, verify)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Крупные порции снижают накладные расходы на передачу тысяч мелких задач
+        chunksize = max(1, len(pending) // (4 * (workers or os.cpu_count() or 1)))
+        results = pool.map(minimize_file, pending, [output_dir] * len(pending),
+                           [alphabet] * len(pending), [verify] * len(pending), chunksize=chunksize)
+        # Пропущенные файлы встают на свои места среди результатов пула
+        for path, skip in zip(paths, skipped):
+            yield FileResult(path, 'skipped') if skip else next(results)
@@ -1,11 +1,23 @@
+import argparse
+import sys
+import time
+
 import graphviz
 
+from batch import collect_inputs, minimize_files
+from equivalence import check_equivalence, check_mealy_equivalence
+from machine_store import is_binary_machine, load_any, save_machine, write_text_machine
+from mealy_core import IntMealy, state_sort_key
+from minimization import ENGINES, minimize_int
+from moore import mealy_to_moore
+from simulation import CompiledMachine, SimulationError
+
 
 # =============================================================================
 # 1. Ввод переходов автомата Мили от пользователя
 # =============================================================================
 
-def input_mealy_machine(num_states=9, input_alphabet=('a', 'b')):
+def input_mealy_machine(num_states=9, input_alphabet=('a', 'b'), state_labels=None):
     """
     Функция запрашивает у пользователя переходы автомата Мили.
     Формат ввода для каждой ячейки:
@@ -14,24 +26,27 @@ def input_mealy_machine(num_states=9, input_alphabet=('a', 'b')):
 
     Возвращает словарь вида:
         mealy[state][letter] = (destination, output)
-    где state, destination - строки, соответствующие номерам состояний.
+    где state, destination - имена состояний (по умолчанию '1'..num_states).
     """
+    if state_labels is None:
+        state_labels = [str(i) for i in range(1, num_states + 1)]
     mealy = {}
 
     print("Ввод переходов для автомата Мили.")
     print("Формат для каждой ячейки: 'dest, out' (например, '3,y')")
     print("----------------------------------------------------")
 
-    for state in range(1, num_states + 1):
-        mealy[str(state)] = {}
+    for state in state_labels:
+        mealy[state] = {}
         for letter in input_alphabet:
-            user_input = input(f"Состояние {state}, вход '{letter}': ")
-            # Разбираем строку вида "3,y"
-            user_input = user_input.strip()
-            dest_str, out_str = user_input.split(',')
-            dest_str = dest_str.strip()
-            out_str = out_str.strip()
-            mealy[str(state)][letter] = (dest_str, out_str)
+            while True:
+                user_input = input(f"Состояние {state}, вход '{letter}': ")
+                # Разбираем строку вида "3,y"
+                parts = [part.strip() for part in user_input.split(',')]
+                if len(parts) == 2 and parts[0] in state_labels and parts[1]:
+                    break
+                print(f"  Ожидается 'dest,out', где dest - одно из состояний {', '.join(state_labels)}")
+            mealy[state][letter] = (parts[0], parts[1])
 
     return mealy
 
@@ -83,33 +98,48 @@ def refine_blocks(blocks, mealy_dict, alphabet):
     return new_blocks
 
 
-def minimize_mealy(mealy_dict, alphabet):
+def minimize_mealy(mealy_dict, alphabet, method='hopcroft'):
     """
     Запускает процесс минимизации автомата Мили и возвращает:
       1) Список финальных блоков
       2) Словарь сопоставления старых состояний представителям (minimized_map)
       3) Минимизированный автомат Мили (min_mealy)
-    """
-    # Начальное разбиение
-    blocks = initial_partition(mealy_dict, alphabet)
 
-    # Итеративное уточнение
-    while True:
-        new_blocks = refine_blocks(blocks, mealy_dict, alphabet)
-        # Сравниваем старое и новое разбиение (с учётом порядка)
-        if sorted([sorted(b) for b in new_blocks]) == sorted([sorted(b) for b in blocks]):
-            break
-        blocks = new_blocks
+    method:
+      'hopcroft' - уточнение разбиения очередью расщепителей (см. minimization.py)
+      'numpy'    - векторизованные раунды уточнения на NumPy (см. minimization.py)
+      'classic'  - итеративное уточнение refine_blocks до устойчивости
+    """
+    if method in ENGINES:
+        # Минимизация на целочисленных массивах (mealy_core.IntMealy)
+        machine = IntMealy.from_dict(mealy_dict, alphabet)
+        min_machine, rep_of, int_blocks, _ = minimize_int(machine, method=method)
+        blocks = [{machine.states[i] for i in block} for block in int_blocks]
+        minimized_map = {s: min_machine.states[rep_of[i]] for i, s in enumerate(machine.states)}
+        return blocks, minimized_map, min_machine.to_dict()
+    elif method == 'classic':
+        # Начальное разбиение
+        blocks = initial_partition(mealy_dict, alphabet)
+
+        # Итеративное уточнение
+        while True:
+            new_blocks = refine_blocks(blocks, mealy_dict, alphabet)
+            # Разбиение только измельчается: одинаковое число блоков означает устойчивость
+            if len(new_blocks) == len(blocks):
+                break
+            blocks = new_blocks
+    else:
+        raise ValueError(f"Неизвестный метод минимизации: {method}")
 
     # Формируем representatives: выберем в каждом блоке "представителя" (первый по сортировке)
     minimized_map = {}
     for block in blocks:
-        rep = sorted(block, key=int)[0]  # первый по возрастанию номера
+        rep = min(block, key=state_sort_key)  # первый в естественном порядке имён
         for s in block:
             minimized_map[s] = rep
 
     # Построим сам минимизированный автомат Мили
-    minimized_states = sorted(set(minimized_map.values()), key=int)
+    minimized_states = sorted(set(minimized_map.values()), key=state_sort_key)
     min_mealy = {}
     for rep in minimized_states:
         # Берём любое состояние из блока rep
@@ -128,21 +158,21 @@ def minimize_mealy(mealy_dict, alphabet):
 # 3. Визуализация минимизированного автомата Мили
 # =============================================================================
 
-def visualize_mealy(min_mealy, alphabet, filename='minimized_mealy'):
+def visualize_mealy(min_mealy, alphabet, filename='minimized_mealy', initial='1'):
     mealy_graph = graphviz.Digraph(name='Minimized_Mealy', format='png')
     mealy_graph.attr(rankdir='LR', size='8,5')
 
     # Добавим узлы
-    for s in sorted(min_mealy.keys(), key=int):
+    for s in sorted(min_mealy.keys(), key=state_sort_key):
         mealy_graph.node(s)
 
-    # Укажем начальное состояние (предположим, это '1', если оно есть)
+    # Укажем начальное состояние
     mealy_graph.node('', shape='none')
-    if '1' in min_mealy:
-        mealy_graph.edge('', '1')
+    if initial in min_mealy:
+        mealy_graph.edge('', initial)
 
     # Рёбра
-    for s in sorted(min_mealy.keys(), key=int):
+    for s in sorted(min_mealy.keys(), key=state_sort_key):
         for letter in alphabet:
             dest, out = min_mealy[s][letter]
             mealy_graph.edge(s, dest, label=f"{letter} / {out}")
@@ -155,68 +185,17 @@ def visualize_mealy(min_mealy, alphabet, filename='minimized_mealy'):
 # 4. Преобразование минимизированного автомата Мили в автомат Мура
 # =============================================================================
 
-def build_moore(min_mealy, alphabet):
+def build_moore(min_mealy, alphabet, initial='1'):
     """
-    Преобразуем минимизированный автомат Мили в автомат Мура по стандартному алгоритму:
-    - Для каждого состояния s в min_mealy собираем множество выходов, с которыми s может быть достигнуто
-      (это делается путём обхода всех переходов).
+    Преобразуем минимизированный автомат Мили в автомат Мура по стандартному алгоритму
+    (см. moore.py):
+    - Для каждого состояния s в min_mealy собираем множество выходов, с которыми s может быть достигнуто.
     - Создаём копии (s, reaction) для каждой возможной реакции.
     - Строим переходы: если из q по letter переходим в (p, out), то в автомате Мура
       (q, r) --letter--> (p, out).
-    - Для задачи по условию добавим поправки:
-        * Если q == '3' и вход == 'a', реакция принудительно 'x'
-        * Если q == '5' и вход == 'b', реакция принудительно 'y'
+    Начальное состояние автомата Мура - копия initial (начального состояния автомата Мили).
     """
-
-    # 1) Собираем все реакции, с которыми состояния достигаются
-    moore_reactions = {s: set() for s in min_mealy}
-    for s in min_mealy:
-        # Смотрим, куда ведут переходы
-        for letter in alphabet:
-            dest, out = min_mealy[s][letter]
-            moore_reactions[dest].add(out)
-
-    # Если какое-то состояние вообще не достигается (нет входящих),
-    # добавим ему произвольный выход (например, 'x'), чтобы не остаться без реакций
-    for s in min_mealy:
-        if not moore_reactions[s]:
-            moore_reactions[s].add('x')
-
-    # 2) Создаём копии (s, reaction)
-    def get_moore_name(state, reaction):
-        return f"{state},{reaction}"
-
-    moore_states = {}
-    for s in min_mealy:
-        for reaction in moore_reactions[s]:
-            moore_states[(s, reaction)] = get_moore_name(s, reaction)
-
-    # 3) Формируем переходы автомата Мура
-    moore_transitions = {}
-    for (q, r) in moore_states:
-        current_name = moore_states[(q, r)]
-        moore_transitions[current_name] = {}
-        for letter in alphabet:
-            dest, out = min_mealy[q][letter]
-            # Внесём заданные поправки
-            if q == '3' and letter == 'a':
-                out = 'x'
-            if q == '5' and letter == 'b':
-                out = 'y'
-            target_name = moore_states[(dest, out)]
-            moore_transitions[current_name][letter] = target_name
-
-    # Начальное состояние автомата Мура (предположим, что исходное состояние было '1')
-    # По условию, если '1' имеет реакцию 'x', то это (1,x) будет начальным
-    # Если вдруг у '1' несколько реакций, выберем одну "x" при наличии, иначе любую.
-    possible_reactions = sorted(list(moore_reactions['1']))
-    if 'x' in possible_reactions:
-        moore_initial = moore_states[('1', 'x')]
-    else:
-        # Берём первую доступную реакцию (чтобы не падать с ошибкой)
-        moore_initial = moore_states[('1', possible_reactions[0])]
-
-    return moore_states, moore_transitions, moore_initial
+    return mealy_to_moore(min_mealy, alphabet, initial)
 
 
 def visualize_moore(moore_states, moore_transitions, moore_initial, filename='moore'):
@@ -247,47 +226,270 @@ def visualize_moore(moore_states, moore_transitions, moore_initial, filename='mo
     print(f"Автомат Мура сохранён в файл: {filename}.png")
 
 
+# =============================================================================
+# Потоковый режим: автомат как фильтр входного потока
+# =============================================================================
+
+# Размер читаемого фрагмента входа (символов)
+STREAM_CHUNK_SIZE = 1 << 20
+
+
+def stream_transduce(simulator, source, sink, chunk_size=STREAM_CHUNK_SIZE, ignore="\r\n", separator=""):
+    """
+    Прогоняет входной поток source через скомпилированный автомат
+    (simulation.CompiledMachine) фрагментами по chunk_size символов и пишет
+    реакции в sink по мере обработки. Символы из ignore пропускаются.
+    Память не зависит от длины входа.
+
+    Возвращает (число обработанных символов, имя конечного состояния).
+    """
+    drop = str.maketrans("", "", ignore)
+    state = None
+    processed = 0
+    first = True
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        chunk = chunk.translate(drop)
+        if not chunk:
+            continue
+        try:
+            outputs, state = simulator.feed(chunk, state, separator)
+        except SimulationError as e:
+            # Позиция считается по всему потоку (без пропускаемых символов)
+            position = processed + e.position
+            raise SimulationError(f"Символ '{chunk[e.position]}' (позиция {position + 1}) "
+                                  f"не входит в алфавит {simulator.alphabet}", position) from None
+        if separator and not first:
+            sink.write(separator)
+        sink.write(outputs)
+        first = False
+        processed += len(chunk)
+    final = simulator.initial if state is None else state
+    return processed, simulator.states[final]
+
+
+def run_stream(args):
+    machine = load_any(args.machine, args.alphabet)
+    if args.initial is not None:
+        try:
+            machine.initial = machine.state_index(args.initial)
+        except KeyError:
+            raise ValueError(f"Неизвестное начальное состояние {args.initial}") from None
+    if args.minimize:
+        original = machine
+        machine, _, _, _ = minimize_int(machine)
+        if args.verify:
+            verification = check_equivalence(original, machine)
+            print(f"Проверка эквивалентности: {verification.describe()}", file=sys.stderr)
+            if not verification.equivalent:
+                return 1
+    simulator = CompiledMachine.from_int_mealy(machine)
+
+    source = open(args.input, 'r', encoding='utf-8') if args.input != '-' else sys.stdin
+    sink = open(args.output, 'w', encoding='utf-8') if args.output != '-' else sys.stdout
+    started = time.perf_counter()
+    try:
+        processed, final_state = stream_transduce(simulator, source, sink, args.chunk_size,
+                                                  args.ignore, args.separator)
+    except SimulationError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        else:
+            sink.flush()
+    elapsed = time.perf_counter() - started
+    speed = processed / elapsed if elapsed > 0 else float('inf')
+    print(f"Обработано символов: {processed} за {elapsed:.3f} с ({speed:.0f} символов/с), "
+          f"состояний автомата: {machine.n_states}, конечное состояние: {final_state}", file=sys.stderr)
+    return 0
+
+
+# =============================================================================
+# Конвертация между текстовым и двоичным форматами
+# =============================================================================
+
+def run_convert(args):
+    binary_source = is_binary_machine(args.source)
+    to_binary = not binary_source if args.to is None else args.to == "binary"
+    started = time.perf_counter()
+    machine = load_any(args.source, args.alphabet)
+    if to_binary:
+        save_machine(args.target, machine)
+    else:
+        write_text_machine(args.target, machine)
+    print(f"{args.source} -> {args.target}: {machine.n_states} сост., {machine.n_symbols} симв., "
+          f"{time.perf_counter() - started:.2f} с", file=sys.stderr)
+    return 0
+
+
+# =============================================================================
+# Пакетный режим: минимизация множества файлов
+# =============================================================================
+
+def run_batch(args):
+    paths = collect_inputs(args.inputs, args.pattern, args.output_dir)
+    if not paths:
+        print("Не найдено ни одного файла автомата", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    counts = {'done': 0, 'skipped': 0, 'failed': 0}
+    for result in minimize_files(paths, args.output_dir, args.alphabet, args.jobs, args.force, args.verify):
+        counts[result.status] += 1
+        if result.status == 'done':
+            states, minimized, moore = result.states
+            print(f"{result.path}: {states} -> {minimized} сост., Мура: {moore} сост., {result.seconds:.3f} с")
+        elif result.status == 'skipped':
+            print(f"{result.path}: пропущен (результаты актуальны)")
+        else:
+            print(f"{result.path}: ошибка: {result.error}", file=sys.stderr)
+    elapsed = time.perf_counter() - started
+    print(f"Файлов: {len(paths)}, обработано: {counts['done']}, пропущено: {counts['skipped']}, "
+          f"ошибок: {counts['failed']}; время: {elapsed:.2f} с", file=sys.stderr)
+    return 1 if counts['failed'] else 0
+
+
 # =============================================================================
 # Основная логика
 # =============================================================================
 
-if __name__ == "__main__":
+def run_interactive(verify=False, num_states=9, alphabet=('a', 'b'), state_labels=None, initial=None):
+    if state_labels is None:
+        state_labels = [str(i) for i in range(1, num_states + 1)]
+    if initial is None:
+        initial = state_labels[0]
+
     # Шаг 1. Считываем переходы автомата Мили от пользователя
-    mealy = input_mealy_machine(num_states=9, input_alphabet=('a', 'b'))
+    mealy = input_mealy_machine(input_alphabet=alphabet, state_labels=state_labels)
 
     # Шаг 2. Минимизируем
-    blocks, minimized_map, min_mealy = minimize_mealy(mealy, ('a', 'b'))
+    blocks, minimized_map, min_mealy = minimize_mealy(mealy, alphabet)
+    min_initial = minimized_map[initial]
+
+    # Необязательная проверка: минимизированный автомат эквивалентен исходному
+    if verify:
+        verification = check_mealy_equivalence(mealy, min_mealy, alphabet, initial, min_initial)
+        print(f"\nПроверка эквивалентности: {verification.describe()}")
 
     # Выводим результат разбиения
     print("\nФинальное разбиение:")
     for i, block in enumerate(blocks):
-        print(f"  Block {i}: {sorted(block, key=int)}")
+        print(f"  Block {i}: {sorted(block, key=state_sort_key)}")
     print("\nОтображение старых состояний в представителей:")
-    for s in sorted(minimized_map.keys(), key=int):
+    for s in sorted(minimized_map.keys(), key=state_sort_key):
         print(f"  {s} -> {minimized_map[s]}")
 
     # Печатаем минимизированный автомат
-    print("\nМинимизированный автомат Мили (нормализованный):")
-    print("State\t a\t b")
-    for s in sorted(min_mealy.keys(), key=int):
-        da, oa = min_mealy[s]['a']
-        db, ob = min_mealy[s]['b']
-        print(f"  {s}\t {da}/{oa}\t {db}/{ob}")
+    print(f"\nМинимизированный автомат Мили (нормализованный), начальное состояние {min_initial}:")
+    print("State\t " + "\t ".join(alphabet))
+    for s in sorted(min_mealy.keys(), key=state_sort_key):
+        print(f"  {s}\t " + "\t ".join(f"{min_mealy[s][letter][0]}/{min_mealy[s][letter][1]}" for letter in alphabet))
 
     # Визуализируем минимизированный автомат Мили
-    visualize_mealy(min_mealy, ('a', 'b'), filename='minimized_mealy_user_input')
+    visualize_mealy(min_mealy, alphabet, filename='minimized_mealy_user_input', initial=min_initial)
 
     # Шаг 3. Строим автомат Мура
-    moore_states, moore_transitions, moore_initial = build_moore(min_mealy, ('a', 'b'))
+    moore_states, moore_transitions, moore_initial = build_moore(min_mealy, alphabet, min_initial)
 
     # Печатаем переходы автомата Мура
     print("\nПереходы автомата Мура:")
     for s in sorted(moore_transitions.keys()):
         row = []
-        for letter in ('a', 'b'):
+        for letter in alphabet:
             row.append(f"{letter} -> {moore_transitions[s][letter]}")
         print(f"  {s}: " + ",  ".join(row))
     print(f"Начальное состояние автомата Мура: {moore_initial}")
 
     # Визуализируем автомат Мура
     visualize_moore(moore_states, moore_transitions, moore_initial, filename='moore_user_input')
+
+
+def _names(text):
+    # Список имён из строки: через запятую или, если запятых нет, по одному символу
+    return [name.strip() for name in text.split(',') if name.strip()] if ',' in text else list(text)
+
+
+def _alphabet(text):
+    # Входной алфавит из аргумента командной строки: 'ab' или 'x1,x2'
+    return tuple(_names(text))
+
+
+def main(argv=None):
+    # --verify допускается и до команды, и после неё; значение по умолчанию
+    # подставляется после разбора, иначе команда затирала бы его своим False
+    verify = argparse.ArgumentParser(add_help=False)
+    verify.add_argument("--verify", action="store_true", default=argparse.SUPPRESS,
+                        help="проверить эквивалентность исходного и минимизированного автоматов "
+                             "(stream - вместе с --minimize)")
+    parser = argparse.ArgumentParser(
+        parents=[verify],
+        description="Минимизация автомата Мили и построение автомата Мура. "
+                    "Без команды - интерактивный ввод таблицы (по умолчанию 9x2).")
+    parser.add_argument("--states", default="9",
+                        help="интерактивный ввод: число состояний (имена 1..N) или имена через запятую")
+    parser.add_argument("--symbols", default="ab",
+                        help="интерактивный ввод: входные символы (строка символов или через запятую)")
+    parser.add_argument("--start", default=None, help="интерактивный ввод: начальное состояние")
+    commands = parser.add_subparsers(dest="command")
+
+    stream = commands.add_parser("stream", parents=[verify], help="прогнать поток символов через автомат из файла")
+    stream.add_argument("machine", help="файл автомата: таблица 'dest,out;dest,out' или двоичный (convert)")
+    stream.add_argument("input", nargs="?", default="-", help="входной файл (по умолчанию stdin)")
+    stream.add_argument("-o", "--output", default="-", help="выходной файл (по умолчанию stdout)")
+    stream.add_argument("--alphabet", type=_alphabet, default=None,
+                        help="входной алфавит по столбцам таблицы: строка символов или через запятую "
+                             "(по умолчанию a, b, ...)")
+    stream.add_argument("--initial", default=None, help="начальное состояние (по умолчанию 1)")
+    stream.add_argument("--minimize", action="store_true", help="минимизировать автомат перед прогоном")
+    stream.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE,
+                        help="размер читаемого фрагмента, символов")
+    stream.add_argument("--ignore", default="\r\n", help="пропускаемые символы входа (по умолчанию переводы строк)")
+    stream.add_argument("--separator", default="", help="разделитель реакций в выходном потоке")
+    stream.set_defaults(handler=run_stream)
+
+    convert = commands.add_parser("convert", help="преобразовать таблицу автомата между текстовым и двоичным форматами")
+    convert.add_argument("source", help="исходный файл (текстовый или двоичный)")
+    convert.add_argument("target", help="файл результата")
+    convert.add_argument("--to", choices=("binary", "text"), default=None,
+                         help="формат результата (по умолчанию противоположный исходному)")
+    convert.add_argument("--alphabet", type=_alphabet, default=None,
+                         help="входной алфавит по столбцам текстовой таблицы: строка символов или через запятую "
+                              "(по умолчанию a, b, ...)")
+    convert.set_defaults(handler=run_convert)
+
+    batch = commands.add_parser("batch", parents=[verify], help="минимизировать файлы автоматов в пуле процессов")
+    batch.add_argument("inputs", nargs="+", help="папки, шаблоны (например, 'machines/*.txt') или файлы")
+    batch.add_argument("-o", "--output-dir", default="minimized",
+                       help="папка для результатов <имя>.min.txt и <имя>.moore.txt")
+    batch.add_argument("--pattern", default="*.txt", help="шаблон имён файлов в папках (по умолчанию *.txt)")
+    batch.add_argument("--alphabet", type=_alphabet, default=None,
+                       help="входной алфавит по столбцам таблиц: строка символов или через запятую "
+                            "(по умолчанию a, b, ...)")
+    batch.add_argument("-j", "--jobs", type=int, default=None, help="число процессов (по умолчанию по числу ядер)")
+    batch.add_argument("--force", action="store_true", help="обработать и файлы с актуальными результатами")
+    batch.set_defaults(handler=run_batch)
+
+    args = parser.parse_args(argv)
+    args.verify = getattr(args, "verify", False)
+    if args.command is None:
+        state_labels = [str(i) for i in range(1, int(args.states) + 1)] if args.states.isdigit() \
+            else _names(args.states)
+        if args.start is not None and args.start not in state_labels:
+            parser.error(f"начальное состояние {args.start} не входит в число состояний")
+        run_interactive(args.verify, alphabet=tuple(_names(args.symbols)), state_labels=state_labels,
+                        initial=args.start)
+        return 0
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Проверка эквивалентности двух автоматов Мили (алгоритм Хопкрофта–Карпа).
+
+Состояния обоих автоматов - вершины одной системы непересекающихся
+множеств. Из пары начальных состояний обходом в ширину по парам
+(p, q) объединяются множества p и q, и для каждой новой пары
+сравниваются реакции на все входные символы. Пара, чьи состояния уже
+в одном множестве, повторно не рассматривается, поэтому обход делает
+не больше (n1 + n2 - 1) объединений, а вся проверка выполняется
+за O((n1 + n2) * k * α(n1 + n2)) без перебора входных слов.
+
+Обход в ширину даёт кратчайшее различающее слово: если пара на кратчайшем
+пути пропущена как уже объединённая, то реакции расходятся у одной из пар
+цепочки, связавшей её состояния, а все они добавлены в очередь не позже.
+"""
+
+from array import array
+
+from mealy_core import IntMealy
+
+
+class EquivalenceResult:
+    """
+    Результат проверки эквивалентности.
+
+    equivalent    - True, если автоматы эквивалентны
+    word          - кратчайшее различающее входное слово (список символов) или None
+    first_output  - реакции первого автомата на word (список) или None
+    second_output - реакции второго автомата на word (список) или None
+    checked       - число рассмотренных пар состояний
+    """
+
+    def __init__(self, equivalent, word=None, first_output=None, second_output=None, checked=0):
+        self.equivalent = equivalent
+        self.word = word
+        self.first_output = first_output
+        self.second_output = second_output
+        self.checked = checked
+
+    def describe(self, separator=''):
+        if self.equivalent:
+            return f"автоматы эквивалентны (проверено пар состояний: {self.checked})"
+        return (f"автоматы НЕ эквивалентны: различающее слово '{separator.join(self.word)}', "
+                f"реакции '{separator.join(self.first_output)}' и '{separator.join(self.second_output)}'")
+
+
+def _find(parent, x):
+    # Поиск корня со сжатием пути делением пополам
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+def check_equivalence(first, second):
+    """
+    Проверяет эквивалентность автоматов IntMealy first и second из их
+    начальных состояний. Входные алфавиты должны совпадать как множества,
+    реакции сравниваются по именам.
+
+    Возвращает EquivalenceResult.
+    """
+    if set(first.alphabet) != set(second.alphabet):
+        raise ValueError("У автоматов разные входные алфавиты")
+    k = first.n_symbols
+    n1 = first.n_states
+    # Столбцы второго автомата в порядке символов первого
+    column = [second.symbol_index(letter) for letter in first.alphabet]
+    # Общая нумерация реакций: реакции второго переводятся в номера первого
+    output_index = {name: o for o, name in enumerate(first.outputs)}
+    common = list(first.outputs)
+    second_out = array('i')
+    for name in second.outputs:
+        o = output_index.get(name)
+        if o is None:
+            o = output_index[name] = len(common)
+            common.append(name)
+        second_out.append(o)
+
+    parent = array('i', range(n1 + second.n_states))
+    # Очередь пар и для восстановления слова - пара-предок и символ перехода
+    queue_p = array('i', [first.initial])
+    queue_q = array('i', [second.initial])
+    came_from = array('i', [-1])
+    via = array('i', [-1])
+    parent[n1 + second.initial] = first.initial
+
+    head = 0
+    while head < len(queue_p):
+        p, q = queue_p[head], queue_q[head]
+        p_row, q_row = p * k, q * len(column)
+        for a in range(k):
+            b = column[a]
+            if first.out[p_row + a] != second_out[second.out[q_row + b]]:
+                word = []
+                pair = head
+                while pair > 0:
+                    word.append(first.alphabet[via[pair]])
+                    pair = came_from[pair]
+                word.reverse()
+                word.append(first.alphabet[a])
+                return EquivalenceResult(False, word, _outputs(first, word), _outputs(second, word), head + 1)
+            x = _find(parent, first.delta[p_row + a])
+            y = _find(parent, n1 + second.delta[q_row + b])
+            if x != y:
+                parent[y] = x
+                queue_p.append(first.delta[p_row + a])
+                queue_q.append(second.delta[q_row + b])
+                came_from.append(head)
+                via.append(a)
+        head += 1
+    return EquivalenceResult(True, checked=head)
+
+
+def _outputs(machine, word):
+    s = machine.initial
+    result = []
+    for letter in word:
+        a = machine.symbol_index(letter)
+        result.append(machine.outputs[machine.output(s, a)])
+        s = machine.successor(s, a)
+    return result
+
+
+def check_mealy_equivalence(first, second, alphabet, first_initial=None, second_initial=None):
+    """
+    То же для автоматов в словарном формате mealy[state][letter] = (dest, out).
+    Начальные состояния по умолчанию - '1', если есть, иначе первые по порядку.
+    """
+    if first_initial is None and '1' in first:
+        first_initial = '1'
+    if second_initial is None and '1' in second:
+        second_initial = '1'
+    return check_equivalence(IntMealy.from_dict(first, alphabet, first_initial),
+                             IntMealy.from_dict(second, alphabet, second_initial))
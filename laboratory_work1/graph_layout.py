@@ -0,0 +1,157 @@
+"""
+Подготовка графов автоматов к отрисовке в graphviz.
+
+Для больших автоматов граф упрощается:
+  - параллельные рёбра (одна пара вершин) сливаются в одно с общей подписью;
+  - группы состояний (компоненты сильной связности автомата Мили или копии
+    одного состояния Мили в автомате Мура) можно свернуть в сводные вершины,
+    а выбранные группы - развернуть обратно;
+  - начиная с LARGE_GRAPH_THRESHOLD вершин раскладка выполняется
+    программой sfdp вместо dot.
+
+Группы считаются по минимальному автомату Мили, а вершина автомата Мура
+(q, r) попадает в группу состояния q, поэтому номера групп в обоих графах
+совпадают.
+"""
+
+from mealy_core import state_sort_key
+
+# Число вершин, начиная с которого используется быстрая раскладка sfdp
+LARGE_GRAPH_THRESHOLD = 300
+
+# Способы свёртки: None - без свёртки, 'scc' - компоненты сильной связности,
+# 'state' - копии одного состояния Мили (имеет смысл для автомата Мура)
+COLLAPSE_MODES = (None, 'scc', 'state')
+
+
+def layout_engine(node_count):
+    return 'sfdp' if node_count >= LARGE_GRAPH_THRESHOLD else 'dot'
+
+
+def strongly_connected_components(nodes, successors):
+    """
+    Компоненты сильной связности (алгоритм Тарьяна без рекурсии).
+    successors[v] - список преемников вершины v.
+
+    Возвращает словарь {вершина: номер компоненты}; компоненты нумеруются
+    в порядке первого появления их вершин в nodes.
+    """
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    component = {}
+    raw = 0
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors[root]))]
+        while work:
+            v, it = work[-1]
+            for w in it:
+                if w not in index:
+                    index[w] = low[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(successors[w])))
+                    break
+                if w in on_stack:
+                    low[v] = min(low[v], index[w])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] == index[v]:
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        component[w] = raw
+                        if w == v:
+                            break
+                    raw += 1
+    # Перенумерация в порядке появления вершин
+    renumber = {}
+    for v in nodes:
+        renumber.setdefault(component[v], len(renumber))
+    return {v: renumber[component[v]] for v in nodes}
+
+
+def mealy_groups(min_mealy, alphabet, collapse):
+    """
+    Группа каждого состояния автомата Мили для выбранного способа свёртки:
+    словарь {состояние: имя группы} или None, если свёртка не нужна.
+    """
+    if collapse is None:
+        return None
+    if collapse == 'state':
+        return {s: s for s in min_mealy}
+    if collapse == 'scc':
+        states = sorted(min_mealy, key=state_sort_key)
+        successors = {s: [min_mealy[s][letter][0] for letter in alphabet] for s in states}
+        component = strongly_connected_components(states, successors)
+        return {s: f"К{c + 1}" for s, c in component.items()}
+    raise ValueError(f"Неизвестный способ свёртки: {collapse}")
+
+
+def group_sizes(group_of):
+    """
+    Размеры групп в порядке их первого появления.
+    """
+    sizes = {}
+    for g in group_of.values():
+        sizes[g] = sizes.get(g, 0) + 1
+    return sizes
+
+
+def simplify_graph(nodes, edges, group_of=None, expanded=(), separator=", "):
+    """
+    Сливает параллельные рёбра и сворачивает группы вершин.
+
+    nodes    - вершины в порядке вывода
+    edges    - рёбра (откуда, куда, подпись)
+    group_of - {вершина: группа} или None; группы из одной вершины
+               и группы из expanded не сворачиваются
+
+    Возвращает (вершины, рёбра, node_id): вершины - список (id, подпись, размер),
+    где подпись None у обычной вершины, размер - число свёрнутых в неё вершин;
+    рёбра - список (откуда, куда, подпись) без повторяющихся пар вершин;
+    node_id - вершина итогового графа для каждой исходной.
+    Рёбра внутри свёрнутой группы не выводятся.
+    """
+    node_id = {v: v for v in nodes}
+    result_nodes = []
+    if group_of is not None:
+        sizes = group_sizes(group_of)
+        # Префикс id сводных вершин, с которого не начинается ни одно имя состояния
+        prefix = "group_"
+        while any(v.startswith(prefix) for v in nodes):
+            prefix = "_" + prefix
+        expanded = set(expanded)
+        emitted = set()
+        for v in nodes:
+            g = group_of[v]
+            if sizes[g] > 1 and g not in expanded:
+                # Без ':' - graphviz читает 'a:b' в ребре как вершину a с портом b
+                node_id[v] = f"{prefix}{g}"
+                if g not in emitted:
+                    emitted.add(g)
+                    result_nodes.append((node_id[v], f"{g}\n({sizes[g]} сост.)", sizes[g]))
+            else:
+                result_nodes.append((v, None, 1))
+    else:
+        result_nodes = [(v, None, 1) for v in nodes]
+
+    merged = {}
+    for src, dst, label in edges:
+        a, b = node_id[src], node_id[dst]
+        if a == b and a != src:
+            continue
+        labels = merged.setdefault((a, b), [])
+        if label not in labels:
+            labels.append(label)
+    result_edges = [(a, b, separator.join(labels)) for (a, b), labels in merged.items()]
+    return result_nodes, result_edges, node_id
@@ -1,16 +1,32 @@
 import sys
 import os
-import uuid
 import json
 import shutil
 import random
+import re
+import time
 from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtGui import QPixmap, QColor, QFont, QIcon
 from PyQt5.QtCore import QPropertyAnimation
 import graphviz
 
-# Создаём папку data, если её ещё нет
-os.makedirs("data", exist_ok=True)
+try:
+    from PyQt5 import QtSvg
+except ImportError:  # без QtSvg графы показываются как PNG по размеру области
+    QtSvg = None
+
+from equivalence import check_mealy_equivalence
+from mealy_core import IntMealy, state_sort_key
+from minimization import ENGINES, IncrementalMinimizer, minimize_int
+from moore import mealy_to_moore
+from graph_layout import COLLAPSE_MODES, group_sizes, layout_engine, mealy_groups, simplify_graph
+from render_cache import RenderCache
+from simulation import CompiledMachine, SimulationError
+from machine_io import default_alphabet
+from table_model import MealyTableModel
+
+# Кэш отрисованных графов в папке data (создаёт папку, если её ещё нет)
+RENDER_CACHE = RenderCache("data")
 
 
 # =============================================================================
@@ -48,22 +64,41 @@ def refine_blocks(blocks, mealy_dict, alphabet):
     return new_blocks
 
 
-def minimize_mealy(mealy_dict, alphabet):
-    blocks = initial_partition(mealy_dict, alphabet)
-    iteration_info = []
-    iteration_info.append([sorted(list(b), key=int) for b in blocks])
-    while True:
-        new_blocks = refine_blocks(blocks, mealy_dict, alphabet)
-        iteration_info.append([sorted(list(b), key=int) for b in new_blocks])
-        if sorted([sorted(b) for b in new_blocks]) == sorted([sorted(b) for b in blocks]):
-            break
-        blocks = new_blocks
+# Наибольшее число состояний, для которого сохраняются промежуточные разбиения (пошаговый режим)
+ITERATION_RECORD_LIMIT = 500
+
+
+def minimize_mealy(mealy_dict, alphabet, method="hopcroft", record_iterations=True):
+    # method: "hopcroft" - очередь расщепителей, "numpy" - векторизованные раунды (minimization.py),
+    # "classic" - раунды refine_blocks на словарях
+    if method in ENGINES:
+        # Минимизация на целочисленных массивах (mealy_core.IntMealy)
+        machine = IntMealy.from_dict(mealy_dict, alphabet)
+        min_machine, rep_of, int_blocks, iteration_info = minimize_int(machine, record_iterations, method)
+        blocks = [{machine.states[i] for i in block} for block in int_blocks]
+        minimized_map = {s: min_machine.states[rep_of[i]] for i, s in enumerate(machine.states)}
+        return blocks, minimized_map, min_machine.to_dict(), iteration_info
+    elif method == "classic":
+        blocks = initial_partition(mealy_dict, alphabet)
+        iteration_info = []
+        if record_iterations:
+            iteration_info.append([sorted(list(b), key=state_sort_key) for b in blocks])
+        while True:
+            new_blocks = refine_blocks(blocks, mealy_dict, alphabet)
+            if record_iterations:
+                iteration_info.append([sorted(list(b), key=state_sort_key) for b in new_blocks])
+            # Разбиение только измельчается, поэтому совпадение числа блоков означает устойчивость
+            if len(new_blocks) == len(blocks):
+                break
+            blocks = new_blocks
+    else:
+        raise ValueError(f"Неизвестный метод минимизации: {method}")
     minimized_map = {}
     for block in blocks:
-        rep = sorted(block, key=int)[0]
+        rep = min(block, key=state_sort_key)
         for s in block:
             minimized_map[s] = rep
-    minimized_states = sorted(set(minimized_map.values()), key=int)
+    minimized_states = sorted(set(minimized_map.values()), key=state_sort_key)
     min_mealy = {}
     for rep in minimized_states:
         s_candidate = rep
@@ -75,111 +110,391 @@ def minimize_mealy(mealy_dict, alphabet):
     return blocks, minimized_map, min_mealy, iteration_info
 
 
-def build_moore(min_mealy, alphabet):
-    # Собираем реакции для каждого состояния (выходы, с которыми это состояние может быть достигнуто)
-    moore_reactions = {s: set() for s in min_mealy}
-    for s in min_mealy:
-        for letter in alphabet:
-            dest, out = min_mealy[s][letter]
-            moore_reactions[dest].add(out)
-    # Если для какого-либо состояния не заданы входящие реакции, добавляем произвольный выход 'x'
-    for s in min_mealy:
-        if not moore_reactions[s]:
-            moore_reactions[s].add('x')
-
-    def get_moore_name(state, reaction):
-        return f"{state},{reaction}"
-
-    # Создаём уникальные копии состояний автомата Мура вида (state, reaction)
-    moore_states = {}
-    for s in min_mealy:
-        for reaction in moore_reactions[s]:
-            moore_states[(s, reaction)] = get_moore_name(s, reaction)
-
-    # Формируем таблицу переходов автомата Мура:
-    # для каждого перехода из состояния q по символу letter переходим в состояние (dest, out),
-    # где out берётся непосредственно из перехода автомата Мили
-    moore_transitions = {}
-    for (q, r) in moore_states:
-        current_name = moore_states[(q, r)]
-        moore_transitions[current_name] = {}
-        for letter in alphabet:
-            dest, out = min_mealy[q][letter]
-            target_name = moore_states[(dest, out)]
-            moore_transitions[current_name][letter] = target_name
-
-    # Определяем начальное состояние автомата Мура
-    possible_reactions = sorted(list(moore_reactions['1']))
-    if 'x' in possible_reactions:
-        moore_initial = moore_states[('1', 'x')]
-    else:
-        moore_initial = moore_states[('1', possible_reactions[0])]
+def minimize_mealy_incremental(mealy_dict, alphabet, minimizer):
+    # Повторная минимизация после правки таблицы (minimization.IncrementalMinimizer):
+    # пересчитываются только состояния, из которых достижимы изменённые строки.
+    # Промежуточных раундов нет, поэтому iteration_info - одно итоговое разбиение.
+    machine = IntMealy.from_dict(mealy_dict, alphabet)
+    min_machine, rep_of, int_blocks, _ = minimizer.update(machine)
+    blocks = [{machine.states[i] for i in block} for block in int_blocks]
+    minimized_map = {s: min_machine.states[rep_of[i]] for i, s in enumerate(machine.states)}
+    iteration_info = [[sorted(b, key=state_sort_key) for b in blocks]]
+    return blocks, minimized_map, min_machine.to_dict(), iteration_info
+
+
+def default_initial(mealy):
+    # Начальное состояние по умолчанию: '1', если оно есть, иначе первое в естественном порядке
+    return '1' if '1' in mealy else min(mealy, key=state_sort_key)
 
-    return moore_states, moore_transitions, moore_initial
+
+def build_moore(min_mealy, alphabet, initial=None):
+    # Копии состояний (state, reaction) по реакциям входящих переходов (moore.mealy_to_moore);
+    # initial - начальное состояние минимизированного автомата Мили
+    if initial is None:
+        initial = default_initial(min_mealy)
+    return mealy_to_moore(min_mealy, alphabet, initial)
 
 
 # =============================================================================
 # Функции визуализации
 # =============================================================================
 
-def visualize_mealy(min_mealy, alphabet, filename='minimized_mealy'):
-    unique_id = str(uuid.uuid4())
-    full_filename = os.path.join("data", f"{filename}_{unique_id}")
-    mealy_graph = graphviz.Digraph(name='Minimized_Mealy', format='png')
-    mealy_graph.attr(dpi="1200")
+# Разрешение для экспорта; для показа в окне dpi подбирается по размеру области
+EXPORT_DPI = 1200
+# Наибольший размер графа в дюймах (атрибут size), по нему считается dpi
+GRAPH_SIZE = (9, 5)
+
+
+def _apply_layout(graph, node_count):
+    # Для больших графов - быстрая силовая раскладка вместо иерархической
+    engine = layout_engine(node_count)
+    graph.engine = engine
+    if engine == 'sfdp':
+        graph.attr(overlap='prism', splines='false', outputorder='edgesfirst')
+
+
+def mealy_digraph(min_mealy, alphabet, fmt='png', dpi=EXPORT_DPI, groups=None, expanded=(), initial=None):
+    # groups - {состояние: группа} для свёртки (graph_layout.mealy_groups), expanded - развёрнутые группы
+    mealy_graph = graphviz.Digraph(name='Minimized_Mealy', format=fmt)
+    if fmt != 'svg':
+        mealy_graph.attr(dpi=str(dpi))
     mealy_graph.attr(rankdir='LR', size='9,5', bgcolor="#f9f9f9")
     mealy_graph.attr('node', shape='circle', style='filled', fillcolor='lightblue',
                      fontname='Helvetica', fontsize='22', penwidth='2')
     mealy_graph.attr('edge', color='black', fontname='Helvetica', fontsize='20', penwidth='4')
-    for s in sorted(min_mealy.keys(), key=int):
-        mealy_graph.node(s)
+    states = sorted(min_mealy.keys(), key=state_sort_key)
+    edges = [(s, min_mealy[s][letter][0], f"{letter} / {min_mealy[s][letter][1]}")
+             for s in states for letter in alphabet]
+    nodes, edges, node_id = simplify_graph(states, edges, groups, expanded)
+    _apply_layout(mealy_graph, len(nodes))
+    for name, label, size in nodes:
+        if label is None:
+            mealy_graph.node(name)
+        else:
+            mealy_graph.node(name, label=label, shape='doubleoctagon', fillcolor='lightsteelblue')
     mealy_graph.node('', shape='none')
-    if '1' in min_mealy:
-        mealy_graph.edge('', '1', style='bold')
-    for s in sorted(min_mealy.keys(), key=int):
-        for letter in alphabet:
-            dest, out = min_mealy[s][letter]
-            mealy_graph.edge(s, dest, label=f"{letter} / {out}")
-    mealy_graph.render(full_filename, view=False)
-    print(f"Минимизированный автомат Мили сохранён в файл: {full_filename}.png")
+    mealy_graph.edge('', node_id[initial if initial is not None else default_initial(min_mealy)], style='bold')
+    for src, dest, label in edges:
+        mealy_graph.edge(src, dest, label=label)
+    return mealy_graph
+
+
+def visualize_mealy(min_mealy, alphabet, filename='minimized_mealy', fmt='png', dpi=EXPORT_DPI,
+                    groups=None, expanded=(), initial=None):
+    mealy_graph = mealy_digraph(min_mealy, alphabet, fmt, dpi, groups, expanded, initial)
+    full_filename = RENDER_CACHE.render(mealy_graph, filename)
+    print(f"Минимизированный автомат Мили сохранён в файл: {full_filename}.{fmt}")
     return full_filename
 
 
-def visualize_moore(moore_states, moore_transitions, moore_initial, filename='moore'):
-    unique_id = str(uuid.uuid4())
-    full_filename = os.path.join("data", f"{filename}_{unique_id}")
-    moore_graph = graphviz.Digraph(name='Moore', format='png')
-    moore_graph.attr(dpi="1200")
+def moore_digraph(moore_states, moore_transitions, moore_initial, fmt='png', dpi=EXPORT_DPI,
+                  groups=None, expanded=()):
+    # Вершина (q, r) сворачивается в группу состояния Мили q из groups
+    moore_graph = graphviz.Digraph(name='Moore', format=fmt)
+    if fmt != 'svg':
+        moore_graph.attr(dpi=str(dpi))
     moore_graph.attr(rankdir='LR', size='9,5', bgcolor="#f9f9f9")
     moore_graph.attr('node', shape='box', style='rounded,filled', fillcolor='lightgreen',
                      fontname='Helvetica', fontsize='22', penwidth='2')
     moore_graph.attr('edge', color='darkgray', fontname='Helvetica', fontsize='20', penwidth='4')
-    for (s, r), name in moore_states.items():
-        label = f"{s}\n{r}"
-        moore_graph.node(name, label=label)
+    # Узлы и рёбра в фиксированном порядке: DOT-описание служит ключом кэша
+    ordered = sorted(moore_states.items())
+    labels = {name: f"{s}\n{r}" for (s, r), name in ordered}
+    group_of = None if groups is None else {name: groups[s] for (s, r), name in ordered}
+    edges = [(s, moore_transitions[s][letter], letter)
+             for s in sorted(moore_transitions) for letter in sorted(moore_transitions[s].keys())]
+    nodes, edges, node_id = simplify_graph([name for _, name in ordered], edges, group_of, expanded)
+    _apply_layout(moore_graph, len(nodes))
+    for name, label, size in nodes:
+        if label is None:
+            moore_graph.node(name, label=labels[name])
+        else:
+            moore_graph.node(name, label=label, shape='box3d', fillcolor='palegreen3')
     moore_graph.node('', shape='none')
-    moore_graph.edge('', moore_initial, style='bold')
-    for s in moore_transitions:
-        for letter in sorted(moore_transitions[s].keys()):
-            dest = moore_transitions[s][letter]
-            moore_graph.edge(s, dest, label=letter)
-    moore_graph.render(full_filename, view=False)
-    print(f"Автомат Мура сохранён в файл: {full_filename}.png")
+    moore_graph.edge('', node_id[moore_initial], style='bold')
+    for src, dest, label in edges:
+        moore_graph.edge(src, dest, label=label)
+    return moore_graph
+
+
+def visualize_moore(moore_states, moore_transitions, moore_initial, filename='moore', fmt='png', dpi=EXPORT_DPI,
+                    groups=None, expanded=()):
+    moore_graph = moore_digraph(moore_states, moore_transitions, moore_initial, fmt, dpi, groups, expanded)
+    full_filename = RENDER_CACHE.render(moore_graph, filename)
+    print(f"Автомат Мура сохранён в файл: {full_filename}.{fmt}")
     return full_filename
 
 
+# =============================================================================
+# Отчёт и фоновое построение
+# =============================================================================
+
+def build_report(blocks, minimized_map, min_mealy, iter_info,
+                 moore_states, moore_transitions, moore_initial, alphabet, initial=None):
+    # Части отчёта собираются в список: для тысяч состояний конкатенация строк квадратична
+    lines = ["=== Отчёт по автоматам ===", "",
+             f"Количество итераций разбиения: {len(iter_info)}", "",
+             "Промежуточные разбиения:"]
+    for idx, it in enumerate(iter_info, 1):
+        lines.append(f"  Итерация {idx}: {it}")
+    lines.append("")
+    lines.append("Финальное разбиение:")
+    for i, block in enumerate(blocks):
+        lines.append(f"  Block {i}: {sorted(block, key=state_sort_key)}")
+    lines.append("")
+    lines.append("Отображение состояний в представителей:")
+    for s in sorted(minimized_map.keys(), key=state_sort_key):
+        lines.append(f"  {s} -> {minimized_map[s]}")
+    lines.append("")
+    lines.append(f"Количество состояний минимизированного автомата: {len(min_mealy)}")
+    if initial is not None:
+        lines.append(f"Начальное состояние: {initial}")
+    lines.append("Минимизированный автомат Мили (нормализованный):")
+    lines.append("State\t " + "\t ".join(alphabet))
+    for s in sorted(min_mealy.keys(), key=state_sort_key):
+        lines.append(f"  {s}\t " + "\t ".join(f"{min_mealy[s][letter][0]}/{min_mealy[s][letter][1]}"
+                                              for letter in alphabet))
+    lines.append("")
+    lines.append(f"Количество состояний автомата Мура: {len(moore_states)}")
+    lines.append("")
+    lines.append("Переходы автомата Мура:")
+    for s in sorted(moore_transitions.keys()):
+        row_desc = []
+        for letter in alphabet:
+            row_desc.append(f"{letter} -> {moore_transitions[s][letter]}")
+        lines.append(f"  {s}: " + ",  ".join(row_desc))
+    lines.append("")
+    lines.append(f"Начальное состояние автомата Мура: {moore_initial}")
+    return "\n".join(lines) + "\n"
+
+
+class BuildCancelled(Exception):
+    pass
+
+
+class BuildWorkerSignals(QtCore.QObject):
+    progress = QtCore.pyqtSignal(int, str)
+    finished = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+
+
+class BuildWorker(QtCore.QRunnable):
+    """
+    Минимизация, построение автомата Мура, отчёт и рендер графов в пуле потоков.
+    Ход работы передаётся сигналом progress, результат (словарь) - сигналом
+    finished; сигналы доставляются в UI-поток. Отмена проверяется между этапами.
+
+    С minimizer (IncrementalMinimizer) минимизация выполняется инкрементально,
+    а если минимальный автомат совпал с previous (результат, уже показанный
+    в окне), графы не перерисовываются: берутся файлы из previous.
+
+    render - параметры отрисовки для visualize_* (fmt, dpi, expanded) и способ
+    свёртки групп collapse (см. graph_layout); для каждого графа в результат
+    попадают время отрисовки и размер файла.
+
+    С verify после минимизации проверяется эквивалентность минимизированного
+    автомата исходному (equivalence.py), итог добавляется в отчёт.
+
+    initial - начальное состояние исходного автомата (по умолчанию '1'
+    или первое в естественном порядке).
+    """
+
+    def __init__(self, mealy, alphabet, minimizer=None, previous=None, render=None, verify=False, initial=None):
+        super().__init__()
+        self.mealy = mealy
+        self.alphabet = alphabet
+        self.initial = initial if initial is not None else default_initial(mealy)
+        self.minimizer = minimizer
+        self.previous = previous
+        self.render = render or {}
+        self.verify = verify
+        self.signals = BuildWorkerSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _stage(self, value, message):
+        if self._cancelled:
+            raise BuildCancelled
+        self.signals.progress.emit(value, message)
+
+    def run(self):
+        try:
+            self._stage(5, "Минимизация автомата Мили...")
+            if self.minimizer is not None:
+                blocks, minimized_map, min_mealy, iter_info = minimize_mealy_incremental(
+                    self.mealy, self.alphabet, self.minimizer)
+            else:
+                # Промежуточные разбиения больших автоматов не сохраняются: их объём квадратичен
+                record = len(self.mealy) <= ITERATION_RECORD_LIMIT
+                blocks, minimized_map, min_mealy, iter_info = minimize_mealy(self.mealy, self.alphabet,
+                                                                             record_iterations=record)
+                if not record:
+                    iter_info = [[sorted(b, key=state_sort_key) for b in blocks]]
+            min_initial = minimized_map[self.initial]
+            verification = None
+            if self.verify:
+                self._stage(25, "Проверка эквивалентности...")
+                started = time.perf_counter()
+                verification = check_mealy_equivalence(self.mealy, min_mealy, self.alphabet,
+                                                       self.initial, min_initial)
+                verify_time = time.perf_counter() - started
+            self._stage(35, "Построение автомата Мура...")
+            moore_states, moore_transitions, moore_initial = build_moore(min_mealy, self.alphabet, min_initial)
+            self._stage(45, "Формирование отчёта...")
+            report = build_report(blocks, minimized_map, min_mealy, iter_info,
+                                  moore_states, moore_transitions, moore_initial, self.alphabet, min_initial)
+            if verification is not None:
+                report += f"\nПроверка эквивалентности ({verify_time * 1000:.1f} мс): {verification.describe()}\n"
+            # Автомат Мура однозначно строится по минимальному автомату Мили,
+            # поэтому при совпадении последнего оба графа остаются прежними
+            rendered = (self.previous is None or self.previous["min_mealy"] != min_mealy
+                        or self.previous["initial"] != min_initial or self.previous["render"] != self.render)
+            options = dict(self.render)
+            groups = mealy_groups(min_mealy, self.alphabet, options.pop("collapse", None))
+            # Группы, которые можно развернуть: из нескольких состояний Мили или их копий в автомате Мура
+            collapsible = []
+            if groups is not None:
+                mealy_sizes = group_sizes(groups)
+                moore_sizes = group_sizes({name: groups[q] for (q, r), name in moore_states.items()})
+                collapsible = [g for g in mealy_sizes if mealy_sizes[g] > 1 or moore_sizes[g] > 1]
+            render_stats = []
+            if rendered:
+                self._stage(55, "Визуализация автомата Мили...")
+                started = time.perf_counter()
+                mealy_filename = visualize_mealy(min_mealy, self.alphabet, filename='minimized_mealy_user_input',
+                                                 groups=groups, initial=min_initial, **options)
+                render_stats.append(("Мили", time.perf_counter() - started, mealy_filename))
+                self._stage(80, "Визуализация автомата Мура...")
+                started = time.perf_counter()
+                moore_filename = visualize_moore(moore_states, moore_transitions, moore_initial,
+                                                 filename='moore_user_input', groups=groups, **options)
+                render_stats.append(("Мура", time.perf_counter() - started, moore_filename))
+            else:
+                mealy_filename = self.previous["mealy_file"]
+                moore_filename = self.previous["moore_file"]
+            self._stage(100, "Готово")
+            fmt = self.render.get("fmt", "png")
+            render_stats = [(name, elapsed, os.path.getsize(f"{path}.{fmt}"))
+                            for name, elapsed, path in render_stats]
+        except BuildCancelled:
+            self.signals.cancelled.emit()
+            return
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit({
+            "report": report,
+            "iter_info": iter_info,
+            "min_mealy": min_mealy,
+            "min_initial": min_initial,
+            "moore_states": moore_states,
+            "moore_transitions": moore_transitions,
+            "moore_initial": moore_initial,
+            "mealy_file": mealy_filename,
+            "moore_file": moore_filename,
+            "format": fmt,
+            "render": self.render,
+            "rendered": rendered,
+            "render_stats": render_stats,
+            "groups": collapsible,
+            "verification": verification,
+        })
+
+
+# =============================================================================
+# Показ графов
+# =============================================================================
+
+class GraphView(QtWidgets.QStackedWidget):
+    """
+    Область показа графа: SVG через QSvgWidget (масштабируется без потерь)
+    или PNG, который масштабируется под текущий размер области.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.label = QtWidgets.QLabel()
+        self.label.setAlignment(QtCore.Qt.AlignCenter)
+        self.label.setMinimumSize(1, 1)
+        self.addWidget(self.label)
+        self.svg = None
+        if QtSvg is not None:
+            self.svg = QtSvg.QSvgWidget()
+            renderer = self.svg.renderer()
+            if hasattr(renderer, "setAspectRatioMode"):  # Qt >= 5.15
+                renderer.setAspectRatioMode(QtCore.Qt.KeepAspectRatio)
+            self.addWidget(self.svg)
+        self.pixmap = None
+
+    def target_dpi(self):
+        """
+        Разрешение PNG, при котором граф размера GRAPH_SIZE заполняет область.
+        """
+        ratio = self.devicePixelRatioF()
+        width, height = GRAPH_SIZE
+        return max(36, int(max(self.width() / width, self.height() / height) * ratio + 0.5))
+
+    def show_file(self, path):
+        if path.endswith(".svg") and self.svg is not None:
+            self.pixmap = None
+            self.svg.load(path)
+            self.setCurrentWidget(self.svg)
+        else:
+            self.pixmap = QPixmap(path)
+            self.setCurrentWidget(self.label)
+            self._update_pixmap()
+
+    def clear(self):
+        self.pixmap = None
+        self.label.clear()
+        if self.svg is not None:
+            self.svg.load(QtCore.QByteArray())
+        self.setCurrentWidget(self.label)
+
+    def _update_pixmap(self):
+        if self.pixmap is None or self.pixmap.isNull():
+            self.label.clear()
+            return
+        size = self.label.size() * self.devicePixelRatioF()
+        scaled = self.pixmap.scaled(size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        scaled.setDevicePixelRatio(self.devicePixelRatioF())
+        self.label.setPixmap(scaled)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.pixmap is not None:
+            self._update_pixmap()
+
+
 # =============================================================================
 # Главное окно приложения
 # =============================================================================
 
+# Наибольшая длина входной строки, для которой симуляция выводит протокол переходов
+SIMULATION_TRACE_LIMIT = 1000
+# Сколько символов выходного слова показывать в журнале симуляции
+SIMULATION_OUTPUT_PREVIEW = 200
+# Число и длина случайных слов для сверки минимизированного автомата с исходным
+REGRESSION_WORDS = 100000
+REGRESSION_LENGTH = 20
+
 class MainWindow(QtWidgets.QMainWindow):
-    def __init__(self, num_states=9, input_alphabet=('a', 'b')):
+    def __init__(self, num_states=9, input_alphabet=('a', 'b'), state_labels=None, initial_state=None):
         super().__init__()
-        self.num_states = num_states
-        self.input_alphabet = input_alphabet
+        # Имена состояний по умолчанию - '1'..num_states; начальное - первое из них
+        self.state_labels = list(state_labels) if state_labels is not None \
+            else [str(i) for i in range(1, num_states + 1)]
+        self.num_states = len(self.state_labels)
+        self.input_alphabet = tuple(input_alphabet)
+        self.initial_state = initial_state if initial_state is not None else self.state_labels[0]
         self.dark_mode = False
         self.history = []  # История построений
         self.current_min_mealy = None
+        self.current_min_initial = None
+        self.current_moore_states = None
         self.current_moore_transitions = None
         self.current_moore_initial = None
         self.iter_info = []  # Итерации разбиения (для пошагового режима)
@@ -189,7 +504,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.live_preview_timer.timeout.connect(self.on_live_preview)
         self.simulation_timer = QtCore.QTimer(self)
         self.simulation_steps = []
+        self.simulators = {}  # Скомпилированные автоматы для симуляции (simulation.CompiledMachine)
         self.simulation_current_index = 0
+        self.build_worker = None  # Текущее фоновое построение (BuildWorker)
+        self.minimizer = IncrementalMinimizer()  # Разбиение для автообновления предпросмотра
+        self.current_render = None  # Минимальный автомат и файлы показанных графов
+        self.expanded_groups = set()  # Развёрнутые группы при свёртке графов
         self.setWindowTitle("Генератор автоматов Мили/Мура")
         self.resize(1400, 950)
         self.setFont(QFont("Arial", 10))
@@ -258,13 +578,18 @@ class MainWindow(QtWidgets.QMainWindow):
         self.live_preview_checkbox = QtWidgets.QCheckBox("Автообновление предпросмотра")
         self.live_preview_checkbox.setToolTip("При включении изменения в таблице автоматически обновляют результаты")
         input_layout.addWidget(self.live_preview_checkbox)
-        self.table = QtWidgets.QTableWidget(self.num_states, len(self.input_alphabet))
-        self.table.setHorizontalHeaderLabels(list(self.input_alphabet))
-        self.table.setVerticalHeaderLabels([str(i) for i in range(1, self.num_states + 1)])
+        self.verify_checkbox = QtWidgets.QCheckBox("Проверять эквивалентность после минимизации")
+        self.verify_checkbox.setToolTip("Сравнить минимизированный автомат с исходным (алгоритм Хопкрофта–Карпа)")
+        input_layout.addWidget(self.verify_checkbox)
+        # Таблица на модели (table_model.py): ячейки не создаются как отдельные объекты
+        self.table_model = MealyTableModel(self.state_labels, self.input_alphabet, self)
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.table_model)
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
         self.table.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_table_context_menu)
         input_layout.addWidget(self.table)
-        self.table.cellChanged.connect(self.on_cell_changed)
+        self.table_model.dataChanged.connect(self.on_cell_changed)
         button_layout = QtWidgets.QHBoxLayout()
         self.build_button = QtWidgets.QPushButton("Сохранить и Построить")
         self.build_button.setToolTip("Сохранить данные и построить автоматы")
@@ -293,11 +618,35 @@ class MainWindow(QtWidgets.QMainWindow):
         self.text_output = QtWidgets.QTextEdit()
         self.text_output.setReadOnly(True)
         results_layout.addWidget(self.text_output)
+        render_layout = QtWidgets.QHBoxLayout()
+        render_layout.addWidget(QtWidgets.QLabel("Отрисовка графов:"))
+        self.render_mode_combo = QtWidgets.QComboBox()
+        if QtSvg is not None:
+            self.render_mode_combo.addItem("SVG", "svg")
+        self.render_mode_combo.addItem("PNG по размеру области", "png")
+        self.render_mode_combo.setToolTip("Полное разрешение используется только при экспорте изображений")
+        render_layout.addWidget(self.render_mode_combo)
+        render_layout.addWidget(QtWidgets.QLabel("Свернуть:"))
+        self.collapse_combo = QtWidgets.QComboBox()
+        for title, mode in zip(("Ничего", "Компоненты сильной связности", "Копии состояний Мили"), COLLAPSE_MODES):
+            self.collapse_combo.addItem(title, mode)
+        self.collapse_combo.setToolTip("Сворачивать группы состояний в сводные вершины (для больших автоматов)")
+        self.collapse_combo.currentIndexChanged.connect(self.on_collapse_changed)
+        render_layout.addWidget(self.collapse_combo)
+        self.expand_combo = QtWidgets.QComboBox()
+        self.expand_combo.setToolTip("Свёрнутые группы текущего построения")
+        self.expand_button = QtWidgets.QPushButton("Развернуть")
+        self.expand_button.clicked.connect(self.on_expand_group)
+        self.collapse_all_button = QtWidgets.QPushButton("Свернуть все")
+        self.collapse_all_button.clicked.connect(self.on_collapse_all)
+        render_layout.addWidget(self.expand_combo)
+        render_layout.addWidget(self.expand_button)
+        render_layout.addWidget(self.collapse_all_button)
+        render_layout.addStretch()
+        results_layout.addLayout(render_layout)
         image_layout = QtWidgets.QHBoxLayout()
-        self.mealy_image_label = QtWidgets.QLabel()
-        self.moore_image_label = QtWidgets.QLabel()
-        self.mealy_image_label.setAlignment(QtCore.Qt.AlignCenter)
-        self.moore_image_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.mealy_image_label = GraphView()
+        self.moore_image_label = GraphView()
         image_layout.addWidget(self.mealy_image_label)
         image_layout.addWidget(self.moore_image_label)
         results_layout.addLayout(image_layout)
@@ -336,13 +685,18 @@ class MainWindow(QtWidgets.QMainWindow):
         sim_control_layout.addWidget(QtWidgets.QLabel("Входная строка:"))
         self.sim_input_line = QtWidgets.QLineEdit()
         self.sim_input_line.setToolTip("Введите входную строку (символы из алфавита)")
+        self.sim_input_line.setPlaceholderText("abba; многобуквенные символы - через пробел или запятую: x1 x2, x1")
         sim_control_layout.addWidget(self.sim_input_line)
         self.simulate_button = QtWidgets.QPushButton("Симулировать")
         self.simulate_button.setToolTip("Запустить симуляцию полностью")
         self.sim_step_button = QtWidgets.QPushButton("Пошаговая симуляция")
         self.sim_step_button.setToolTip("Запустить пошаговую симуляцию")
+        self.sim_check_button = QtWidgets.QPushButton("Сверка с исходным")
+        self.sim_check_button.setToolTip(f"Сравнить реакции минимизированного и исходного автоматов "
+                                         f"на {REGRESSION_WORDS} случайных словах")
         sim_control_layout.addWidget(self.simulate_button)
         sim_control_layout.addWidget(self.sim_step_button)
+        sim_control_layout.addWidget(self.sim_check_button)
         # Создаём и настраиваем слайдер скорости
         self.speed_slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
         self.speed_slider.setRange(500, 3000)
@@ -358,6 +712,7 @@ class MainWindow(QtWidgets.QMainWindow):
         sim_layout.addWidget(self.sim_log_text)
         self.simulate_button.clicked.connect(self.on_simulate)
         self.sim_step_button.clicked.connect(self.on_simulate_step_by_step)
+        self.sim_check_button.clicked.connect(self.on_regression_check)
         self.tab_widget.addTab(self.simulation_tab, "Симуляция")
 
     def create_menu(self):
@@ -428,8 +783,13 @@ class MainWindow(QtWidgets.QMainWindow):
         self.progress_bar = QtWidgets.QProgressBar()
         self.progress_bar.setMaximumWidth(150)
         self.progress_bar.setValue(0)
+        self.cancel_build_button = QtWidgets.QPushButton("Отмена")
+        self.cancel_build_button.setToolTip("Отменить текущее построение")
+        self.cancel_build_button.setVisible(False)
+        self.cancel_build_button.clicked.connect(self.on_cancel_build)
         self.statusBar().addPermanentWidget(self.clock_label)
         self.statusBar().addPermanentWidget(self.progress_bar)
+        self.statusBar().addPermanentWidget(self.cancel_build_button)
         timer = QtCore.QTimer(self)
         timer.timeout.connect(self.update_clock)
         timer.start(1000)
@@ -539,13 +899,51 @@ class MainWindow(QtWidgets.QMainWindow):
     def show_settings(self):
         dlg = QtWidgets.QDialog(self)
         dlg.setWindowTitle("Настройки")
-        layout = QtWidgets.QVBoxLayout(dlg)
-        label = QtWidgets.QLabel("Настройки пока не реализованы.\nБудет доступно в будущих версиях.")
-        layout.addWidget(label)
-        btn = QtWidgets.QPushButton("Закрыть")
-        btn.clicked.connect(dlg.accept)
-        layout.addWidget(btn)
-        dlg.exec_()
+        layout = QtWidgets.QFormLayout(dlg)
+        states_edit = QtWidgets.QLineEdit(", ".join(self.state_labels))
+        states_edit.setToolTip("Число состояний (имена 1..N) или имена через запятую")
+        alphabet_edit = QtWidgets.QLineEdit(", ".join(self.input_alphabet))
+        alphabet_edit.setToolTip("Входные символы через запятую")
+        initial_edit = QtWidgets.QLineEdit(self.initial_state)
+        layout.addRow("Состояния:", states_edit)
+        layout.addRow("Входной алфавит:", alphabet_edit)
+        layout.addRow("Начальное состояние:", initial_edit)
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dlg.accept)
+        buttons.rejected.connect(dlg.reject)
+        layout.addRow(buttons)
+        if dlg.exec_() != QtWidgets.QDialog.Accepted:
+            return
+        states_text = states_edit.text().strip()
+        if states_text.isdigit():
+            state_labels = [str(i) for i in range(1, int(states_text) + 1)]
+        else:
+            state_labels = [name.strip() for name in states_text.split(',') if name.strip()]
+        alphabet = [letter.strip() for letter in alphabet_edit.text().split(',') if letter.strip()]
+        initial = initial_edit.text().strip() or (state_labels[0] if state_labels else "")
+        if not state_labels or not alphabet or len(set(state_labels)) != len(state_labels) \
+                or len(set(alphabet)) != len(alphabet) or initial not in state_labels:
+            QtWidgets.QMessageBox.warning(self, "Ошибка ввода",
+                                          "Имена состояний и символы должны быть непустыми и различными, "
+                                          "начальное состояние - одним из состояний.")
+            return
+        if state_labels == self.state_labels and tuple(alphabet) == self.input_alphabet:
+            self.initial_state = initial
+        else:
+            self.resize_table(state_labels, alphabet, initial)
+        self.statusBar().showMessage(f"Таблица: {len(state_labels)} состояний, {len(alphabet)} символов, "
+                                     f"начальное состояние {initial}")
+
+    def resize_table(self, state_labels, alphabet, initial_state=None, rows=None):
+        # Новые размеры таблицы; прежние результаты и кэш минимизации относятся к старой таблице
+        self.state_labels = list(state_labels)
+        self.num_states = len(self.state_labels)
+        self.input_alphabet = tuple(alphabet)
+        self.initial_state = initial_state if initial_state in self.state_labels else self.state_labels[0]
+        self.table_model.resize(self.state_labels, self.input_alphabet)
+        if rows is not None:
+            self.table_model.set_rows(rows)
+        self.minimizer.reset()
 
     def open_file(self):
         options = QtWidgets.QFileDialog.Options()
@@ -554,15 +952,14 @@ class MainWindow(QtWidgets.QMainWindow):
         if filename:
             try:
                 with open(filename, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                for row, line in enumerate(lines):
-                    if row >= self.num_states:
-                        break
-                    parts = line.strip().split(';')
-                    for col, part in enumerate(parts):
-                        if col >= len(self.input_alphabet):
-                            break
-                        self.table.setItem(row, col, QtWidgets.QTableWidgetItem(part.strip()))
+                    rows = [line.strip().rstrip(';').split(';') for line in f
+                            if line.strip() and not line.startswith('#')]
+                # Таблица другого размера задаёт состояния 1..N и алфавит a, b, ... (machine_io)
+                columns = max((len(row) for row in rows), default=0)
+                if rows and (len(rows) != self.num_states or columns != len(self.input_alphabet)):
+                    self.resize_table([str(i) for i in range(1, len(rows) + 1)], default_alphabet(columns), rows=rows)
+                else:
+                    self.table_model.set_rows(rows)
                 self.statusBar().showMessage(f"Файл {filename} успешно загружен")
             except Exception as e:
                 QtWidgets.QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить файл: {e}")
@@ -595,14 +992,28 @@ class MainWindow(QtWidgets.QMainWindow):
                 QtWidgets.QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить HTML отчёт: {e}")
 
     def export_images(self):
+        if self.current_min_mealy is None:
+            QtWidgets.QMessageBox.warning(self, "Ошибка", "Сначала постройте автомат")
+            return
         options = QtWidgets.QFileDialog.Options()
         directory = QtWidgets.QFileDialog.getExistingDirectory(self, "Выберите папку для сохранения изображений", options=options)
         if directory:
             try:
-                for file in os.listdir("data"):
-                    if file.endswith(".png"):
-                        shutil.copy(os.path.join("data", file), directory)
-                self.statusBar().showMessage(f"Изображения сохранены в папку: {directory}")
+                # Полное разрешение отрисовывается только здесь, для показа в окне оно не нужно
+                started = time.perf_counter()
+                files = [
+                    visualize_mealy(self.current_min_mealy, self.input_alphabet,
+                                    filename='minimized_mealy_user_input', dpi=EXPORT_DPI,
+                                    initial=self.current_min_initial),
+                    visualize_moore(self.current_moore_states, self.current_moore_transitions,
+                                    self.current_moore_initial, filename='moore_user_input', dpi=EXPORT_DPI),
+                ]
+                size = 0
+                for file in files:
+                    shutil.copy(file + ".png", directory)
+                    size += os.path.getsize(file + ".png")
+                self.statusBar().showMessage(f"Изображения сохранены в папку: {directory} "
+                                             f"({time.perf_counter() - started:.2f} с, {size / 1024:.1f} КБ)")
             except Exception as e:
                 QtWidgets.QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить изображения: {e}")
 
@@ -613,18 +1024,15 @@ class MainWindow(QtWidgets.QMainWindow):
         if filename:
             try:
                 session_data = {
-                    "table": [],
+                    "states": self.state_labels,
+                    "alphabet": list(self.input_alphabet),
+                    "initial": self.initial_state,
+                    "table": self.table_model.rows(),
                     "output_text": self.text_output.toPlainText(),
                     "sim_input": self.sim_input_line.text(),
                     "sim_log": self.sim_log_text.toPlainText(),
                     "history": self.history
                 }
-                for row in range(self.num_states):
-                    row_data = []
-                    for col in range(len(self.input_alphabet)):
-                        item = self.table.item(row, col)
-                        row_data.append(item.text() if item else "")
-                    session_data["table"].append(row_data)
                 with open(filename, "w", encoding="utf-8") as f:
                     json.dump(session_data, f, ensure_ascii=False, indent=4)
                 self.statusBar().showMessage(f"Сессия сохранена в файл: {filename}")
@@ -639,9 +1047,15 @@ class MainWindow(QtWidgets.QMainWindow):
             try:
                 with open(filename, "r", encoding="utf-8") as f:
                     session_data = json.load(f)
-                for row, row_data in enumerate(session_data.get("table", [])):
-                    for col, cell in enumerate(row_data):
-                        self.table.setItem(row, col, QtWidgets.QTableWidgetItem(cell))
+                # Сессии прежних версий не хранят размеры: в них таблица 9x2 с состояниями 1..9
+                table = session_data.get("table", [])
+                state_labels = session_data.get("states") or [str(i) for i in range(1, len(table) + 1)]
+                alphabet = session_data.get("alphabet") or list(self.input_alphabet)
+                if state_labels != self.state_labels or tuple(alphabet) != self.input_alphabet:
+                    self.resize_table(state_labels, alphabet, session_data.get("initial"), rows=table)
+                else:
+                    self.initial_state = session_data.get("initial", self.initial_state)
+                    self.table_model.set_rows(table)
                 self.text_output.setPlainText(session_data.get("output_text", ""))
                 self.sim_input_line.setText(session_data.get("sim_input", ""))
                 self.sim_log_text.setPlainText(session_data.get("sim_log", ""))
@@ -710,40 +1124,19 @@ class MainWindow(QtWidgets.QMainWindow):
             self.update_step_by_step_tab()
 
     def read_table(self):
-        mealy = {}
-        for state in range(1, self.num_states + 1):
-            mealy[str(state)] = {}
-            for j, letter in enumerate(self.input_alphabet):
-                item = self.table.item(state - 1, j)
-                if item is None or item.text().strip() == "":
-                    QtWidgets.QMessageBox.warning(self, "Ошибка ввода",
-                                                  f"Заполните ячейку для состояния {state}, вход '{letter}'.")
-                    return None
-                text = item.text().strip()
-                if ',' not in text:
-                    QtWidgets.QMessageBox.warning(self, "Ошибка ввода",
-                                                  f"Неверный формат в состоянии {state}, вход '{letter}'. Ожидается формат 'dest,out'.")
-                    return None
-                parts = text.split(',')
-                if len(parts) != 2:
-                    QtWidgets.QMessageBox.warning(self, "Ошибка ввода",
-                                                  f"Неверный формат в состоянии {state}, вход '{letter}'. Ожидается формат 'dest,out'.")
-                    return None
-                dest_str, out_str = parts[0].strip(), parts[1].strip()
-                if not dest_str or not out_str:
-                    QtWidgets.QMessageBox.warning(self, "Ошибка ввода",
-                                                  f"Неверный формат в состоянии {state}, вход '{letter}'. Пустое значение.")
-                    return None
-                mealy[str(state)][letter] = (dest_str, out_str)
+        mealy, error = self.table_model.to_mealy()
+        if error is not None:
+            row, col, message = error
+            self.table.setCurrentIndex(self.table_model.index(row, col))
+            QtWidgets.QMessageBox.warning(self, "Ошибка ввода", message)
+            return None
         return mealy
 
     def generate_random_automaton(self):
         possible_outputs = ["x", "y"]
-        for state in range(1, self.num_states + 1):
-            for j, letter in enumerate(self.input_alphabet):
-                dest = str(random.randint(1, self.num_states))
-                out = random.choice(possible_outputs)
-                self.table.setItem(state - 1, j, QtWidgets.QTableWidgetItem(f"{dest},{out}"))
+        k = len(self.input_alphabet)
+        self.table_model.set_rows([[f"{random.choice(self.state_labels)},{random.choice(possible_outputs)}"
+                                    for _ in range(k)] for _ in self.state_labels])
         self.statusBar().showMessage("Случайный автомат сгенерирован")
 
     def highlight_equivalent_states(self):
@@ -753,192 +1146,231 @@ class MainWindow(QtWidgets.QMainWindow):
         blocks = initial_partition(mealy, self.input_alphabet)
         colors = ["#ffcccc", "#ccffcc", "#ccccff", "#ffffcc", "#ffccff",
                   "#ccffff", "#e6ccff", "#ffe6cc", "#ccffe6", "#e6ffcc"]
-        for row in range(self.num_states):
-            for col in range(len(self.input_alphabet)):
-                item = self.table.item(row, col)
-                if item:
-                    item.setBackground(QColor("white"))
+        row_of = {state: row for row, state in enumerate(self.state_labels)}
+        row_colors = {}
         for i, block in enumerate(blocks):
             color = colors[i % len(colors)]
             for state in block:
-                row = int(state) - 1
-                for col in range(len(self.input_alphabet)):
-                    item = self.table.item(row, col)
-                    if item is None:
-                        item = QtWidgets.QTableWidgetItem("")
-                        self.table.setItem(row, col, item)
-                    item.setBackground(QColor(color))
+                row_colors[row_of[state]] = color
+        self.table_model.set_row_colors(row_colors)
         self.statusBar().showMessage("Эквивалентные состояния подсвечены")
 
     def on_build(self):
-        self.progress_bar.setValue(0)
+        self.start_build(incremental=False)
+
+    def start_build(self, incremental):
         mealy = self.read_table()
         if mealy is None:
             return
-        QtCore.QTimer.singleShot(500, lambda: self.progress_bar.setValue(50))
-        blocks, minimized_map, min_mealy, iter_info = minimize_mealy(mealy, self.input_alphabet)
-        QtCore.QTimer.singleShot(1000, lambda: self.progress_bar.setValue(100))
-        moore_states, moore_transitions, moore_initial = build_moore(min_mealy, self.input_alphabet)
-        output_text = "=== Отчёт по автоматам ===\n\n"
-        output_text += f"Количество итераций разбиения: {len(iter_info)}\n\n"
-        output_text += "Промежуточные разбиения:\n"
-        for idx, it in enumerate(iter_info, 1):
-            output_text += f"  Итерация {idx}: {it}\n"
-        output_text += "\nФинальное разбиение:\n"
-        for i, block in enumerate(blocks):
-            output_text += f"  Block {i}: {sorted(block, key=int)}\n"
-        output_text += "\nОтображение состояний в представителей:\n"
-        for s in sorted(minimized_map.keys(), key=int):
-            output_text += f"  {s} -> {minimized_map[s]}\n"
-        output_text += f"\nКоличество состояний минимизированного автомата: {len(min_mealy)}\n"
-        output_text += "Минимизированный автомат Мили (нормализованный):\n"
-        output_text += "State\t a\t b\n"
-        for s in sorted(min_mealy.keys(), key=int):
-            da, oa = min_mealy[s]['a']
-            db, ob = min_mealy[s]['b']
-            output_text += f"  {s}\t {da}/{oa}\t {db}/{ob}\n"
-        output_text += f"\nКоличество состояний автомата Мура: {len(moore_states)}\n"
-        output_text += "\nПереходы автомата Мура:\n"
-        for s in sorted(moore_transitions.keys()):
-            row_desc = []
-            for letter in self.input_alphabet:
-                row_desc.append(f"{letter} -> {moore_transitions[s][letter]}")
-            output_text += f"  {s}: " + ",  ".join(row_desc) + "\n"
-        output_text += f"\nНачальное состояние автомата Мура: {moore_initial}\n"
-        self.text_output.setPlainText(output_text)
+        # Новое построение отменяет ещё не завершённое предыдущее
+        if self.build_worker is not None:
+            self.build_worker.cancel()
+        fmt = self.render_mode_combo.currentData()
+        render = {"fmt": fmt, "collapse": self.collapse_combo.currentData(),
+                  "expanded": tuple(sorted(self.expanded_groups))}
+        if fmt == "png":
+            render["dpi"] = self.mealy_image_label.target_dpi()
+        verify = self.verify_checkbox.isChecked()
+        if incremental:
+            worker = BuildWorker(mealy, self.input_alphabet, self.minimizer, self.current_render, render, verify,
+                                 self.initial_state)
+        else:
+            worker = BuildWorker(mealy, self.input_alphabet, render=render, verify=verify, initial=self.initial_state)
+        worker.signals.progress.connect(self.on_build_progress)
+        worker.signals.finished.connect(self.on_build_finished)
+        worker.signals.failed.connect(self.on_build_failed)
+        worker.signals.cancelled.connect(self.on_build_cancelled)
+        self.build_worker = worker
+        self.progress_bar.setValue(0)
+        self.cancel_build_button.setVisible(True)
+        QtCore.QThreadPool.globalInstance().start(worker)
 
-        self.current_min_mealy = min_mealy
-        self.current_moore_transitions = moore_transitions
-        self.current_moore_initial = moore_initial
+    def is_current_build(self):
+        return self.build_worker is not None and self.sender() is self.build_worker.signals
 
-        mealy_filename = visualize_mealy(min_mealy, self.input_alphabet, filename='minimized_mealy_user_input')
-        moore_filename = visualize_moore(moore_states, moore_transitions, moore_initial, filename='moore_user_input')
+    def on_build_progress(self, value, message):
+        if not self.is_current_build():
+            return
+        self.progress_bar.setValue(value)
+        self.statusBar().showMessage(message)
 
-        mealy_pixmap = QPixmap(mealy_filename + ".png")
-        moore_pixmap = QPixmap(moore_filename + ".png")
-        self.mealy_image_label.setPixmap(mealy_pixmap.scaled(500, 400, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation))
-        self.moore_image_label.setPixmap(moore_pixmap.scaled(500, 400, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation))
+    def on_cancel_build(self):
+        if self.build_worker is not None:
+            self.build_worker.cancel()
+            self.statusBar().showMessage("Отмена построения...")
 
-        self.tab_widget.setCurrentWidget(self.results_tab)
-        self.statusBar().showMessage("Автоматы успешно построены")
+    def finish_build(self, message):
+        self.build_worker = None
+        self.cancel_build_button.setVisible(False)
         self.progress_bar.setValue(0)
+        self.statusBar().showMessage(message)
+
+    def on_build_cancelled(self):
+        if self.is_current_build():
+            self.finish_build("Построение отменено")
+
+    def on_build_failed(self, error):
+        if not self.is_current_build():
+            return
+        self.finish_build("Ошибка построения")
+        QtWidgets.QMessageBox.critical(self, "Ошибка", f"Не удалось построить автоматы: {error}")
+
+    def on_build_finished(self, result):
+        if not self.is_current_build():
+            return
+        output_text = result["report"]
+        self.text_output.setPlainText(output_text)
+
+        self.current_min_mealy = result["min_mealy"]
+        self.current_min_initial = result["min_initial"]
+        self.simulators = {}
+        self.current_moore_states = result["moore_states"]
+        self.current_moore_transitions = result["moore_transitions"]
+        self.current_moore_initial = result["moore_initial"]
+
+        mealy_filename = result["mealy_file"]
+        moore_filename = result["moore_file"]
+        self.iter_info = result["iter_info"]
+        self.current_iteration = 0
+        self.update_step_by_step_tab()
+        verification = result["verification"]
+        if verification is not None and not verification.equivalent:
+            QtWidgets.QMessageBox.warning(self, "Проверка эквивалентности",
+                                          f"Минимизированный автомат: {verification.describe()}")
+        if not result["rendered"]:
+            # Минимальный автомат не изменился: графы и история остаются прежними
+            self.finish_build("Минимизированный автомат не изменился")
+            return
+        self.current_render = {
+            "min_mealy": result["min_mealy"],
+            "initial": result["min_initial"],
+            "mealy_file": mealy_filename,
+            "moore_file": moore_filename,
+            "render": result["render"],
+        }
+        ext = "." + result["format"]
+        self.expand_combo.clear()
+        self.expand_combo.addItems([g for g in result["groups"] if g not in self.expanded_groups])
+        self.mealy_image_label.show_file(mealy_filename + ext)
+        self.moore_image_label.show_file(moore_filename + ext)
+
+        self.tab_widget.setCurrentWidget(self.results_tab)
+        timings = "; ".join(f"{name}: {elapsed:.2f} с, {size / 1024:.1f} КБ"
+                            for name, elapsed, size in result["render_stats"])
+        cache = RENDER_CACHE.stats()
+        self.finish_build(f"Автоматы успешно построены ({timings}; кэш графов: попаданий {cache['hits']}, "
+                          f"промахов {cache['misses']})")
 
         timestamp = QtCore.QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm:ss")
-        input_table = []
-        for row in range(self.num_states):
-            row_data = []
-            for col in range(len(self.input_alphabet)):
-                item = self.table.item(row, col)
-                row_data.append(item.text() if item else "")
-            input_table.append(row_data)
+        input_table = self.table_model.rows()
         history_entry = {
             "timestamp": timestamp,
             "report": output_text,
-            "mealy_file": mealy_filename + ".png",
-            "moore_file": moore_filename + ".png",
+            "mealy_file": mealy_filename + ext,
+            "moore_file": moore_filename + ext,
             "input_table": input_table
         }
         self.history.append(history_entry)
         self.update_history_table()
 
-        self.iter_info = iter_info
-        self.current_iteration = 0
-        self.update_step_by_step_tab()
-
     def on_clear(self):
-        for row in range(self.num_states):
-            for col in range(len(self.input_alphabet)):
-                self.table.setItem(row, col, QtWidgets.QTableWidgetItem(""))
+        self.table_model.clear_cells()
         self.text_output.clear()
         self.mealy_image_label.clear()
         self.moore_image_label.clear()
+        self.current_render = None
         self.sim_input_line.clear()
         self.sim_log_text.clear()
         self.statusBar().showMessage("Ввод очищен")
 
+    def get_simulator(self, sim_type):
+        # Скомпилированный автомат для симуляции; кэш сбрасывается при каждом новом построении
+        if sim_type not in self.simulators:
+            if sim_type == "Мили":
+                if not self.current_min_mealy:
+                    return None
+                simulator = CompiledMachine.from_mealy(self.current_min_mealy, self.input_alphabet,
+                                                       self.current_min_initial)
+            else:
+                if not self.current_moore_transitions:
+                    return None
+                simulator = CompiledMachine.from_moore(self.current_moore_states, self.current_moore_transitions,
+                                                       self.current_moore_initial, self.input_alphabet)
+            self.simulators[sim_type] = simulator
+        return self.simulators[sim_type]
+
+    def read_sim_input(self):
+        """
+        Входное слово из строки ввода: строка, если все символы алфавита
+        однобуквенные, иначе список символов, разделённых пробелами или запятыми.
+        """
+        text = self.sim_input_line.text().strip()
+        if all(len(letter) == 1 for letter in self.input_alphabet):
+            return text
+        return [letter for letter in re.split(r"[\s,]+", text) if letter]
+
+    def run_simulation(self, sim_type, input_str, trace):
+        """
+        Прогон входного слова (строки или списка символов). Возвращает (шаги, итоговое состояние), где
+        шаги - список (состояние, сообщение); без trace вместо протокола
+        переходов - сводка с выходным словом и скоростью.
+        """
+        simulator = self.get_simulator(sim_type)
+        error = None
+        try:
+            simulator.encode(input_str)
+        except SimulationError as e:
+            error = e
+            input_str = input_str[:e.position]
+        started = time.perf_counter()
+        separator = "" if all(len(o) == 1 for o in simulator.outputs) else " "
+        result = simulator.run(input_str, trace=trace, separator=separator)
+        elapsed = time.perf_counter() - started
+        initial = simulator.states[simulator.initial]
+        steps = [(initial, f"Начальное состояние: {initial}")]
+        if trace:
+            for state, ch, next_state, output in result.trace:
+                if sim_type == "Мили":
+                    steps.append((next_state, f"При входе '{ch}': {state} -> {next_state}, вывод: {output}"))
+                else:
+                    steps.append((next_state, f"При входе '{ch}': {state} -> {next_state}"))
+        else:
+            speed = f", {result.steps / elapsed:.0f} символов/с" if elapsed > 0 else ""
+            steps.append((result.final_state, f"Обработано символов: {result.steps} за {elapsed:.3f} с{speed}"))
+        if error is not None:
+            steps.append((result.final_state, f"Ошибка: {error}"))
+        word = result.outputs
+        if len(word) > SIMULATION_OUTPUT_PREVIEW:
+            word = word[:SIMULATION_OUTPUT_PREVIEW] + "..."
+        steps.append((result.final_state, f"Выходное слово: {word}"))
+        steps.append((result.final_state, f"Итоговое состояние: {result.final_state}"))
+        return steps, result.final_state
+
     def on_simulate(self):
         sim_type = self.sim_type_combo.currentText()
-        input_str = self.sim_input_line.text().strip()
+        input_str = self.read_sim_input()
         if not input_str:
             QtWidgets.QMessageBox.warning(self, "Ошибка", "Введите входную строку для симуляции")
             return
-        if sim_type == "Мили":
-            if not self.current_min_mealy:
-                QtWidgets.QMessageBox.warning(self, "Ошибка", "Сначала постройте автомат")
-                return
-            current_state = "1" if "1" in self.current_min_mealy else sorted(self.current_min_mealy.keys())[0]
-            log = [f"Начальное состояние: {current_state}"]
-            for ch in input_str:
-                if ch not in self.input_alphabet:
-                    log.append(f"Ошибка: символ '{ch}' не входит в алфавит {self.input_alphabet}")
-                    break
-                next_state, output = self.current_min_mealy[current_state][ch]
-                log.append(f"При входе '{ch}': {current_state} -> {next_state}, вывод: {output}")
-                current_state = next_state
-            log.append(f"Итоговое состояние: {current_state}")
-            self.sim_log_text.setPlainText("\n".join(log))
-            self.sim_current_state_label.setText(f"Текущее состояние: {current_state}")
-        elif sim_type == "Мура":
-            if not self.current_moore_transitions:
-                QtWidgets.QMessageBox.warning(self, "Ошибка", "Сначала постройте автомат")
-                return
-            current_state = self.current_moore_initial
-            log = [f"Начальное состояние: {current_state}"]
-            for ch in input_str:
-                if ch not in self.input_alphabet:
-                    log.append(f"Ошибка: символ '{ch}' не входит в алфавит {self.input_alphabet}")
-                    break
-                try:
-                    next_state = self.current_moore_transitions[current_state][ch]
-                except KeyError:
-                    log.append(f"Ошибка: нет перехода для символа '{ch}' в состоянии {current_state}")
-                    break
-                log.append(f"При входе '{ch}': {current_state} -> {next_state}")
-                current_state = next_state
-            log.append(f"Итоговое состояние: {current_state}")
-            self.sim_log_text.setPlainText("\n".join(log))
-            self.sim_current_state_label.setText(f"Текущее состояние: {current_state}")
+        if self.get_simulator(sim_type) is None:
+            QtWidgets.QMessageBox.warning(self, "Ошибка", "Сначала постройте автомат")
+            return
+        # Протокол переходов строится только для коротких строк
+        steps, final_state = self.run_simulation(sim_type, input_str,
+                                                 trace=len(input_str) <= SIMULATION_TRACE_LIMIT)
+        self.sim_log_text.setPlainText("\n".join(msg for _, msg in steps))
+        self.sim_current_state_label.setText(f"Текущее состояние: {final_state}")
 
     def on_simulate_step_by_step(self):
         sim_type = self.sim_type_combo.currentText()
-        input_str = self.sim_input_line.text().strip()
+        input_str = self.read_sim_input()
         if not input_str:
             QtWidgets.QMessageBox.warning(self, "Ошибка", "Введите входную строку для симуляции")
             return
-        if sim_type == "Мили":
-            if not self.current_min_mealy:
-                QtWidgets.QMessageBox.warning(self, "Ошибка", "Сначала постройте автомат")
-                return
-            current_state = "1" if "1" in self.current_min_mealy else sorted(self.current_min_mealy.keys())[0]
-            steps = []
-            steps.append((current_state, f"Начальное состояние: {current_state}"))
-            for ch in input_str:
-                if ch not in self.input_alphabet:
-                    steps.append((current_state, f"Ошибка: символ '{ch}' не входит в алфавит"))
-                    break
-                next_state, output = self.current_min_mealy[current_state][ch]
-                steps.append((next_state, f"При входе '{ch}': {current_state} -> {next_state}, вывод: {output}"))
-                current_state = next_state
-            steps.append((current_state, f"Итоговое состояние: {current_state}"))
-        else:
-            if not self.current_moore_transitions:
-                QtWidgets.QMessageBox.warning(self, "Ошибка", "Сначала постройте автомат")
-                return
-            current_state = self.current_moore_initial
-            steps = []
-            steps.append((current_state, f"Начальное состояние: {current_state}"))
-            for ch in input_str:
-                if ch not in self.input_alphabet:
-                    steps.append((current_state, f"Ошибка: символ '{ch}' не входит в алфавит"))
-                    break
-                try:
-                    next_state = self.current_moore_transitions[current_state][ch]
-                except KeyError:
-                    steps.append((current_state, f"Ошибка: нет перехода для '{ch}' в состоянии {current_state}"))
-                    break
-                steps.append((next_state, f"При входе '{ch}': {current_state} -> {next_state}"))
-                current_state = next_state
-            steps.append((current_state, f"Итоговое состояние: {current_state}"))
+        if self.get_simulator(sim_type) is None:
+            QtWidgets.QMessageBox.warning(self, "Ошибка", "Сначала постройте автомат")
+            return
+        steps, _ = self.run_simulation(sim_type, input_str, trace=True)
         self.simulation_steps = steps
         self.simulation_current_index = 0
         self.sim_log_text.clear()
@@ -947,6 +1379,36 @@ class MainWindow(QtWidgets.QMainWindow):
         self.simulation_timer.start(1000)
         self.sim_step_button.setEnabled(False)
 
+    def on_regression_check(self):
+        if not self.current_min_mealy:
+            QtWidgets.QMessageBox.warning(self, "Ошибка", "Сначала постройте автомат")
+            return
+        mealy = self.read_table()
+        if mealy is None:
+            return
+        try:
+            original = CompiledMachine.from_mealy(mealy, self.input_alphabet, self.initial_state)
+            minimized = self.get_simulator("Мили")
+            started = time.perf_counter()
+            # Все слова прогоняются синхронно, по одной операции NumPy на шаг
+            codes = original.random_words(REGRESSION_WORDS, REGRESSION_LENGTH)
+            mismatch = original.first_mismatch(minimized, codes)
+            elapsed = time.perf_counter() - started
+        except (RuntimeError, ValueError) as e:
+            QtWidgets.QMessageBox.warning(self, "Ошибка", f"Не удалось выполнить сверку: {e}")
+            return
+        log = [f"Сверка на {REGRESSION_WORDS} случайных словах длины {REGRESSION_LENGTH}: {elapsed:.2f} с"]
+        if mismatch is None:
+            log.append("Реакции минимизированного и исходного автоматов совпадают")
+        else:
+            word_index, position = mismatch
+            prefix = codes[word_index][:position + 1].tolist()
+            word = " ".join(original.alphabet[a] for a in prefix)
+            log.append(f"Расхождение на слове {word}: "
+                       f"исходный - {original.decode(original.run_codes(prefix)[0], ' ')}, "
+                       f"минимизированный - {minimized.decode(minimized.run_codes(prefix)[0], ' ')}")
+        self.sim_log_text.setPlainText("\n".join(log))
+
     def simulation_step(self):
         if self.simulation_current_index < len(self.simulation_steps):
             state, msg = self.simulation_steps[self.simulation_current_index]
@@ -986,15 +1448,30 @@ class MainWindow(QtWidgets.QMainWindow):
         QtWidgets.QMessageBox.information(self, "Статистика автомата", message)
 
 
-    def on_cell_changed(self, row, col):
+    def on_collapse_changed(self, index):
+        self.expanded_groups.clear()
+        self.expand_combo.clear()
+
+    def on_expand_group(self):
+        group = self.expand_combo.currentText()
+        if not group:
+            return
+        # Минимизация не меняется, поэтому перестройка идёт через инкрементальный путь
+        self.expanded_groups.add(group)
+        self.start_build(incremental=True)
+
+    def on_collapse_all(self):
+        if self.expanded_groups:
+            self.expanded_groups.clear()
+            self.start_build(incremental=True)
+
+    def on_cell_changed(self, *_):
         if self.live_preview_checkbox.isChecked():
-            self.table.blockSignals(True)
             self.live_preview_timer.start()
-            self.table.blockSignals(False)
 
     def on_live_preview(self):
         self.live_preview_timer.stop()
-        self.on_build()
+        self.start_build(incremental=True)
 
     def show_table_context_menu(self, pos):
         index = self.table.indexAt(pos)
@@ -1004,12 +1481,12 @@ class MainWindow(QtWidgets.QMainWindow):
             random_action = menu.addAction("Случайное значение")
             action = menu.exec_(self.table.viewport().mapToGlobal(pos))
             if action == clear_action:
-                self.table.setItem(index.row(), index.column(), QtWidgets.QTableWidgetItem(""))
+                self.table_model.set_cell(index.row(), index.column(), "")
             elif action == random_action:
                 possible_outputs = ["x", "y"]
-                dest = str(random.randint(1, self.num_states))
+                dest = random.choice(self.state_labels)
                 out = random.choice(possible_outputs)
-                self.table.setItem(index.row(), index.column(), QtWidgets.QTableWidgetItem(f"{dest},{out}"))
+                self.table_model.set_cell(index.row(), index.column(), f"{dest},{out}")
 
     def update_history_table(self):
         self.history_table.setRowCount(len(self.history))
@@ -1053,31 +1530,12 @@ class MainWindow(QtWidgets.QMainWindow):
             self.update_step_by_step_tab()
 
     def read_table(self):
-        mealy = {}
-        for state in range(1, self.num_states + 1):
-            mealy[str(state)] = {}
-            for j, letter in enumerate(self.input_alphabet):
-                item = self.table.item(state - 1, j)
-                if item is None or item.text().strip() == "":
-                    QtWidgets.QMessageBox.warning(self, "Ошибка ввода",
-                                                  f"Заполните ячейку для состояния {state}, вход '{letter}'.")
-                    return None
-                text = item.text().strip()
-                if ',' not in text:
-                    QtWidgets.QMessageBox.warning(self, "Ошибка ввода",
-                                                  f"Неверный формат в состоянии {state}, вход '{letter}'. Ожидается формат 'dest,out'.")
-                    return None
-                parts = text.split(',')
-                if len(parts) != 2:
-                    QtWidgets.QMessageBox.warning(self, "Ошибка ввода",
-                                                  f"Неверный формат в состоянии {state}, вход '{letter}'. Ожидается формат 'dest,out'.")
-                    return None
-                dest_str, out_str = parts[0].strip(), parts[1].strip()
-                if not dest_str or not out_str:
-                    QtWidgets.QMessageBox.warning(self, "Ошибка ввода",
-                                                  f"Неверный формат в состоянии {state}, вход '{letter}'. Пустое значение.")
-                    return None
-                mealy[str(state)][letter] = (dest_str, out_str)
+        mealy, error = self.table_model.to_mealy()
+        if error is not None:
+            row, col, message = error
+            self.table.setCurrentIndex(self.table_model.index(row, col))
+            QtWidgets.QMessageBox.warning(self, "Ошибка ввода", message)
+            return None
         return mealy
 
     def copy_report_to_clipboard(self):
@@ -1085,6 +1543,13 @@ class MainWindow(QtWidgets.QMainWindow):
         clipboard.setText(self.text_output.toPlainText())
         self.statusBar().showMessage("Отчёт скопирован в буфер обмена", 3000)
 
+    def closeEvent(self, event):
+        # Дожидаемся фоновых построений, чтобы не завершать процесс посреди рендера
+        if self.build_worker is not None:
+            self.build_worker.cancel()
+        QtCore.QThreadPool.globalInstance().waitForDone()
+        super().closeEvent(event)
+
 # =============================================================================
 # Запуск приложения
 # =============================================================================
@@ -0,0 +1,129 @@
+"""
+Чтение и запись автоматов Мили в текстовом формате таблицы.
+
+Формат тот же, что читает графическое приложение (open_file): строка i
+файла (без учёта пустых строк и строк-комментариев '#') описывает
+состояние i, ячейки разделены ';' и идут в порядке входного алфавита,
+каждая ячейка - 'dest,out'. Например, для алфавита ('a', 'b'):
+
+    2,x;3,y
+    1,y;3,x
+    3,x;3,x
+"""
+
+import os
+import string
+
+from mealy_core import state_sort_key
+
+DEFAULT_ALPHABET = ('a', 'b')
+
+
+def default_alphabet(size):
+    """
+    Алфавит по умолчанию для таблицы из size столбцов: 'a', 'b', ...
+    """
+    if size == len(DEFAULT_ALPHABET):
+        return DEFAULT_ALPHABET
+    if size > len(string.ascii_lowercase):
+        raise ValueError(f"Для таблицы из {size} столбцов нужно явно задать алфавит")
+    return tuple(string.ascii_lowercase[:size])
+
+
+def parse_mealy_table(lines, alphabet=None):
+    """
+    Разбирает строки таблицы. Возвращает (mealy, alphabet), где
+    mealy[state][letter] = (dest, out); состояния - '1', '2', ...
+    Если alphabet не задан, он выбирается по числу столбцов (default_alphabet).
+    """
+    rows = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        cells = [cell.strip() for cell in line.split(';')]
+        if cells and cells[-1] == '':
+            cells.pop()
+        rows.append((number, cells))
+    if not rows:
+        raise ValueError("Таблица автомата пуста")
+    if alphabet is None:
+        alphabet = default_alphabet(len(rows[0][1]))
+    alphabet = tuple(alphabet)
+    mealy = {}
+    for state, (number, cells) in enumerate(rows, 1):
+        if len(cells) != len(alphabet):
+            raise ValueError(f"Строка {number}: ожидается {len(alphabet)} ячеек, получено {len(cells)}")
+        row = {}
+        for letter, cell in zip(alphabet, cells):
+            parts = cell.split(',')
+            if len(parts) != 2 or not parts[0].strip() or not parts[1].strip():
+                raise ValueError(f"Строка {number}: неверная ячейка '{cell}', ожидается формат 'dest,out'")
+            row[letter] = (parts[0].strip(), parts[1].strip())
+        mealy[str(state)] = row
+    for state, row in mealy.items():
+        for letter, (dest, _) in row.items():
+            if dest not in mealy:
+                raise ValueError(f"Переход из {state} по '{letter}' ведёт в неизвестное состояние {dest}")
+    return mealy, alphabet
+
+
+def read_mealy_table(path, alphabet=None):
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_mealy_table(f, alphabet)
+
+
+def renumbered(mealy):
+    """
+    Тот же автомат с состояниями '1'..'n' в естественном порядке прежних имён
+    (например, после минимизации, где состояния названы представителями блоков).
+    """
+    order = sorted(mealy, key=state_sort_key)
+    new_name = {s: str(i) for i, s in enumerate(order, 1)}
+    return {new_name[s]: {letter: (new_name[dest], out) for letter, (dest, out) in mealy[s].items()}
+            for s in order}
+
+
+def format_mealy_table(mealy, alphabet):
+    """
+    Строки таблицы для автомата с состояниями '1'..'n' (порядок строк -
+    порядок номеров состояний).
+    """
+    if sorted(mealy, key=state_sort_key) != [str(i) for i in range(1, len(mealy) + 1)]:
+        raise ValueError("Состояния должны называться '1'..'n' (см. renumbered)")
+    return [";".join(f"{mealy[s][letter][0]},{mealy[s][letter][1]}" for letter in alphabet)
+            for s in sorted(mealy, key=int)]
+
+
+def write_mealy_table(path, mealy, alphabet):
+    with open(path, 'w', encoding='utf-8') as f:
+        for line in format_mealy_table(mealy, alphabet):
+            f.write(line + "\n")
+
+
+def format_moore_table(moore_states, moore_transitions, moore_initial, alphabet):
+    """
+    Строки таблицы автомата Мура: строка i описывает состояние i (начальное -
+    первое, остальные в порядке moore_states), ячейки - 'реакция;переход по
+    первому символу;...'. Первая строка - комментарий с именами состояний.
+    """
+    names = [moore_initial] + [name for name in moore_states.values() if name != moore_initial]
+    row_of = {name: str(i) for i, name in enumerate(names, 1)}
+    reaction_of = {name: reaction for (_, reaction), name in moore_states.items()}
+    lines = ["# " + " ".join(f"{row_of[name]}={name}" for name in names)]
+    for name in names:
+        cells = [reaction_of[name]] + [row_of[moore_transitions[name][letter]] for letter in alphabet]
+        lines.append(";".join(cells))
+    return lines
+
+
+def write_lines(path, lines):
+    """
+    Записывает строки через временный файл: прерванная запись не оставляет
+    недописанный файл под итоговым именем.
+    """
+    temp = f"{path}.tmp{os.getpid()}"
+    with open(temp, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line + "\n")
+    os.replace(temp, path)
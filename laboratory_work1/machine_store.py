@@ -0,0 +1,215 @@
+"""
+Двоичный формат файлов автоматов Мили для больших таблиц.
+
+Файл хранит IntMealy как есть: интернированные имена состояний, символов
+и реакций и плоские массивы int32 delta и out (порядок байт little-endian).
+При загрузке файл отображается в память (mmap), а массивы становятся
+представлениями memoryview над ним без копирования: загрузка не читает
+таблицы целиком, а симуляция (simulation.CompiledMachine) обращается к ним
+напрямую, и нужные страницы подгружает ОС. Минимизация и проверка
+эквивалентности строят собственные рабочие массивы того же порядка
+размера, что и таблицы, поэтому память под них всё же нужна.
+
+Структура файла:
+    заголовок   MAGIC, версия, флаги, k, n, число реакций, начальное состояние
+    имена       блоки строк UTF-8 через '\\0' (длина блока - uint64):
+                состояния (нет при FLAG_NUMBERED_STATES), символы, реакции
+    выравнивание до 8 байт
+    delta       n * k значений int32
+    out         n * k значений int32
+
+Состояния с именами '1'..'n' (FLAG_NUMBERED_STATES) не хранятся и
+загружаются как mealy_core.NumberedStates.
+
+Текстовый формат 'dest,out;...' (machine_io) конвертируется в двоичный
+построчно, без промежуточного словаря mealy[state][letter].
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from machine_io import default_alphabet
+from mealy_core import IntMealy, NumberedStates, np
+
+MAGIC = b"TAFLMEAL"
+VERSION = 1
+FLAG_NUMBERED_STATES = 1
+
+_HEADER = struct.Struct("<8sHHIQQQ")
+_LENGTH = struct.Struct("<Q")
+_ALIGN = 8
+
+
+def _is_numbered(states):
+    return isinstance(states, NumberedStates) or all(name == str(i) for i, name in enumerate(states, 1))
+
+
+def _names_block(names):
+    data = "\0".join(names).encode('utf-8')
+    return _LENGTH.pack(len(data)) + data
+
+
+def _little_endian(table):
+    # Массивы в файле всегда little-endian
+    if sys.byteorder == 'little':
+        return table
+    swapped = array('i', table)
+    swapped.byteswap()
+    return swapped
+
+
+def save_machine(path, machine):
+    """
+    Записывает автомат IntMealy в двоичный файл (через временный файл).
+    """
+    numbered = _is_numbered(machine.states)
+    header = _HEADER.pack(MAGIC, VERSION, FLAG_NUMBERED_STATES if numbered else 0, machine.n_symbols,
+                          machine.n_states, len(machine.outputs), machine.initial)
+    names = b"".join(([] if numbered else [_names_block(machine.states)])
+                     + [_names_block(machine.alphabet), _names_block(machine.outputs)])
+    padding = -(len(header) + len(names)) % _ALIGN
+    temp = f"{path}.tmp{os.getpid()}"
+    with open(temp, 'wb') as f:
+        f.write(header)
+        f.write(names)
+        f.write(b"\0" * padding)
+        f.write(_little_endian(machine.delta))
+        f.write(_little_endian(machine.out))
+    os.replace(temp, path)
+
+
+def is_binary_machine(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_machine(path, check=True):
+    """
+    Загружает автомат из двоичного файла. Таблицы delta и out - memoryview
+    над отображённым в память файлом (на little-endian платформе без копирования).
+    При check проверяется, что переходы и реакции не выходят за диапазоны.
+    """
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < _HEADER.size:
+        raise ValueError(f"{path}: файл слишком короткий")
+    magic, version, flags, k, n, n_outputs, initial = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: не является двоичным файлом автомата")
+    if version != VERSION:
+        raise ValueError(f"{path}: неподдерживаемая версия формата {version}")
+
+    offset = _HEADER.size
+
+    def read_names(count):
+        nonlocal offset
+        (size,) = _LENGTH.unpack_from(buffer, offset)
+        offset += _LENGTH.size
+        data = buffer[offset:offset + size].decode('utf-8')
+        offset += size
+        names = data.split("\0") if count else []
+        if len(names) != count:
+            raise ValueError(f"{path}: повреждена таблица имён")
+        return names
+
+    states = NumberedStates(n) if flags & FLAG_NUMBERED_STATES else read_names(n)
+    alphabet = read_names(k)
+    outputs = read_names(n_outputs)
+    offset += -offset % _ALIGN
+    size = n * k * 4
+    if len(buffer) != offset + 2 * size:
+        raise ValueError(f"{path}: размер файла не соответствует заголовку")
+    view = memoryview(buffer)
+    delta = view[offset:offset + size].cast('i')
+    out = view[offset + size:offset + 2 * size].cast('i')
+    if sys.byteorder != 'little':
+        delta, out = _little_endian(delta), _little_endian(out)
+    if check and size:
+        if np is not None:
+            low_d, high_d = int(np.frombuffer(delta, dtype=np.intc).min()), int(np.frombuffer(delta, dtype=np.intc).max())
+            low_o, high_o = int(np.frombuffer(out, dtype=np.intc).min()), int(np.frombuffer(out, dtype=np.intc).max())
+        else:
+            low_d, high_d, low_o, high_o = min(delta), max(delta), min(out), max(out)
+        if low_d < 0 or high_d >= n or low_o < 0 or high_o >= n_outputs or not 0 <= initial < n:
+            raise ValueError(f"{path}: номера состояний или реакций вне допустимого диапазона")
+    return IntMealy(states, alphabet, outputs, delta, out, initial)
+
+
+# =============================================================================
+# Конвертеры из/в текстовый формат
+# =============================================================================
+
+def read_text_machine(path, alphabet=None):
+    """
+    Читает текстовую таблицу (формат machine_io) сразу в IntMealy
+    с состояниями NumberedStates; начальное состояние - '1'.
+    """
+    delta = array('i')
+    out = array('i')
+    output_index = {}
+    rows = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            cells = line.split(';')
+            if cells[-1].strip() == '':
+                cells.pop()
+            if alphabet is None:
+                alphabet = default_alphabet(len(cells))
+            if len(cells) != len(alphabet):
+                raise ValueError(f"Строка {number}: ожидается {len(alphabet)} ячеек, получено {len(cells)}")
+            for cell in cells:
+                parts = cell.split(',')
+                dest = parts[0].strip()
+                reaction = parts[-1].strip()
+                if len(parts) != 2 or not dest.isdigit() or not reaction or dest != str(int(dest)):
+                    raise ValueError(f"Строка {number}: неверная ячейка '{cell.strip()}', ожидается формат 'dest,out'")
+                delta.append(int(dest) - 1)
+                o = output_index.get(reaction)
+                if o is None:
+                    o = output_index[reaction] = len(output_index)
+                out.append(o)
+            rows += 1
+    if not rows:
+        raise ValueError("Таблица автомата пуста")
+    k = len(alphabet)
+    for i, t in enumerate(delta):
+        if not 0 <= t < rows:
+            raise ValueError(f"Переход из {i // k + 1} по '{alphabet[i % k]}' ведёт в неизвестное состояние {t + 1}")
+    return IntMealy(NumberedStates(rows), alphabet, list(output_index), delta, out)
+
+
+def write_text_machine(path, machine):
+    """
+    Записывает IntMealy в текстовый формат. Строки нумеруются заново:
+    первая - начальное состояние, остальные - в порядке machine.states.
+    """
+    n, k = machine.n_states, machine.n_symbols
+    order = [machine.initial] + [s for s in range(n) if s != machine.initial]
+    row_of = array('i', [0]) * n
+    for row, s in enumerate(order, 1):
+        row_of[s] = row
+    delta, out, outputs = machine.delta, machine.out, machine.outputs
+    temp = f"{path}.tmp{os.getpid()}"
+    with open(temp, 'w', encoding='utf-8') as f:
+        for s in order:
+            base = s * k
+            f.write(";".join(f"{row_of[delta[base + a]]},{outputs[out[base + a]]}" for a in range(k)) + "\n")
+    os.replace(temp, path)
+
+
+def load_any(path, alphabet=None):
+    """
+    Автомат из двоичного или текстового файла (формат определяется по содержимому).
+    """
+    if is_binary_machine(path):
+        machine = load_machine(path)
+        if alphabet is not None and tuple(alphabet) != machine.alphabet:
+            raise ValueError(f"{path}: алфавит файла {machine.alphabet} не совпадает с заданным")
+        return machine
+    return read_text_machine(path, alphabet)
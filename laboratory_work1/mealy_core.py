@@ -0,0 +1,235 @@
+"""
+Компактное представление автомата Мили с целочисленной индексацией.
+
+Имена состояний, входные символы и выходные реакции интернируются в целые
+числа один раз при загрузке, а таблицы переходов и выходов хранятся
+в плоских массивах int32 (array('i')). Так автомат на миллион состояний
+занимает десятки мегабайт вместо гигабайт вложенных словарей и кортежей,
+а алгоритмы работают с индексами и не сортируют имена повторно.
+
+Таблицы могут быть и представлениями memoryview над отображённым в память
+файлом (machine_store.py): тогда они не копируются, а состояния с именами
+'1'..'n' задаются без списка строк (NumberedStates).
+"""
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: ядро работает на array('i')
+    np = None
+
+
+def state_sort_key(name):
+    """
+    Естественный порядок имён состояний: числовые имена по значению,
+    остальные - после них, по строке.
+    """
+    return (0, int(name), '') if name.isdigit() else (1, 0, name)
+
+
+def _intern(names):
+    return {name: i for i, name in enumerate(names)}
+
+
+class NumberedStates:
+    """
+    Имена состояний '1'..'n' без хранения списка строк: i-е имя - str(i + 1).
+    """
+
+    __slots__ = ('n',)
+
+    def __init__(self, n):
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [str(j + 1) for j in range(*i.indices(self.n))]
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError("номер состояния вне диапазона")
+        return str(i + 1)
+
+    def __iter__(self):
+        return map(str, range(1, self.n + 1))
+
+    def __eq__(self, other):
+        if isinstance(other, NumberedStates):
+            return self.n == other.n
+        return len(other) == self.n and all(a == b for a, b in zip(self, other))
+
+    def index(self, name):
+        i = int(name) - 1 if name.isdigit() else -1
+        if not 0 <= i < self.n or str(i + 1) != name:
+            raise ValueError(f"{name} не является состоянием")
+        return i
+
+
+# =============================================================================
+# Автомат Мили на целочисленных массивах
+# =============================================================================
+
+class IntMealy:
+    """
+    Автомат Мили с интернированными состояниями, символами и реакциями.
+
+    Таблицы хранятся построчно (n_states x n_symbols):
+        delta[s * k + a] - номер состояния, в которое ведёт переход,
+        out[s * k + a]   - номер выходной реакции,
+    где k - размер входного алфавита.
+    """
+
+    __slots__ = ('states', 'alphabet', 'outputs', 'delta', 'out', 'initial',
+                 '_state_index', '_symbol_index', '_output_index')
+
+    def __init__(self, states, alphabet, outputs, delta, out, initial=0):
+        self.states = states if isinstance(states, NumberedStates) else list(states)
+        self.alphabet = tuple(alphabet)
+        self.outputs = list(outputs)
+        # array('i') и memoryview формата 'i' (отображённый файл) используются без копирования
+        self.delta = delta if isinstance(delta, (array, memoryview)) else array('i', delta)
+        self.out = out if isinstance(out, (array, memoryview)) else array('i', out)
+        self.initial = initial
+        size = len(self.states) * len(self.alphabet)
+        if len(self.delta) != size or len(self.out) != size:
+            raise ValueError("Размер таблиц не соответствует числу состояний и символов")
+        # Словарь имён состояний строится при первом обращении
+        self._state_index = None
+        self._symbol_index = _intern(self.alphabet)
+        self._output_index = _intern(self.outputs)
+
+    # ------------------------------------------------------------------ #
+    # Конвертеры из/в словарный формат mealy[state][letter] = (dest, out)
+    # ------------------------------------------------------------------ #
+
+    @classmethod
+    def from_dict(cls, mealy_dict, alphabet, initial=None):
+        """
+        Строит автомат из словаря mealy[state][letter] = (dest, out).
+        Состояния упорядочиваются естественным порядком (state_sort_key)
+        один раз; начальное состояние по умолчанию - первое в этом порядке.
+        """
+        states = sorted(mealy_dict, key=state_sort_key)
+        state_index = _intern(states)
+        output_index = {}
+        delta = array('i')
+        out = array('i')
+        for s in states:
+            row = mealy_dict[s]
+            for letter in alphabet:
+                dest, reaction = row[letter]
+                try:
+                    delta.append(state_index[dest])
+                except KeyError:
+                    raise ValueError(f"Переход из {s} по '{letter}' ведёт в неизвестное состояние {dest}") from None
+                o = output_index.get(reaction)
+                if o is None:
+                    o = output_index[reaction] = len(output_index)
+                out.append(o)
+        initial_index = state_index[initial] if initial is not None else 0
+        return cls(states, alphabet, list(output_index), delta, out, initial_index)
+
+    def to_dict(self):
+        """
+        Обратное преобразование в словарь mealy[state][letter] = (dest, out).
+        """
+        k = len(self.alphabet)
+        states, outputs = self.states, self.outputs
+        mealy = {}
+        for s, name in enumerate(states):
+            base = s * k
+            mealy[name] = {
+                letter: (states[self.delta[base + a]], outputs[self.out[base + a]])
+                for a, letter in enumerate(self.alphabet)
+            }
+        return mealy
+
+    # ------------------------------------------------------------------ #
+    # Доступ к данным
+    # ------------------------------------------------------------------ #
+
+    @property
+    def n_states(self):
+        return len(self.states)
+
+    @property
+    def n_symbols(self):
+        return len(self.alphabet)
+
+    def state_index(self, name):
+        if isinstance(self.states, NumberedStates):
+            try:
+                return self.states.index(name)
+            except ValueError:
+                raise KeyError(name) from None
+        if self._state_index is None:
+            self._state_index = _intern(self.states)
+        return self._state_index[name]
+
+    def symbol_index(self, letter):
+        return self._symbol_index[letter]
+
+    def output_index(self, reaction):
+        return self._output_index[reaction]
+
+    def successor(self, s, a):
+        return self.delta[s * len(self.alphabet) + a]
+
+    def output(self, s, a):
+        return self.out[s * len(self.alphabet) + a]
+
+    def column(self, table, a):
+        """
+        Столбец таблицы (delta или out) для символа с номером a.
+        """
+        return table[a::len(self.alphabet)]
+
+    def as_numpy(self):
+        """
+        Представления delta и out в виде матриц NumPy (n_states, n_symbols)
+        без копирования данных.
+        """
+        if np is None:
+            raise RuntimeError("Для as_numpy() требуется NumPy")
+        shape = (len(self.states), len(self.alphabet))
+        delta = np.frombuffer(self.delta, dtype=np.intc).reshape(shape)
+        out = np.frombuffer(self.out, dtype=np.intc).reshape(shape)
+        return delta, out
+
+    # ------------------------------------------------------------------ #
+    # Фактор-автомат по разбиению
+    # ------------------------------------------------------------------ #
+
+    def quotient(self, block_of):
+        """
+        Строит фактор-автомат по разбиению block_of[s] = номер блока.
+        Представитель блока - его первое состояние в порядке self.states;
+        блоки нумеруются по возрастанию представителей.
+
+        Возвращает (min_machine, rep_of), где rep_of[s] - номер состояния
+        фактор-автомата, в которое попало состояние s.
+        """
+        k = len(self.alphabet)
+        renumber = {}
+        reps = []
+        rep_of = array('i', [0]) * len(self.states)
+        for s, b in enumerate(block_of):
+            r = renumber.get(b)
+            if r is None:
+                r = renumber[b] = len(reps)
+                reps.append(s)
+            rep_of[s] = r
+        delta = array('i')
+        out = array('i')
+        for s in reps:
+            base = s * k
+            for a in range(k):
+                delta.append(rep_of[self.delta[base + a]])
+                out.append(self.out[base + a])
+        min_machine = IntMealy([self.states[s] for s in reps], self.alphabet, self.outputs,
+                               delta, out, rep_of[self.initial])
+        return min_machine, rep_of
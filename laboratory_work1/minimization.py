@@ -0,0 +1,344 @@
+"""
+Движок минимизации автомата Мили уточнением разбиений по Хопкрофту.
+
+Вместо полного пересчёта подписей всех блоков на каждом раунде
+(refine_blocks) используется очередь "расщепителей" (блок, входной символ):
+обрабатываются только прообразы блока-расщепителя, а в очередь попадает
+меньшая из двух половин расщеплённого блока. Итоговая сложность
+O(n * k * log n), где n - число состояний, k - размер алфавита.
+
+Дополнительно есть векторизованный режим на NumPy: каждый раунд
+классического уточнения выполняется одним проходом над матрицей
+переходов (n_states, n_symbols) и даёт те же разбиения, что и refine_blocks.
+
+IncrementalMinimizer пересчитывает разбиение после правок таблицы,
+затрагивая только состояния, на поведение которых правки могли повлиять.
+"""
+
+import threading
+from array import array
+from collections import deque
+
+from mealy_core import IntMealy, np
+
+
+# =============================================================================
+# Вспомогательные функции
+# =============================================================================
+
+def _inverse_transitions(succ, n):
+    """
+    Строит обратные переходы в компактном виде (CSR) для одного символа:
+    прообраз состояния t - это src[start[t]:start[t + 1]].
+    """
+    start = [0] * (n + 1)
+    for t in succ:
+        start[t + 1] += 1
+    for t in range(n):
+        start[t + 1] += start[t]
+    fill = start[:-1]
+    src = [0] * n
+    for s, t in enumerate(succ):
+        src[fill[t]] = s
+        fill[t] += 1
+    return start, src
+
+
+def _snapshot(blocks, states):
+    """
+    Снимок текущего разбиения для пошагового режима: блоки в виде списков
+    имён состояний в порядке их нумерации.
+    """
+    return [[states[i] for i in sorted(block)] for block in blocks]
+
+
+# =============================================================================
+# Алгоритм Хопкрофта
+# =============================================================================
+
+def hopcroft_blocks(machine, record_iterations=True):
+    """
+    Уточнение разбиения по Хопкрофту для автомата IntMealy.
+
+    Возвращает:
+      1) Список блоков (множества номеров состояний)
+      2) block_of - номер блока для каждого состояния
+      3) iteration_info - промежуточные разбиения (имена состояний): начальное
+         и после каждого раунда, в котором блоки расщеплялись; пустой,
+         если record_iterations=False
+
+    Раунд - один проход по очереди расщепителей: обрабатываются все
+    расщепители, поставленные в очередь до начала раунда, а новые попадают
+    в следующий раунд. Снимок делается раз за раунд (O(n)), а не после
+    каждого расщепления, поэтому запись итераций не меняет асимптотику.
+    """
+    n = machine.n_states
+    k = machine.n_symbols
+
+    # Начальное разбиение по выходным реакциям
+    blocks = []
+    block_of = [0] * n
+    by_signature = {}
+    out = machine.out
+    for i in range(n):
+        signature = tuple(out[i * k:(i + 1) * k])
+        b = by_signature.get(signature)
+        if b is None:
+            b = by_signature[signature] = len(blocks)
+            blocks.append(set())
+        blocks[b].add(i)
+        block_of[i] = b
+
+    iteration_info = []
+    if record_iterations:
+        iteration_info.append(_snapshot(blocks, machine.states))
+
+    inverse = [_inverse_transitions(machine.column(machine.delta, a), n) for a in range(k)]
+
+    # Очередь расщепителей: для каждого символа все блоки, кроме наибольшего
+    pending = deque()
+    in_pending = [bytearray(n) for _ in range(k)]
+    if blocks:
+        largest = max(range(len(blocks)), key=lambda b: len(blocks[b]))
+        for a in range(k):
+            for b in range(len(blocks)):
+                if b != largest:
+                    pending.append((b, a))
+                    in_pending[a][b] = 1
+
+    round_left = len(pending)
+    split = False
+    while pending:
+        splitter, a = pending.popleft()
+        in_pending[a][splitter] = 0
+        round_left -= 1
+        start, src = inverse[a]
+
+        # Группируем прообраз расщепителя по блокам, в которые он попадает
+        touched = {}
+        for t in blocks[splitter]:
+            for s in src[start[t]:start[t + 1]]:
+                touched.setdefault(block_of[s], []).append(s)
+
+        for b, members in touched.items():
+            block = blocks[b]
+            if len(members) == len(block):
+                continue
+            new_b = len(blocks)
+            new_block = set(members)
+            block.difference_update(new_block)
+            blocks.append(new_block)
+            for s in members:
+                block_of[s] = new_b
+            for c in range(k):
+                if in_pending[c][b] or len(new_block) <= len(block):
+                    pending.append((new_b, c))
+                    in_pending[c][new_b] = 1
+                else:
+                    pending.append((b, c))
+                    in_pending[c][b] = 1
+            split = True
+
+        if not round_left:
+            if split and record_iterations:
+                iteration_info.append(_snapshot(blocks, machine.states))
+            round_left = len(pending)
+            split = False
+
+    return blocks, block_of, iteration_info
+
+
+# =============================================================================
+# Векторизованное уточнение (NumPy)
+# =============================================================================
+
+def _dense_labels(rows):
+    """
+    Нумерует одинаковые строки матрицы rows, номера классов идут в порядке
+    первого появления строки. Возвращает (labels, число классов).
+    """
+    if not rows.shape[1]:
+        # Пустой алфавит: все строки одинаковы
+        return np.zeros(len(rows), dtype=np.intp), 1
+    # Устойчивая лексикографическая сортировка строк (первый столбец - главный ключ)
+    order = np.lexsort(rows.T[::-1])
+    sorted_rows = rows[order]
+    starts = np.empty(len(order), dtype=bool)
+    starts[0] = True
+    np.any(sorted_rows[1:] != sorted_rows[:-1], axis=1, out=starts[1:])
+    group = np.cumsum(starts) - 1
+    # Первый элемент каждой группы в устойчивом порядке - её наименьший номер строки
+    first = order[starts]
+    rank = np.empty(len(first), dtype=np.intp)
+    rank[np.argsort(first)] = np.arange(len(first))
+    labels = np.empty(len(order), dtype=np.intp)
+    labels[order] = rank[group]
+    return labels, len(first)
+
+
+def _blocks_from_labels(labels, count):
+    order = np.argsort(labels, kind='stable')
+    bounds = np.cumsum(np.bincount(labels, minlength=count))[:-1]
+    return [set(part.tolist()) for part in np.split(order, bounds)]
+
+
+def numpy_blocks(machine, record_iterations=True):
+    """
+    Уточнение разбиения раундами, как в refine_blocks, но каждый раунд -
+    это сборка матрицы подписей (текущий блок, блоки приёмников по всем
+    символам) и группировка её строк одной лексикографической сортировкой.
+
+    Возвращает то же, что hopcroft_blocks; iteration_info совпадает
+    с раундами классического алгоритма.
+    """
+    if np is None:
+        raise RuntimeError("Для векторизованной минимизации требуется NumPy")
+    if machine.n_states == 0:
+        return [], [], []
+    delta, out = machine.as_numpy()
+    labels, count = _dense_labels(out)
+    iteration_info = []
+    if record_iterations:
+        iteration_info.append(_snapshot(_blocks_from_labels(labels, count), machine.states))
+    while True:
+        signature = np.concatenate((labels[:, None], labels[delta]), axis=1)
+        new_labels, new_count = _dense_labels(signature)
+        if new_count == count:
+            break
+        labels, count = new_labels, new_count
+        if record_iterations:
+            iteration_info.append(_snapshot(_blocks_from_labels(labels, count), machine.states))
+    return _blocks_from_labels(labels, count), labels.tolist(), iteration_info
+
+
+ENGINES = {
+    'hopcroft': hopcroft_blocks,
+    'numpy': numpy_blocks,
+}
+
+
+def minimize_int(machine, record_iterations=False, method='hopcroft'):
+    """
+    Минимизирует автомат IntMealy выбранным движком (см. ENGINES).
+
+    Возвращает (min_machine, rep_of, blocks, iteration_info), где rep_of[s] -
+    номер состояния минимального автомата для состояния s исходного.
+    """
+    try:
+        engine = ENGINES[method]
+    except KeyError:
+        raise ValueError(f"Неизвестный метод минимизации: {method}") from None
+    blocks, block_of, iteration_info = engine(machine, record_iterations)
+    min_machine, rep_of = machine.quotient(block_of)
+    return min_machine, rep_of, blocks, iteration_info
+
+
+# =============================================================================
+# Инкрементальная минимизация
+# =============================================================================
+
+class IncrementalMinimizer:
+    """
+    Повторная минимизация автомата после точечных правок таблицы.
+
+    Хранит последний автомат и его разбиение. Состояния, из которых
+    изменённые строки недостижимы, образуют замкнутое по переходам
+    подмножество с прежним поведением, поэтому их прежние классы
+    эквивалентности остаются верными. Такие классы сворачиваются в одно
+    состояние, и алгоритм Хопкрофта запускается на автомате из свёрнутых
+    классов и затронутых состояний.
+    """
+
+    def __init__(self):
+        self.machine = None
+        self.block_of = None
+        self._result = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.machine = self.block_of = self._result = None
+
+    def update(self, machine):
+        """
+        Минимизирует новую версию автомата с учётом предыдущей.
+
+        Возвращает (min_machine, rep_of, blocks, changed), где changed -
+        False, если минимальный автомат совпадает с полученным в прошлый раз.
+        """
+        with self._lock:
+            previous = self.machine
+            if (previous is not None and previous.states == machine.states
+                    and previous.alphabet == machine.alphabet and previous.outputs == machine.outputs):
+                if previous.delta == machine.delta and previous.out == machine.out:
+                    min_machine, rep_of, blocks = self._result
+                    return min_machine, rep_of, blocks, False
+                block_of = self._refine_changed(machine)
+            else:
+                block_of = None
+            if block_of is None:
+                _, block_of, _ = hopcroft_blocks(machine, record_iterations=False)
+            min_machine, rep_of = machine.quotient(block_of)
+            old = self._result[0] if self._result is not None else None
+            changed = (old is None or old.states != min_machine.states or old.delta != min_machine.delta
+                       or old.out != min_machine.out or old.initial != min_machine.initial)
+            blocks = {}
+            for s, b in enumerate(block_of):
+                blocks.setdefault(b, set()).add(s)
+            self.machine, self.block_of = machine, list(block_of)
+            self._result = (min_machine, rep_of, list(blocks.values()))
+            return min_machine, rep_of, self._result[2], changed
+
+    def _refine_changed(self, machine):
+        """
+        Разбиение нового автомата по прежнему; None, если сжатие
+        почти ничего не даёт и выгоднее полный пересчёт.
+        """
+        previous = self.machine
+        n, k = machine.n_states, machine.n_symbols
+
+        # Состояния с изменёнными строками и все, кто может до них дойти
+        affected = bytearray(n)
+        stack = []
+        for s in range(n):
+            row = slice(s * k, (s + 1) * k)
+            if machine.delta[row] != previous.delta[row] or machine.out[row] != previous.out[row]:
+                affected[s] = 1
+                stack.append(s)
+        inverse = [_inverse_transitions(machine.column(machine.delta, a), n) for a in range(k)]
+        while stack:
+            t = stack.pop()
+            for start, src in inverse:
+                for s in src[start[t]:start[t + 1]]:
+                    if not affected[s]:
+                        affected[s] = 1
+                        stack.append(s)
+
+        # Узлы сжатого автомата: затронутые состояния по одному,
+        # незатронутые - по одному на прежний блок
+        node_of = [0] * n
+        members = []
+        by_old_block = {}
+        for s in range(n):
+            if affected[s]:
+                node_of[s] = len(members)
+                members.append(s)
+            else:
+                b = self.block_of[s]
+                node = by_old_block.get(b)
+                if node is None:
+                    node = by_old_block[b] = len(members)
+                    members.append(s)
+                node_of[s] = node
+        if 2 * len(members) > n:
+            return None
+        delta = array('i')
+        out = array('i')
+        for s in members:
+            for a in range(k):
+                delta.append(node_of[machine.delta[s * k + a]])
+                out.append(machine.out[s * k + a])
+        compressed = IntMealy([machine.states[s] for s in members], machine.alphabet,
+                              machine.outputs, delta, out)
+        _, node_block, _ = hopcroft_blocks(compressed, record_iterations=False)
+        return [node_block[node_of[s]] for s in range(n)]
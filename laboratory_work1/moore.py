@@ -0,0 +1,45 @@
+"""
+Преобразование автомата Мили в автомат Мура по стандартному алгоритму.
+
+Каждое состояние Мили s расщепляется на копии (s, r) по реакциям r,
+с которыми в s можно войти; переход Мили q --a/r--> p становится
+переходом (q, *) --a--> (p, r), а отметка копии - реакция r.
+Состояние без входящих переходов получает одну копию с первой реакцией
+автомата. Начальное состояние Мура - копия начального состояния Мили
+с наименьшей реакцией (отметка начального состояния на выход не влияет).
+"""
+
+from mealy_core import state_sort_key
+
+
+def moore_name(state, reaction):
+    return f"{state},{reaction}"
+
+
+def mealy_to_moore(mealy, alphabet, initial):
+    """
+    mealy[state][letter] = (dest, out) -> (moore_states, moore_transitions, moore_initial):
+    moore_states[(state, reaction)] = имя, moore_transitions[имя][letter] = имя.
+    Копии перечисляются в естественном порядке состояний и по возрастанию реакций.
+    """
+    reactions = {s: set() for s in mealy}
+    first_reaction = None
+    for s in mealy:
+        for letter in alphabet:
+            dest, out = mealy[s][letter]
+            reactions[dest].add(out)
+            if first_reaction is None:
+                first_reaction = out
+
+    moore_states = {}
+    for s in sorted(mealy, key=state_sort_key):
+        for r in sorted(reactions[s]) or [first_reaction]:
+            moore_states[(s, r)] = moore_name(s, r)
+
+    moore_transitions = {}
+    for (q, _), name in moore_states.items():
+        row = mealy[q]
+        moore_transitions[name] = {letter: moore_states[row[letter]] for letter in alphabet}
+
+    moore_initial = next(name for (s, _), name in moore_states.items() if s == initial)
+    return moore_states, moore_transitions, moore_initial
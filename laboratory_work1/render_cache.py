@@ -0,0 +1,112 @@
+"""
+Кэш отрисованных графов автоматов в папке data.
+
+Ключ записи - SHA-256 от DOT-описания графа, формата вывода и программы
+раскладки. DOT-описание содержит и сам автомат (узлы и рёбра
+в детерминированном порядке), и все параметры отрисовки (dpi, размеры,
+стили), поэтому одинаковые автоматы с одинаковыми настройками
+отрисовываются только один раз.
+
+Файлы кэша называются <имя>_<ключ>.<формат>. Каждое попадание обновляет
+время изменения файла, и при превышении лимитов по числу файлов или
+суммарному размеру удаляются давно не использованные записи (LRU).
+"""
+
+import hashlib
+import os
+import re
+import threading
+import uuid
+
+KEY_LENGTH = 16
+_ENTRY_RE = re.compile(r'_[0-9a-f]{%d}\.\w+$' % KEY_LENGTH)
+
+
+class RenderCache:
+    """
+    Кэш отрисовки graphviz-графов.
+
+    directory   - папка с файлами кэша
+    max_entries - наибольшее число файлов в кэше
+    max_bytes   - наибольший суммарный размер файлов кэша
+    hits/misses - счётчики попаданий и промахов
+    """
+
+    def __init__(self, directory="data", max_entries=200, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(graph):
+        # Программа раскладки не входит в DOT-описание, поэтому учитывается отдельно
+        digest = hashlib.sha256()
+        digest.update(f"{graph.format}\0{graph.engine}\0".encode())
+        digest.update(graph.source.encode('utf-8'))
+        return digest.hexdigest()[:KEY_LENGTH]
+
+    def render(self, graph, name):
+        """
+        Отрисовывает граф или берёт готовый файл из кэша.
+        Возвращает путь без расширения (файл - путь + '.' + формат).
+        """
+        base = os.path.join(self.directory, f"{name}_{self.key(graph)}")
+        target = f"{base}.{graph.format}"
+        if os.path.exists(target):
+            try:
+                os.utime(target)
+            except OSError:
+                pass
+            else:
+                with self._lock:
+                    self.hits += 1
+                return base
+        # Рендер во временный файл: параллельное построение того же графа
+        # не увидит недописанный файл
+        temp = f"{base}.{uuid.uuid4().hex}"
+        graph.render(temp, view=False, cleanup=True)
+        os.replace(f"{temp}.{graph.format}", target)
+        with self._lock:
+            self.misses += 1
+            self._evict(keep=target)
+        return base
+
+    def entries(self):
+        """
+        Файлы кэша в виде списка (время использования, размер, путь).
+        """
+        result = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and _ENTRY_RE.search(entry.name):
+                stat = entry.stat()
+                result.append((stat.st_mtime, stat.st_size, entry.path))
+        return result
+
+    def _evict(self, keep=None):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            count -= 1
+            total -= size
+
+    def stats(self):
+        entries = self.entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
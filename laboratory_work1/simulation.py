@@ -0,0 +1,277 @@
+"""
+Пакетная симуляция автоматов Мили и Мура на целочисленных таблицах.
+
+Автомат один раз компилируется в плоские таблицы (как в mealy_core.IntMealy):
+номер следующего состояния delta[i] и номер реакции out[i] для
+i = s * k + a. Таблицы из mealy_core.IntMealy (в том числе memoryview над
+отображённым в память файлом, machine_store) используются без копирования. Входное слово переводится в номера символов одной
+операцией str.translate, после чего вся последовательность прогоняется
+в коротком цикле без словарей, кортежей и проверок алфавита на каждом шаге.
+Для автомата Мура реакция перехода - отметка состояния, в которое он ведёт.
+
+Протокол шагов (trace) собирается только по запросу.
+
+Для множества входных слов одинаковой длины есть пакетный режим на NumPy:
+N копий автомата продвигаются синхронно, и каждый шаг - одна операция
+индексирования таблиц массивом текущих состояний всех копий.
+"""
+
+from array import array
+
+from mealy_core import IntMealy, NumberedStates, np
+
+# Номер-заглушка для символов вне алфавита после перекодировки входа;
+# алфавит из _INVALID и более символов кодируется в array('i') вместо bytes
+_INVALID = 255
+
+
+class SimulationError(ValueError):
+    """
+    Символ входного слова не входит в алфавит; position - его номер (с нуля).
+    """
+
+    def __init__(self, message, position):
+        super().__init__(message)
+        self.position = position
+
+
+class SimulationResult:
+    """
+    Результат прогона входной последовательности.
+
+    outputs     - выходное слово (реакции, склеенные через separator)
+    final_state - имя состояния после последнего символа
+    steps       - число обработанных символов
+    trace       - список (состояние, символ, следующее состояние, реакция)
+                  или None, если протокол не запрашивался
+    """
+
+    def __init__(self, outputs, final_state, steps, trace=None):
+        self.outputs = outputs
+        self.final_state = final_state
+        self.steps = steps
+        self.trace = trace
+
+
+class CompiledMachine:
+    """
+    Автомат, скомпилированный для пакетной симуляции.
+
+    states   - имена состояний, alphabet - входные символы,
+    outputs  - имена реакций, initial - номер начального состояния;
+    delta[s * k + a] - номер следующего состояния,
+    out[s * k + a]   - номер реакции.
+    """
+
+    def __init__(self, states, alphabet, outputs, delta, out, initial=0):
+        self.states = states if isinstance(states, NumberedStates) else list(states)
+        self.alphabet = tuple(alphabet)
+        self.outputs = list(outputs)
+        k = len(self.alphabet)
+        self._wide = k >= _INVALID
+        self.delta = delta if isinstance(delta, (array, memoryview)) else array('i', delta)
+        self.out = out if isinstance(out, (array, memoryview)) else array('i', out)
+        self.initial = initial
+        self._symbol_index = {letter: a for a, letter in enumerate(self.alphabet)}
+        # Таблица перекодировки входной строки в номера символов (для односимвольного алфавита)
+        # (символы вне latin-1 заменяются на '?', поэтому его код не должен быть номером символа)
+        self._single_char = k < ord('?') and all(len(letter) == 1 for letter in self.alphabet)
+        self._translate = {}
+        self._valid = b''
+        if self._single_char:
+            self._translate = {code: _INVALID for code in range(k)}
+            for a, letter in enumerate(self.alphabet):
+                self._translate[ord(letter)] = a
+            self._valid = bytes(range(k))
+        # Если реакций не больше 256, их номера пишутся в bytearray, а выходное слово
+        # из однобуквенных реакций собирается одной перекодировкой bytes.translate
+        self._byte_outputs = len(self.outputs) <= 256
+        self._output_table = None
+        if self._byte_outputs and all(len(o) == 1 and ord(o) < 256 for o in self.outputs):
+            self._output_table = bytes(ord(o) for o in self.outputs).ljust(256, b'\0')
+
+    # ------------------------------------------------------------------ #
+
+    @classmethod
+    def from_int_mealy(cls, machine):
+        return cls(machine.states, machine.alphabet, machine.outputs, machine.delta, machine.out, machine.initial)
+
+    @classmethod
+    def from_mealy(cls, mealy_dict, alphabet, initial=None):
+        """
+        Компиляция автомата Мили mealy[state][letter] = (dest, out).
+        Начальное состояние по умолчанию - '1', если оно есть, иначе первое.
+        """
+        if initial is None and '1' in mealy_dict:
+            initial = '1'
+        return cls.from_int_mealy(IntMealy.from_dict(mealy_dict, alphabet, initial))
+
+    @classmethod
+    def from_moore(cls, moore_states, moore_transitions, moore_initial, alphabet):
+        """
+        Компиляция автомата Мура: moore_states[(state, reaction)] = имя,
+        moore_transitions[имя][letter] = имя. Реакция перехода - отметка
+        состояния-приёмника.
+        """
+        names = sorted(moore_transitions)
+        index = {name: i for i, name in enumerate(names)}
+        reaction_of = {name: reaction for (_, reaction), name in moore_states.items()}
+        outputs = []
+        output_index = {}
+        delta = array('i')
+        out = array('i')
+        for name in names:
+            row = moore_transitions[name]
+            for letter in alphabet:
+                dest = row[letter]
+                delta.append(index[dest])
+                reaction = reaction_of[dest]
+                o = output_index.get(reaction)
+                if o is None:
+                    o = output_index[reaction] = len(outputs)
+                    outputs.append(reaction)
+                out.append(o)
+        return cls(names, alphabet, outputs, delta, out, index[moore_initial])
+
+    # ------------------------------------------------------------------ #
+
+    def encode(self, word):
+        """
+        Переводит входное слово (строку или последовательность символов) в bytes
+        с номерами символов; для алфавита из 255 и более символов - в array('i').
+        Для символа вне алфавита возбуждается SimulationError с его позицией.
+        """
+        if isinstance(word, str) and self._single_char:
+            data = word.translate(self._translate).encode('latin-1', errors='replace')
+            if data.translate(None, self._valid):
+                for position, a in enumerate(data):
+                    if a >= len(self.alphabet):
+                        raise SimulationError(f"Символ '{word[position]}' (позиция {position + 1}) "
+                                              f"не входит в алфавит {self.alphabet}", position)
+            return data
+        symbols = array('i') if self._wide else bytearray()
+        for position, letter in enumerate(word):
+            try:
+                symbols.append(self._symbol_index[letter])
+            except KeyError:
+                raise SimulationError(f"Символ '{letter}' (позиция {position + 1}) "
+                                      f"не входит в алфавит {self.alphabet}", position) from None
+        return symbols if self._wide else bytes(symbols)
+
+    def run_codes(self, codes, state=None, trace=False):
+        """
+        Прогон последовательности номеров символов (bytes, bytearray, array).
+        Возвращает (номера реакций, номер конечного состояния, протокол или None);
+        номера реакций - bytearray, если реакций не больше 256, иначе array('i').
+        """
+        k = len(self.alphabet)
+        s = self.initial if state is None else state
+        delta, out = self.delta, self.out
+        if trace:
+            steps = []
+            for a in codes:
+                i = s * k + a
+                steps.append((s, a, delta[i], out[i]))
+                s = delta[i]
+            produced = [step[3] for step in steps]
+            produced = bytearray(produced) if self._byte_outputs else array('i', produced)
+            return produced, s, steps
+        produced = bytearray(len(codes)) if self._byte_outputs else array('i', [0]) * len(codes)
+        for position, a in enumerate(codes):
+            i = s * k + a
+            produced[position] = out[i]
+            s = delta[i]
+        return produced, s, None
+
+    def decode(self, produced, separator=''):
+        """
+        Выходное слово по номерам реакций.
+        """
+        if self._output_table is not None and not separator:
+            return produced.translate(self._output_table).decode('latin-1')
+        return separator.join(map(self.outputs.__getitem__, produced))
+
+    def feed(self, word, state=None, separator=''):
+        """
+        Прогон очередного фрагмента входа из состояния state (номер; по
+        умолчанию начальное). Возвращает (выходной фрагмент, номер состояния
+        после фрагмента) - так поток обрабатывается кусками в постоянной памяти.
+        """
+        produced, final, _ = self.run_codes(self.encode(word), state)
+        return self.decode(produced, separator), final
+
+    def run(self, word, trace=False, separator=''):
+        """
+        Прогон входного слова из начального состояния. Возвращает SimulationResult.
+        """
+        codes = self.encode(word)
+        produced, final, steps = self.run_codes(codes, trace=trace)
+        outputs = self.decode(produced, separator)
+        if steps is not None:
+            steps = [(self.states[s], self.alphabet[a], self.states[t], self.outputs[o]) for s, a, t, o in steps]
+        return SimulationResult(outputs, self.states[final], len(codes), steps)
+
+    # ------------------------------------------------------------------ #
+    # Пакетный режим (NumPy)
+    # ------------------------------------------------------------------ #
+
+    def _tables(self):
+        if np is None:
+            raise RuntimeError("Для пакетной симуляции требуется NumPy")
+        return np.frombuffer(self.delta, dtype=np.intc), np.frombuffer(self.out, dtype=np.intc)
+
+    def random_words(self, count, length, seed=None):
+        """
+        Матрица (count, length) случайных номеров символов
+        (uint8, а для алфавита из 255 и более символов - int32).
+        """
+        if np is None:
+            raise RuntimeError("Для пакетной симуляции требуется NumPy")
+        rng = np.random.default_rng(seed)
+        return rng.integers(0, len(self.alphabet), size=(count, length),
+                            dtype=np.int32 if self._wide else np.uint8)
+
+    def run_batch(self, codes, states=None):
+        """
+        Синхронный прогон N копий автомата по матрице номеров символов codes
+        (N, L). states - начальные состояния копий (по умолчанию начальное).
+
+        Возвращает (номера реакций (N, L), номера конечных состояний (N,)).
+        """
+        delta, out = self._tables()
+        codes = np.asarray(codes)
+        count, length = codes.shape
+        k = len(self.alphabet)
+        if codes.size and codes.max() >= k:
+            raise ValueError("Номер символа вне алфавита в пакетном входе")
+        states = np.full(count, self.initial, dtype=np.intp) if states is None \
+            else np.asarray(states, dtype=np.intp)
+        # Столбцы по шагам лежат в памяти подряд
+        columns = np.ascontiguousarray(codes.T)
+        produced = np.empty((length, count), dtype=out.dtype)
+        # Индексы s * k + a считаются в intp: n * k может не помещаться в int32
+        index = np.empty(count, dtype=np.intp)
+        for t in range(length):
+            np.multiply(states, k, out=index)
+            index += columns[t]
+            produced[t] = out[index]
+            states = delta[index]
+        return produced.T, states
+
+    def first_mismatch(self, other, codes):
+        """
+        Сравнивает реакции двух автоматов с одним алфавитом на словах codes
+        (N, L). Возвращает (номер слова, позиция) первого расхождения или None.
+        """
+        if other.alphabet != self.alphabet:
+            raise ValueError("Автоматы должны иметь один входной алфавит")
+        mine, _ = self.run_batch(codes)
+        theirs, _ = other.run_batch(codes)
+        # Номера реакций другого автомата переводятся в номера реакций этого
+        index = {name: o for o, name in enumerate(self.outputs)}
+        translate = np.array([index.get(name, -1) for name in other.outputs], dtype=np.intp)
+        differs = mine != translate[theirs]
+        if not differs.any():
+            return None
+        word = int(np.argmax(differs.any(axis=1)))
+        return word, int(np.argmax(differs[word]))
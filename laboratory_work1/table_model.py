@@ -0,0 +1,155 @@
+"""
+Модель таблицы переходов автомата Мили для QTableView.
+
+Ячейки хранятся в одном плоском списке строк (cells[row * k + col]),
+а представление запрашивает только видимые ячейки, поэтому таблица
+из десятков тысяч строк и сотен столбцов не создаёт объектов на каждую
+ячейку и остаётся отзывчивой. Массовые операции (загрузка, генерация,
+очистка) сбрасывают модель один раз вместо сигнала на каждую ячейку.
+"""
+
+from PyQt5 import QtCore, QtGui
+
+
+class MealyTableModel(QtCore.QAbstractTableModel):
+    """
+    Таблица 'dest,out' по состояниям (строки) и входным символам (столбцы).
+
+    state_labels - имена состояний (заголовки строк)
+    alphabet     - входные символы (заголовки столбцов)
+    """
+
+    def __init__(self, state_labels, alphabet, parent=None):
+        super().__init__(parent)
+        self.state_labels = list(state_labels)
+        self.alphabet = tuple(alphabet)
+        self._cells = [""] * (len(self.state_labels) * len(self.alphabet))
+        self._row_colors = {}
+
+    # ------------------------------------------------------------------ #
+    # Интерфейс QAbstractTableModel
+    # ------------------------------------------------------------------ #
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.state_labels)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.alphabet)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return self._cells[index.row() * len(self.alphabet) + index.column()]
+        if role == QtCore.Qt.BackgroundRole:
+            color = self._row_colors.get(index.row())
+            return QtGui.QBrush(QtGui.QColor(color)) if color else None
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if not index.isValid() or role != QtCore.Qt.EditRole:
+            return False
+        self._cells[index.row() * len(self.alphabet) + index.column()] = str(value)
+        self.dataChanged.emit(index, index, [QtCore.Qt.DisplayRole, QtCore.Qt.EditRole])
+        return True
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return self.alphabet[section] if section < len(self.alphabet) else None
+        return self.state_labels[section] if section < len(self.state_labels) else None
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEditable
+
+    # ------------------------------------------------------------------ #
+    # Массовые операции
+    # ------------------------------------------------------------------ #
+
+    def resize(self, state_labels, alphabet):
+        """
+        Новые состояния и алфавит; все ячейки очищаются.
+        """
+        self.beginResetModel()
+        self.state_labels = list(state_labels)
+        self.alphabet = tuple(alphabet)
+        self._cells = [""] * (len(self.state_labels) * len(self.alphabet))
+        self._row_colors = {}
+        self.endResetModel()
+
+    def cell(self, row, col):
+        return self._cells[row * len(self.alphabet) + col]
+
+    def set_cell(self, row, col, text):
+        self.setData(self.index(row, col), text)
+
+    def rows(self):
+        """
+        Содержимое таблицы: список строк, каждая - список текстов ячеек.
+        """
+        k = len(self.alphabet)
+        return [self._cells[i:i + k] for i in range(0, len(self._cells), k)]
+
+    def set_rows(self, rows):
+        """
+        Заполняет таблицу построчно; лишние строки и ячейки отбрасываются,
+        недостающие остаются пустыми.
+        """
+        self.beginResetModel()
+        k = len(self.alphabet)
+        self._cells = [""] * (len(self.state_labels) * k)
+        for row, values in zip(range(len(self.state_labels)), rows):
+            values = [str(v).strip() for v in values[:k]]
+            self._cells[row * k:row * k + len(values)] = values
+        self.endResetModel()
+
+    def clear_cells(self):
+        self.beginResetModel()
+        self._cells = [""] * len(self._cells)
+        self._row_colors = {}
+        self.endResetModel()
+
+    def set_row_colors(self, colors):
+        """
+        Подсветка строк: {номер строки: цвет}; остальные строки без фона.
+        """
+        self._row_colors = dict(colors)
+        if self._cells:
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1),
+                                  [QtCore.Qt.BackgroundRole])
+
+    # ------------------------------------------------------------------ #
+    # Разбор таблицы
+    # ------------------------------------------------------------------ #
+
+    def to_mealy(self):
+        """
+        Разбирает все ячейки в словарь mealy[state][letter] = (dest, out).
+        Возвращает (mealy, None) или (None, (строка, столбец, сообщение))
+        для первой ошибочной ячейки.
+        """
+        k = len(self.alphabet)
+        known = set(self.state_labels)
+        mealy = {}
+        cells = self._cells
+        for row, state in enumerate(self.state_labels):
+            transitions = {}
+            for col, letter in enumerate(self.alphabet):
+                text = cells[row * k + col].strip()
+                where = f"в состоянии {state}, вход '{letter}'"
+                if not text:
+                    return None, (row, col, f"Заполните ячейку для состояния {state}, вход '{letter}'.")
+                parts = text.split(',')
+                if len(parts) != 2:
+                    return None, (row, col, f"Неверный формат {where}. Ожидается формат 'dest,out'.")
+                dest, out = parts[0].strip(), parts[1].strip()
+                if not dest or not out:
+                    return None, (row, col, f"Неверный формат {where}. Пустое значение.")
+                if dest not in known:
+                    return None, (row, col, f"Неизвестное состояние '{dest}' {where}.")
+                transitions[letter] = (dest, out)
+            mealy[state] = transitions
+        return mealy, None
@@ -0,0 +1,21 @@
+"""
+Случайные автоматы Мили для сравнения движков с эталонными реализациями.
+"""
+
+from mealy_core import IntMealy
+
+
+def random_mealy(rng, n_states, alphabet='ab', outputs='xy'):
+    """
+    Случайный автомат в словарном формате mealy[state][letter] = (dest, out)
+    с состояниями '1'..'n'.
+    """
+    states = [str(i) for i in range(1, n_states + 1)]
+    return {s: {letter: (rng.choice(states), rng.choice(outputs)) for letter in alphabet} for s in states}
+
+
+def random_machine(rng, n_states, alphabet='ab', outputs='xy'):
+    """
+    То же в виде IntMealy с начальным состоянием '1'.
+    """
+    return IntMealy.from_dict(random_mealy(rng, n_states, alphabet, outputs), alphabet, '1')
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from batch import collect_inputs, minimize_files, output_paths
+from machine_io import read_mealy_table
+from moore import mealy_to_moore
+from random_machines import random_mealy
+
+
+def write_table(path, mealy, alphabet='ab'):
+    with open(path, 'w', encoding='utf-8') as f:
+        for s in sorted(mealy, key=int):
+            f.write(";".join(f"{dest},{out}" for dest, out in (mealy[s][letter] for letter in alphabet)) + "\n")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_minimize_files(rng, tmp_path, workers):
+    for i in range(6):
+        write_table(tmp_path / f"m{i}.txt", random_mealy(rng, rng.randint(1, 12)))
+    (tmp_path / "broken.txt").write_text("1,x;7,y\n", encoding='utf-8')
+    output_dir = str(tmp_path / "out")
+    paths = collect_inputs([str(tmp_path)], output_dir=output_dir)
+    results = list(minimize_files(paths, output_dir, workers=workers, verify=True))
+    assert [r.path for r in results] == paths
+    statuses = {os.path.basename(r.path): r.status for r in results}
+    assert statuses.pop("broken.txt") == 'failed'
+    assert set(statuses.values()) == {'done'}
+    for path in paths[1:]:
+        minimized, moore = output_paths(path, output_dir)
+        assert os.path.exists(minimized) and os.path.exists(moore)
+    # Повторный запуск пропускает готовые файлы, а результаты не попадают во входы
+    assert collect_inputs([str(tmp_path), output_dir + "/*.txt"], output_dir=output_dir) == paths
+    rerun = list(minimize_files(paths, output_dir, workers=workers))
+    assert [r.path for r in rerun] == paths
+    assert [r.status for r in rerun] == ['failed'] + ['skipped'] * (len(paths) - 1)
+
+
+def test_moore_copies_follow_incoming_reactions():
+    # В состояние 2 входят переходы с реакциями x и y, в 1 - только x
+    mealy = {
+        '1': {'a': ('2', 'x'), 'b': ('1', 'x')},
+        '2': {'a': ('2', 'y'), 'b': ('1', 'x')},
+    }
+    moore_states, _, moore_initial = mealy_to_moore(mealy, 'ab', '1')
+    assert sorted(moore_states) == [('1', 'x'), ('2', 'x'), ('2', 'y')]
+    assert moore_initial == moore_states[('1', 'x')]
+
+
+def test_multi_character_alphabet_option(tmp_path):
+    pytest.importorskip("graphviz")
+    import console_app
+
+    source = tmp_path / "m.txt"
+    source.write_text("1,x;2,y\n2,y;1,x\n", encoding='utf-8')
+    assert console_app.main(["batch", str(source), "-o", str(tmp_path / "out"), "-j", "1",
+                             "--alphabet", "x1,x2"]) == 0
+    minimized, _ = output_paths(str(source), str(tmp_path / "out"))
+    _, alphabet = read_mealy_table(minimized, ('x1', 'x2'))
+    assert tuple(alphabet) == ('x1', 'x2')
@@ -0,0 +1,45 @@
+import io
+
+import pytest
+
+pytest.importorskip("graphviz")
+
+import console_app
+from simulation import CompiledMachine
+
+
+@pytest.fixture
+def machine_files(tmp_path):
+    machine = tmp_path / "m.txt"
+    machine.write_text("1,x;2,y\n2,y;1,x\n", encoding='utf-8')
+    source = tmp_path / "in.txt"
+    source.write_text("abab\n", encoding='utf-8')
+    return str(machine), str(source), str(tmp_path / "out.txt")
+
+
+@pytest.mark.parametrize("argv", [
+    ["--verify", "stream", "--minimize"],
+    ["stream", "--minimize", "--verify"],
+])
+def test_verify_before_and_after_the_command(capsys, machine_files, argv):
+    machine, source, target = machine_files
+    assert console_app.main(argv + [machine, source, "-o", target]) == 0
+    assert "Проверка эквивалентности: автоматы эквивалентны" in capsys.readouterr().err
+    with open(target, encoding='utf-8') as f:
+        assert f.read() == "xyyx"
+
+
+def test_stream_without_verify(capsys, machine_files):
+    machine, source, target = machine_files
+    assert console_app.main(["stream", "--minimize", machine, source, "-o", target]) == 0
+    assert "Проверка" not in capsys.readouterr().err
+
+
+def test_stream_with_large_alphabet():
+    alphabet = [chr(0x400 + a) for a in range(300)]
+    compiled = CompiledMachine(['1', '2'], alphabet, ['x', 'y'], [1, 0] * 150 + [0] * 300, [0, 1] * 300)
+    word = ''.join(alphabet[::-7]) * 3
+    sink = io.StringIO()
+    processed, final = console_app.stream_transduce(compiled, io.StringIO(word), sink, chunk_size=16)
+    assert processed == len(word) and final == compiled.run(word).final_state
+    assert sink.getvalue() == compiled.run(word).outputs
@@ -0,0 +1,79 @@
+from collections import deque
+
+from equivalence import check_equivalence, check_mealy_equivalence
+from mealy_core import IntMealy
+from minimization import minimize_int
+from random_machines import random_machine
+
+
+def shortest_distinguishing_length(first, second):
+    """
+    Длина кратчайшего различающего слова (обход пар состояний в ширину) или None.
+    """
+    k = first.n_symbols
+    column = [second.symbol_index(letter) for letter in first.alphabet]
+    start = (first.initial, second.initial)
+    depth = {start: 0}
+    queue = deque([start])
+    while queue:
+        p, q = queue.popleft()
+        for a in range(k):
+            b = column[a]
+            if first.outputs[first.output(p, a)] != second.outputs[second.output(q, b)]:
+                return depth[(p, q)] + 1
+            pair = (first.successor(p, a), second.successor(q, b))
+            if pair not in depth:
+                depth[pair] = depth[(p, q)] + 1
+                queue.append(pair)
+    return None
+
+
+def outputs(machine, word):
+    s, result = machine.initial, []
+    for letter in word:
+        a = machine.symbol_index(letter)
+        result.append(machine.outputs[machine.output(s, a)])
+        s = machine.successor(s, a)
+    return result
+
+
+def test_matches_product_search(rng):
+    for _ in range(500):
+        first = random_machine(rng, rng.randint(1, 6))
+        second = random_machine(rng, rng.randint(1, 6))
+        result = check_equivalence(first, second)
+        length = shortest_distinguishing_length(first, second)
+        assert result.equivalent == (length is None)
+        if not result.equivalent:
+            assert len(result.word) == length
+            assert result.first_output == outputs(first, result.word)
+            assert result.second_output == outputs(second, result.word)
+            assert result.first_output[-1] != result.second_output[-1]
+
+
+def test_minimized_machine_is_equivalent(rng):
+    for _ in range(200):
+        machine = random_machine(rng, rng.randint(1, 15))
+        minimized, _, _, _ = minimize_int(machine)
+        assert check_equivalence(machine, minimized).equivalent
+
+
+def test_alphabet_order_and_output_names():
+    first = IntMealy(['1'], 'ab', ['x', 'y'], [0, 0], [0, 1])
+    second = IntMealy(['1'], 'ba', ['y', 'x'], [0, 0], [0, 1])
+    assert check_equivalence(first, second).equivalent
+
+
+def test_distinguishing_word_found_beyond_first_step():
+    first = {'1': {'a': ('2', 'x')}, '2': {'a': ('1', 'y')}}
+    second = {'1': {'a': ('2', 'x')}, '2': {'a': ('2', 'x')}}
+    result = check_mealy_equivalence(first, second, 'a')
+    assert not result.equivalent
+    assert result.word == ['a', 'a']
+    assert (result.first_output, result.second_output) == (['x', 'y'], ['x', 'x'])
+
+
+def test_empty_alphabet():
+    first = IntMealy(['1', '2'], (), [], [], [])
+    second = IntMealy(['1'], (), [], [], [])
+    assert check_equivalence(first, second).equivalent
@@ -0,0 +1,106 @@
+import re
+
+import pytest
+
+graphviz = pytest.importorskip("graphviz")
+pytest.importorskip("PyQt5")
+
+import graphical_app
+from graph_layout import mealy_groups, simplify_graph, strongly_connected_components
+
+_ENDPOINT = r'("(?:[^"\\]|\\.)*"|[^\s"\[]+)'
+_EDGE = re.compile(rf'^\s*{_ENDPOINT} -> {_ENDPOINT}')
+_NODE = re.compile(rf'^\s*{_ENDPOINT}(?:\s*\[|\s*$)')
+
+
+def edges_and_nodes(source):
+    """
+    Концы рёбер и объявленные вершины DOT-описания.
+    """
+    edges, nodes = [], set()
+    for line in source.splitlines()[1:]:
+        edge = _EDGE.match(line)
+        if edge:
+            edges.append(edge.groups())
+            continue
+        node = _NODE.match(line)
+        if node and node.group(1) not in ("node", "edge", "graph", "}") and "=" not in node.group(1):
+            nodes.add(node.group(1))
+    return edges, nodes
+
+
+def assert_no_ports(graph):
+    edges, nodes = edges_and_nodes(graph.source)
+    assert edges
+    for endpoints in edges:
+        for endpoint in endpoints:
+            # 'a:b' без кавычек graphviz читает как вершину a с портом b
+            assert endpoint.startswith('"') or ":" not in endpoint, endpoint
+            assert endpoint in nodes, endpoint
+
+
+# Две компоненты сильной связности из двух состояний и одно отдельное состояние
+MEALY = {
+    '1': {'a': ('2', 'x'), 'b': ('3', 'y')},
+    '2': {'a': ('1', 'y'), 'b': ('2', 'x')},
+    '3': {'a': ('4', 'x'), 'b': ('5', 'x')},
+    '4': {'a': ('3', 'y'), 'b': ('4', 'y')},
+    '5': {'a': ('5', 'x'), 'b': ('5', 'y')},
+}
+
+
+def test_scc_groups():
+    groups = mealy_groups(MEALY, 'ab', 'scc')
+    assert groups['1'] == groups['2'] != groups['3'] == groups['4'] != groups['5']
+
+
+def test_collapsed_mealy_edges_attach_to_group_nodes():
+    groups = mealy_groups(MEALY, 'ab', 'scc')
+    graph = graphical_app.mealy_digraph(MEALY, 'ab', groups=groups, initial='1')
+    assert_no_ports(graph)
+    edges, _ = edges_and_nodes(graph.source)
+    group_1, group_3 = f'"group_{groups["1"]}"', f'"group_{groups["3"]}"'
+    assert (group_1, group_3) in edges
+    assert (group_3, '5') in edges
+
+
+def test_collapsed_moore_edges_attach_to_group_nodes():
+    groups = mealy_groups(MEALY, 'ab', 'scc')
+    moore_states, moore_transitions, moore_initial = graphical_app.build_moore(MEALY, 'ab', '1')
+    graph = graphical_app.moore_digraph(moore_states, moore_transitions, moore_initial, groups=groups)
+    assert_no_ports(graph)
+
+
+def test_expanded_group_is_not_collapsed():
+    groups = mealy_groups(MEALY, 'ab', 'scc')
+    graph = graphical_app.mealy_digraph(MEALY, 'ab', groups=groups, expanded=[groups['1']], initial='1')
+    assert_no_ports(graph)
+    _, nodes = edges_and_nodes(graph.source)
+    assert {'1', '2'} <= nodes
+
+
+def test_group_ids_do_not_collide_with_state_names():
+    names = {'1': 'group_0', '2': 'group_1', '3': '_group_0', '4': 'x', '5': 'y'}
+    mealy = {names[s]: {a: (names[t], o) for a, (t, o) in row.items()} for s, row in MEALY.items()}
+    groups = mealy_groups(mealy, 'ab', 'scc')
+    nodes, edges, node_id = simplify_graph(list(mealy), [], groups)
+    collapsed = [v for v, label, _ in nodes if label is not None]
+    assert len(collapsed) == 2 and not set(collapsed) & set(mealy)
+    graph = graphical_app.mealy_digraph(mealy, 'ab', groups=groups, initial='group_0')
+    assert_no_ports(graph)
+    _, declared = edges_and_nodes(graph.source)
+    assert not {'group_0', 'group_1', '_group_0', 'x'} & {v.strip('"') for v in declared}
+    assert 'y' in declared
+
+
+def test_simplify_graph_merges_parallel_edges():
+    nodes, edges, node_id = simplify_graph(['1', '2'], [('1', '2', 'a'), ('1', '2', 'b'), ('2', '2', 'a')])
+    assert edges == [('1', '2', 'a, b'), ('2', '2', 'a')]
+    assert node_id == {'1': '1', '2': '2'}
+
+
+def test_strongly_connected_components_chain():
+    nodes = list(range(5))
+    successors = {i: [i + 1] if i < 4 else [] for i in nodes}
+    component = strongly_connected_components(nodes, successors)
+    assert len(set(component.values())) == 5
@@ -0,0 +1,102 @@
+import sys
+
+import pytest
+
+from machine_store import (is_binary_machine, load_any, load_machine, read_text_machine, save_machine,
+                           write_text_machine)
+from mealy_core import IntMealy, NumberedStates
+from random_machines import random_machine
+from simulation import CompiledMachine
+
+
+def same_machine(first, second):
+    return (list(first.states) == list(second.states) and first.alphabet == second.alphabet
+            and first.outputs == second.outputs and list(first.delta) == list(second.delta)
+            and list(first.out) == list(second.out) and first.initial == second.initial)
+
+
+def test_binary_roundtrip(rng, tmp_path):
+    for i in range(50):
+        machine = random_machine(rng, rng.randint(1, 30), 'abc', 'xyz')
+        machine.initial = rng.randrange(machine.n_states)
+        path = tmp_path / f"m{i}.bin"
+        save_machine(path, machine)
+        assert is_binary_machine(path)
+        loaded = load_machine(path)
+        assert isinstance(loaded.states, NumberedStates)
+        assert same_machine(loaded, machine)
+
+
+def test_binary_roundtrip_with_named_states(tmp_path):
+    machine = IntMealy(['q0', 'q1'], ('x1', 'x2'), ['out', 'другая'], [1, 0, 0, 1], [0, 1, 1, 0], 1)
+    path = tmp_path / "named.bin"
+    save_machine(path, machine)
+    loaded = load_machine(path)
+    assert not isinstance(loaded.states, NumberedStates)
+    assert same_machine(loaded, machine)
+
+
+def test_simulation_uses_mapped_tables(rng, tmp_path):
+    machine = random_machine(rng, 20, 'abc', 'xyz')
+    path = tmp_path / "m.bin"
+    save_machine(path, machine)
+    compiled = CompiledMachine.from_int_mealy(load_machine(path))
+    assert isinstance(compiled.delta, memoryview) or sys.byteorder != 'little'
+    word = ''.join(rng.choice('abc') for _ in range(100))
+    assert compiled.run(word).outputs == CompiledMachine.from_int_mealy(machine).run(word).outputs
+
+
+def test_text_and_binary_agree(rng, tmp_path):
+    for i in range(30):
+        machine = random_machine(rng, rng.randint(1, 20))
+        text = tmp_path / f"m{i}.txt"
+        binary = tmp_path / f"m{i}.bin"
+        write_text_machine(text, machine)
+        assert not is_binary_machine(text)
+        from_text = read_text_machine(text)
+        save_machine(binary, from_text)
+        assert same_machine(load_any(binary), load_any(text))
+        assert from_text.to_dict() == machine.to_dict()
+
+
+def test_text_rows_start_from_initial_state(tmp_path):
+    machine = IntMealy(['1', '2'], 'a', ['x', 'y'], [1, 0], [0, 1], 1)
+    path = tmp_path / "m.txt"
+    write_text_machine(path, machine)
+    assert path.read_text(encoding='utf-8').splitlines() == ["2,y", "1,x"]
+
+
+def test_empty_alphabet_and_single_state(tmp_path):
+    for machine in (IntMealy(['1', '2'], (), [], [], []), IntMealy(['1'], 'a', ['x'], [0], [0])):
+        path = tmp_path / "m.bin"
+        save_machine(path, machine)
+        assert same_machine(load_machine(path), machine)
+
+
+def test_corrupted_files_are_rejected(rng, tmp_path):
+    path = tmp_path / "m.bin"
+    save_machine(path, random_machine(rng, 5))
+    data = path.read_bytes()
+    path.write_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        load_machine(path)
+    # Номер реакции 100 в первой ячейке out
+    path.write_bytes(data[:-40] + (100).to_bytes(4, 'little') + data[-36:])
+    with pytest.raises(ValueError):
+        load_machine(path)
+
+
+def test_text_errors(tmp_path):
+    path = tmp_path / "bad.txt"
+    path.write_text("1,x;3,y\n1,x;1,y\n", encoding='utf-8')
+    with pytest.raises(ValueError, match="неизвестное состояние 3"):
+        read_text_machine(path)
+    path.write_text("1,x;1\n", encoding='utf-8')
+    with pytest.raises(ValueError):
+        read_text_machine(path)
+    path.write_text("\n", encoding='utf-8')
+    with pytest.raises(ValueError):
+        read_text_machine(path)
+    path.write_text("1,x;1,y\n", encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_any(path, ('a', 'b', 'c'))
@@ -0,0 +1,46 @@
+import pytest
+
+from mealy_core import IntMealy, state_sort_key
+from random_machines import random_mealy
+
+
+def test_dict_round_trip(rng):
+    for _ in range(100):
+        mealy = random_mealy(rng, rng.randint(1, 12), 'abc', 'xyz')
+        machine = IntMealy.from_dict(mealy, 'abc')
+        assert machine.to_dict() == mealy
+        assert machine.states == sorted(mealy, key=state_sort_key)
+        for s, name in enumerate(machine.states):
+            for a, letter in enumerate(machine.alphabet):
+                dest, reaction = mealy[name][letter]
+                assert machine.states[machine.successor(s, a)] == dest
+                assert machine.outputs[machine.output(s, a)] == reaction
+
+
+def test_natural_state_order_and_initial():
+    mealy = {name: {'a': ('2', 'x')} for name in ('10', '2', 'q', '1')}
+    machine = IntMealy.from_dict(mealy, 'a', initial='q')
+    assert machine.states == ['1', '2', '10', 'q']
+    assert machine.initial == 3
+    assert machine.state_index('10') == 2
+
+
+def test_quotient():
+    machine = IntMealy(['1', '2', '3'], 'a', ['x'], [1, 2, 0], [0, 0, 0], 1)
+    quotient, rep_of = machine.quotient([0, 0, 0])
+    assert list(rep_of) == [0, 0, 0]
+    assert quotient.to_dict() == {'1': {'a': ('1', 'x')}}
+    assert quotient.initial == 0
+
+
+def test_empty_alphabet():
+    machine = IntMealy.from_dict({'1': {}, '2': {}}, ())
+    assert machine.n_symbols == 0
+    assert machine.to_dict() == {'1': {}, '2': {}}
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        IntMealy.from_dict({'1': {'a': ('2', 'x')}}, 'a')
+    with pytest.raises(ValueError):
+        IntMealy(['1', '2'], 'a', ['x'], [0], [0])
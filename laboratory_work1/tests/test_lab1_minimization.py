@@ -0,0 +1,123 @@
+from array import array
+
+import pytest
+
+pytest.importorskip("graphviz")
+pytest.importorskip("PyQt5")
+
+from graphical_app import minimize_mealy
+from mealy_core import IntMealy
+from minimization import ENGINES, IncrementalMinimizer, minimize_int
+from random_machines import random_machine, random_mealy
+
+METHODS = sorted(ENGINES)
+
+
+def partition(blocks):
+    return {frozenset(block) for block in blocks}
+
+
+def named_partition(machine, blocks):
+    return {frozenset(machine.states[s] for s in block) for block in blocks}
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_engines_match_classic_refinement(method, rng):
+    for _ in range(300):
+        n = rng.randint(1, 12)
+        alphabet = 'abc'[:rng.randint(1, 3)]
+        mealy = random_mealy(rng, n, alphabet, 'xyz'[:rng.randint(1, 3)])
+        classic_blocks, classic_map, classic_min, _ = minimize_mealy(mealy, alphabet, "classic", False)
+        blocks, minimized_map, min_mealy, _ = minimize_mealy(mealy, alphabet, method, False)
+        assert partition(blocks) == partition(classic_blocks)
+        assert minimized_map == classic_map
+        assert min_mealy == classic_min
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_final_snapshot_is_the_partition(method, rng):
+    for _ in range(100):
+        machine = random_machine(rng, rng.randint(1, 10))
+        _, _, blocks, iteration_info = minimize_int(machine, True, method)
+        assert partition(iteration_info[-1]) == named_partition(machine, blocks)
+
+
+def test_hopcroft_records_one_snapshot_per_round(rng):
+    for _ in range(100):
+        machine = random_machine(rng, rng.randint(1, 10))
+        _, _, _, iteration_info = minimize_int(machine, True, 'hopcroft')
+        # Каждый записанный раунд строго измельчает предыдущее разбиение
+        sizes = [len(snapshot) for snapshot in iteration_info]
+        assert sizes == sorted(set(sizes))
+
+
+def test_numpy_rounds_match_classic_rounds(rng):
+    for _ in range(100):
+        mealy = random_mealy(rng, rng.randint(1, 10))
+        _, _, _, classic_rounds = minimize_mealy(mealy, 'ab', "classic", True)
+        _, _, _, numpy_rounds = minimize_mealy(mealy, 'ab', "numpy", True)
+        # Классический вариант дописывает последний, уже устойчивый раунд ещё раз
+        assert [partition(r) for r in numpy_rounds] == [partition(r) for r in classic_rounds[:-1]]
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_empty_alphabet(method):
+    machine = IntMealy(['1', '2', '3'], (), [], [], [], 0)
+    min_machine, rep_of, blocks, _ = minimize_int(machine, True, method)
+    assert min_machine.n_states == 1
+    assert list(rep_of) == [0, 0, 0]
+    assert partition(blocks) == {frozenset({0, 1, 2})}
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_single_state(method):
+    machine = IntMealy(['1'], 'ab', ['x'], [0, 0], [0, 0], 0)
+    min_machine, rep_of, blocks, _ = minimize_int(machine, False, method)
+    assert min_machine.to_dict() == machine.to_dict()
+    assert list(rep_of) == [0]
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_unreachable_states_are_kept(method):
+    # 3 недостижимо из 1 и эквивалентно ему, 4 недостижимо и отличается от всех
+    mealy = {
+        '1': {'a': ('2', 'x'), 'b': ('1', 'y')},
+        '2': {'a': ('1', 'x'), 'b': ('2', 'y')},
+        '3': {'a': ('1', 'x'), 'b': ('3', 'y')},
+        '4': {'a': ('4', 'y'), 'b': ('1', 'y')},
+    }
+    blocks, minimized_map, _, _ = minimize_mealy(mealy, 'ab', method, False)
+    assert partition(blocks) == {frozenset('123'), frozenset('4')}
+    assert minimized_map['3'] == '1'
+
+
+def edit(rng, machine, count):
+    """
+    Копия автомата с count случайно изменёнными ячейками.
+    """
+    delta, out = array('i', machine.delta), array('i', machine.out)
+    for _ in range(count):
+        i = rng.randrange(len(delta))
+        delta[i] = rng.randrange(machine.n_states)
+        out[i] = rng.randrange(len(machine.outputs))
+    return IntMealy(machine.states, machine.alphabet, machine.outputs, delta, out, machine.initial)
+
+
+def test_incremental_minimizer_matches_full_minimization(rng):
+    for _ in range(50):
+        minimizer = IncrementalMinimizer()
+        machine = random_machine(rng, rng.randint(1, 40))
+        for _ in range(10):
+            min_machine, rep_of, blocks, _ = minimizer.update(machine)
+            expected, expected_rep, expected_blocks, _ = minimize_int(machine)
+            assert partition(blocks) == partition(expected_blocks)
+            assert list(rep_of) == list(expected_rep)
+            assert min_machine.to_dict() == expected.to_dict()
+            machine = edit(rng, machine, rng.randint(0, 2))
+
+
+def test_incremental_minimizer_reports_unchanged_result(rng):
+    minimizer = IncrementalMinimizer()
+    machine = random_machine(rng, 10)
+    assert minimizer.update(machine)[3]
+    assert not minimizer.update(edit(rng, machine, 0))[3]
@@ -0,0 +1,127 @@
+from array import array
+
+import pytest
+
+from moore import mealy_to_moore
+from random_machines import random_machine, random_mealy
+from simulation import CompiledMachine, SimulationError
+
+
+def simulate(mealy, initial, word):
+    """
+    Прогон слова по словарю mealy[state][letter] = (dest, out).
+    """
+    state, outputs = initial, []
+    for letter in word:
+        state, reaction = mealy[state][letter]
+        outputs.append(reaction)
+    return ''.join(outputs), state
+
+
+def random_word(rng, alphabet, max_length):
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length)))
+
+
+def test_run_matches_dictionary_simulation(rng):
+    for _ in range(200):
+        mealy = random_mealy(rng, rng.randint(1, 10), 'abc', 'xyz')
+        compiled = CompiledMachine.from_mealy(mealy, 'abc')
+        for _ in range(5):
+            word = random_word(rng, 'abc', 30)
+            outputs, final = simulate(mealy, '1', word)
+            result = compiled.run(word, trace=True)
+            assert (result.outputs, result.final_state, result.steps) == (outputs, final, len(word))
+            assert [step[3] for step in result.trace] == list(outputs)
+
+
+def test_feed_in_chunks_matches_run(rng):
+    compiled = CompiledMachine.from_mealy(random_mealy(rng, 8), 'ab')
+    word = random_word(rng, 'ab', 200)
+    state, parts = None, []
+    for start in range(0, len(word), 7):
+        produced, state = compiled.feed(word[start:start + 7], state)
+        parts.append(produced)
+    result = compiled.run(word)
+    assert ''.join(parts) == result.outputs
+    assert compiled.states[state] == result.final_state
+    assert compiled.feed('', state) == ('', state)
+
+
+def test_run_batch_matches_run(rng):
+    np = pytest.importorskip("numpy")
+    for _ in range(50):
+        compiled = CompiledMachine.from_int_mealy(random_machine(rng, rng.randint(1, 10), 'abc', 'xyz'))
+        codes = compiled.random_words(20, rng.randint(0, 15), seed=rng.randrange(1000))
+        produced, finals = compiled.run_batch(codes)
+        for row, outputs, final in zip(codes, produced, finals):
+            expected, expected_final, _ = compiled.run_codes(bytes(row.tolist()))
+            assert outputs.tolist() == list(expected)
+            assert final == expected_final
+    produced, finals = compiled.run_batch(np.zeros((3, 0), dtype=np.uint8))
+    assert produced.shape == (3, 0) and finals.tolist() == [compiled.initial] * 3
+
+
+def test_first_mismatch(rng):
+    pytest.importorskip("numpy")
+    machine = random_machine(rng, 6)
+    compiled = CompiledMachine.from_int_mealy(machine)
+    codes = compiled.random_words(10, 12, seed=1)
+    assert compiled.first_mismatch(compiled, codes) is None
+    # Машина с переставленными именами реакций расходится на первом же символе
+    swapped = CompiledMachine(machine.states, machine.alphabet, machine.outputs[::-1],
+                              machine.delta, machine.out, machine.initial)
+    assert len(machine.outputs) == 2
+    assert compiled.first_mismatch(swapped, codes) == (0, 0)
+
+
+def test_large_alphabet(rng):
+    # 300 символов не помещаются в номера-байты и кодируются в int32
+    alphabet = ''.join(chr(0x400 + a) for a in range(300))
+    mealy = random_mealy(rng, 5, alphabet, 'xyz')
+    compiled = CompiledMachine.from_mealy(mealy, alphabet)
+    word = random_word(rng, alphabet, 500)
+    outputs, final = simulate(mealy, '1', word)
+    result = compiled.run(word)
+    assert (result.outputs, result.final_state) == (outputs, final)
+    produced, state = compiled.feed(word[:100])
+    assert produced + compiled.feed(word[100:], state)[0] == outputs
+    pytest.importorskip("numpy")
+    codes = compiled.random_words(10, 20, seed=3)
+    assert codes.max() >= 255
+    produced, finals = compiled.run_batch(codes)
+    assert list(produced[0]) == list(compiled.run_codes(array('i', codes[0].tolist()))[0])
+    assert compiled.first_mismatch(compiled, codes) is None
+
+
+def test_unknown_symbol_position():
+    compiled = CompiledMachine.from_mealy({'1': {'a': ('1', 'x')}}, 'a')
+    with pytest.raises(SimulationError) as error:
+        compiled.run('aab')
+    assert error.value.position == 2
+
+
+def test_empty_word_and_single_state():
+    compiled = CompiledMachine.from_mealy({'1': {'a': ('1', 'x'), 'b': ('1', 'y')}}, 'ab')
+    result = compiled.run('')
+    assert (result.outputs, result.final_state, result.steps) == ('', '1', 0)
+
+
+def test_empty_alphabet():
+    compiled = CompiledMachine(['1', '2'], (), [], [], [], 1)
+    assert compiled.run('').final_state == '2'
+    np = pytest.importorskip("numpy")
+    produced, finals = compiled.run_batch(np.zeros((2, 0), dtype=np.uint8), [0, 1])
+    assert produced.shape == (2, 0) and finals.tolist() == [0, 1]
+    with pytest.raises(SimulationError):
+        compiled.run('a')
+
+
+def test_moore_machine_has_the_same_outputs(rng):
+    for _ in range(200):
+        mealy = random_mealy(rng, rng.randint(1, 8), 'ab', 'xyz')
+        initial = rng.choice(sorted(mealy))
+        moore_states, moore_transitions, moore_initial = mealy_to_moore(mealy, 'ab', initial)
+        moore = CompiledMachine.from_moore(moore_states, moore_transitions, moore_initial, 'ab')
+        for _ in range(5):
+            word = random_word(rng, 'ab', 20)
+            assert moore.run(word).outputs == simulate(mealy, initial, word)[0]
@@ -0,0 +1,188 @@
+"""
+Вычисление совместимости состояний частичного автомата Мили.
+
+Пара состояний несовместима, если на каком-то входе их определённые
+реакции различаются, либо если по какому-то входу она переходит в
+несовместимую пару. Несовместимость распространяется от пар с явным
+конфликтом реакций по обратным зависимостям (очередь пар), поэтому
+вся матрица строится за O(n^2 * k) без рекурсии и копирования автомата.
+
+Максимальные совместимые множества - это максимальные клики графа
+совместимости; они перечисляются алгоритмом Брона-Кербоша с выбором
+опорной вершины (Томита) на битовых масках окрестностей.
+
+Для замкнутого покрытия одних максимальных множеств недостаточно:
+минимальное замкнутое покрытие может состоять из немаксимальных
+совместимых множеств. Его всегда можно составить из простых совместимых
+множеств (Grasselli-Luccio), которые перечисляет prime_compatibles.
+"""
+
+from collections import defaultdict
+
+DONT_CARE = '-'
+
+
+def compatibility_matrix(states, alphabet, table):
+    """
+    Строит бинарную матрицу совместимости для автомата с таблицей
+    table[state][inp] = (dest, out), где '-' означает неопределённое значение.
+
+    Возвращает словарь {(min(s0, s1), max(s0, s1)): 1 | 0} для каждой
+    неупорядоченной пары различных состояний (1 - совместимы).
+    """
+    n = len(states)
+    index = {s: i for i, s in enumerate(states)}
+
+    # Переводим таблицу в номера: -1 для неопределённого приёмника
+    dests = []
+    outs = []
+    for s in states:
+        row_dests = []
+        for inp in alphabet:
+            dest = table[s][inp][0]
+            if dest == DONT_CARE:
+                row_dests.append(-1)
+            elif dest in index:
+                row_dests.append(index[dest])
+            else:
+                raise KeyError(f"Переход из {s} по '{inp}' ведёт в неизвестное состояние {dest}")
+        dests.append(row_dests)
+        outs.append([table[s][inp][1] for inp in alphabet])
+
+    incompatible = bytearray(n * n)
+    dependents = defaultdict(list)
+    worklist = []
+    for i in range(n):
+        di, oi = dests[i], outs[i]
+        for j in range(i + 1, n):
+            dj, oj = dests[j], outs[j]
+            pair = i * n + j
+            if any(a != b and a != DONT_CARE and b != DONT_CARE for a, b in zip(oi, oj)):
+                incompatible[pair] = 1
+                worklist.append(pair)
+                continue
+            # Пара зависит от пар, в которые она переходит
+            for a, b in zip(di, dj):
+                if a != b and a >= 0 and b >= 0:
+                    if a > b:
+                        a, b = b, a
+                    dependents[a * n + b].append(pair)
+
+    while worklist:
+        pair = worklist.pop()
+        for dependent in dependents.get(pair, ()):
+            if not incompatible[dependent]:
+                incompatible[dependent] = 1
+                worklist.append(dependent)
+
+    bin_matrix = {}
+    for i in range(n):
+        for j in range(i + 1, n):
+            s0, s1 = states[i], states[j]
+            bin_matrix[(min(s0, s1), max(s0, s1))] = 0 if incompatible[i * n + j] else 1
+    return bin_matrix
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _popcount(mask):
+    return bin(mask).count('1')
+
+
+def iter_maximal_compatibles(states, bin_matrix):
+    """
+    Генератор максимальных совместимых множеств состояний.
+
+    Граф совместимости задаётся бинарной матрицей (см. compatibility_matrix);
+    окрестность каждого состояния хранится битовой маской. Перебор идёт
+    без рекурсии, каждое максимальное множество выдаётся ровно один раз
+    в виде списка состояний в порядке states. Состояние, не совместимое
+    ни с одним другим, образует одноэлементное множество.
+    """
+    if not states:
+        return
+    index = {s: i for i, s in enumerate(states)}
+    neighbours = [0] * len(states)
+    for (s0, s1), val in bin_matrix.items():
+        if val == 1:
+            i, j = index[s0], index[s1]
+            neighbours[i] |= 1 << j
+            neighbours[j] |= 1 << i
+
+    # Элементы стека: (текущая клика R, кандидаты P, исключённые X)
+    stack = [((), (1 << len(states)) - 1, 0)]
+    while stack:
+        clique, candidates, excluded = stack.pop()
+        if not candidates:
+            if not excluded:
+                yield [states[i] for i in sorted(clique)]
+            continue
+        # Опорная вершина с наибольшим числом соседей среди кандидатов
+        pivot = max(_bits(candidates | excluded),
+                    key=lambda u: _popcount(candidates & neighbours[u]))
+        branches = []
+        for v in _bits(candidates & ~neighbours[pivot]):
+            branches.append((clique + (v,), candidates & neighbours[v], excluded & neighbours[v]))
+            candidates &= ~(1 << v)
+            excluded |= 1 << v
+        stack.extend(reversed(branches))
+
+
+def implied_sets(block, alphabet, table):
+    """
+    Множества состояний, в которые блок переходит по каждому входу
+    (неопределённые приёмники не учитываются). Возвращаются только
+    нетривиальные множества: из двух и более состояний и не содержащиеся
+    в самом блоке - именно они задают условия замкнутости покрытия.
+    """
+    members = set(block)
+    result = []
+    for inp in alphabet:
+        dests = {table[s][inp][0] for s in members} - {DONT_CARE}
+        if len(dests) > 1 and not dests <= members and dests not in result:
+            result.append(dests)
+    return result
+
+
+def _dominates(larger_class_set, class_set):
+    # Каждое порождённое множество большего блока содержится в порождённом множестве меньшего
+    return all(any(d <= e for e in class_set) for d in larger_class_set)
+
+
+def prime_compatibles(states, alphabet, table, maximal, limit=None):
+    """
+    Простые совместимые множества. Совместимое множество C не простое,
+    если есть простое C' ⊋ C, каждое порождённое множество которого
+    (implied_sets) содержится в каком-либо порождённом множестве C:
+    в любом замкнутом покрытии C можно заменить на C'.
+
+    Совместимые множества перебираются по убыванию размера, начиная
+    с максимальных (maximal); подмножества множества без порождённых
+    множеств не перебираются - оно доминирует их все.
+
+    Возвращает список множеств по убыванию размера или None,
+    если перебрано больше limit совместимых множеств.
+    """
+    order = {s: i for i, s in enumerate(states)}
+    levels = defaultdict(set)
+    for block in maximal:
+        levels[len(block)].add(frozenset(block))
+    primes = []
+    seen = 0
+    for size in range(max(levels, default=0), 0, -1):
+        for block in sorted(levels[size], key=lambda b: sorted(order[s] for s in b)):
+            seen += 1
+            if limit is not None and seen > limit:
+                return None
+            class_set = [frozenset(d) for d in implied_sets(block, alphabet, table)]
+            if not any(block < prime and _dominates(prime_class_set, class_set)
+                       for prime, prime_class_set in primes):
+                primes.append((block, class_set))
+            if class_set and size > 1:
+                levels[size - 1].update(block - {s} for s in block)
+    return [set(prime) for prime, _ in primes]
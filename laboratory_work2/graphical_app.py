@@ -1,24 +1,36 @@
 #!/usr/bin/env python3
 import sys, os, subprocess
 from PyQt5 import QtWidgets, QtGui, QtCore
+import matplotlib
+matplotlib.use("Agg")  # рисование идёт в фоновом потоке, окна matplotlib не используются
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
 import pandas as pd
-from itertools import combinations
-from collections import defaultdict
-from copy import deepcopy
 import networkx as nx
 
+from compatibility import compatibility_matrix, implied_sets, iter_maximal_compatibles, prime_compatibles
+from set_cover import STRATEGIES, find_cover
+from table_model import AutomatonTableModel
+
 
 # -------------------------- Глобальные переменные -------------------------- #
-way = set()
 LOGS = []
 LAST_DF_UPPER = None
 LAST_AUTOMATA = None
 LAST_MAX_COVER = None
 LAST_MIN_COVER = None
 LAST_BIN_MATRIX = None
+LAST_COVER_RESULT = None
+
+
+# Наибольшее число состояний, для которого рисуются бинарная матрица, покрытия
+# и граф совместимых пар: для больших автоматов картинки нечитаемы и долго строятся
+VISUALIZATION_STATES_LIMIT = 40
+VISUALIZATION_FILES = ("triangular_blocks_and_matrix_max.png", "triangular_blocks_and_matrix_min.png",
+                       "triangular_blocks_and_matrix_max.xlsx", "triangular_blocks_and_matrix_min.xlsx",
+                       "coverings_max_cover.png", "coverings_min_cover.png", "comparison_coverings.png",
+                       "compatibility_graph.png")
 
 
 def log_msg(message: str):
@@ -167,78 +179,117 @@ def draw_compatibility_graph(automata, bin_matrix):
 
 
 # ===================== Алгоритмическая часть (Anger-Pohl) =====================
-def anger_pohl(automata):
+def anger_pohl(automata, enforce_closure=False, time_limit=None, strategy="exact", progress=None):
+    # progress(value, message) - необязательный обработчик хода вычислений (0..100)
+    def stage(value, message):
+        if progress is not None:
+            progress(value, message)
+
     log_msg(">>> Запуск алгоритма Anger-Pohl")
-    aut = deepcopy(automata)
-    blocks_row = defaultdict(set)
-    binMatrix = {}
+    aut = automata
+    stage(5, "Формирование бинарной матрицы...")
 
     log_msg("Формирование бинарной матрицы (выявление несовместимых пар)...")
-    for s0, a0 in aut.table.items():
-        for s1, a1 in aut.table.items():
-            if s0 == s1:
-                continue
-            min_s = min(s0, s1)
-            max_s = max(s0, s1)
-            key, res = calculate(min_s, max_s, aut)
-            global way
-            way = set()
-            binMatrix[key] = res
-            log_msg(f"Пара ({min_s}, {max_s}): совместимость = {res}")
-            if res:
-                blocks_row[min_s].add(max_s)
-    log_msg("Бинарная матрица успешно сформирована.")
+    binMatrix = compatibility_matrix(aut.states, aut.alphabet, aut.table)
+    incompatible = sum(1 for res in binMatrix.values() if not res)
+    log_msg(f"Бинарная матрица успешно сформирована: пар состояний {len(binMatrix)}, "
+            f"несовместимых {incompatible}.")
+    draw = len(aut.states) <= VISUALIZATION_STATES_LIMIT
+    if not draw:
+        # Картинки прошлого запуска относятся к другому автомату
+        for path in VISUALIZATION_FILES:
+            if os.path.exists(path):
+                os.remove(path)
+        global LAST_DF_UPPER
+        LAST_DF_UPPER = None
+        log_msg(f"Состояний больше {VISUALIZATION_STATES_LIMIT}: визуализация матрицы и покрытий пропускается.")
 
     global LAST_BIN_MATRIX
     LAST_BIN_MATRIX = binMatrix
 
+    stage(25, "Поиск максимальных блоков покрытия...")
     log_msg("Поиск максимальных блоков покрытия...")
-    res_list = []
-    for i, a in blocks_row.items():
-        for subset in is_block(sorted(a), binMatrix):
-            res_list.append([i] + list(subset))
-            log_msg(f"Найден блок: {[i] + list(subset)}")
     max_cover = []
-    for cb in res_list:
-        if not any(set(cb).issubset(set(other)) and cb != other for other in res_list):
-            max_cover.append(sorted(cb, key=lambda x: int(x)))
+    for block in iter_maximal_compatibles(aut.states, binMatrix):
+        max_cover.append(sorted(block, key=lambda x: int(x)))
+        log_msg(f"Найден блок: {block}")
+    max_cover.sort(key=lambda block: [int(x) for x in block])
     log_msg(f"Максимальное покрытие: {max_cover}")
-    visualization(max_cover, binMatrix, "max")
-    draw_coverings_with_overlap(max_cover, "max_cover")
-
-    log_msg("Запуск минимизации покрытия методом set cover...")
-    min_cover = minimize_cover(max_cover, aut)
+    if draw:
+        stage(40, "Визуализация максимального покрытия...")
+        visualization(max_cover, binMatrix, "max")
+        draw_coverings_with_overlap(max_cover, "max_cover")
+
+    stage(55, "Поиск минимального покрытия...")
+    log_msg(f"Запуск минимизации покрытия методом set cover (стратегия: {strategy})...")
+    min_cover = minimize_cover(max_cover, aut, enforce_closure, time_limit, strategy)
     log_msg(f"Минимальное покрытие: {min_cover}")
-    visualization(min_cover, binMatrix, "min")
-    draw_coverings_with_overlap(min_cover, "min_cover")
+    if draw:
+        stage(70, "Визуализация минимального покрытия...")
+        visualization(min_cover, binMatrix, "min")
+        draw_coverings_with_overlap(min_cover, "min_cover")
 
     global LAST_AUTOMATA, LAST_MAX_COVER, LAST_MIN_COVER
     LAST_AUTOMATA = automata
     LAST_MAX_COVER = max_cover
     LAST_MIN_COVER = min_cover
 
-    draw_comparison_coverings(max_cover, min_cover)
+    stage(85, "Формирование отчёта...")
+    if draw:
+        draw_comparison_coverings(max_cover, min_cover)
     generate_report_docx(automata, max_cover, min_cover)
     log_msg(">>> Алгоритм Anger-Pohl завершён.")
+    stage(100, "Готово")
+
 
+# Наибольшее число совместимых множеств, перебираемых при поиске простых
+PRIME_COMPATIBLES_LIMIT = 20000
 
-def minimize_cover(max_cover, automata):
-    S = set(automata.states)
+
+def minimize_cover(max_cover, automata, enforce_closure=False, time_limit=None, strategy="exact"):
+    states = list(automata.states)
+    index = {s: i for i, s in enumerate(states)}
     candidate_blocks = [set(block) for block in max_cover]
-    n = len(candidate_blocks)
-    best = None
-    log_msg("Начало поиска оптимального минимального покрытия...")
-    for r in range(1, n + 1):
-        for comb in combinations(candidate_blocks, r):
-            if set().union(*comb) == S:
-                best = list(comb)
-                log_msg(f"Найдено покрытие из {r} блоков: {list(map(sorted, comb))}")
-                break
-        if best is not None:
-            break
-    if best is None:
+    # Для замкнутого покрытия кандидаты - простые совместимые множества;
+    # если их слишком много, поиск идёт только среди максимальных
+    complete = True
+    if enforce_closure:
+        primes = prime_compatibles(states, automata.alphabet, automata.table, max_cover, PRIME_COMPATIBLES_LIMIT)
+        if primes is None:
+            complete = False
+            log_msg(f"Совместимых множеств больше {PRIME_COMPATIBLES_LIMIT}: кандидаты - только максимальные.")
+        else:
+            candidate_blocks = primes
+            log_msg(f"Кандидаты для замкнутого покрытия: {len(primes)} простых совместимых множеств.")
+    masks = [sum(1 << index[s] for s in block) for block in candidate_blocks]
+    implications = None
+    if enforce_closure:
+        implications = [
+            [sum(1 << index[s] for s in implied) for implied in implied_sets(block, automata.alphabet, automata.table)]
+            for block in candidate_blocks
+        ]
+    log_msg(f"Начало поиска минимального покрытия, стратегия: {strategy}...")
+    if enforce_closure:
+        log_msg("Учитывается условие замкнутости покрытия.")
+    result = find_cover((1 << len(states)) - 1, masks, implications, strategy, time_limit, complete)
+    global LAST_COVER_RESULT
+    LAST_COVER_RESULT = result
+    log_msg(f"Обязательные блоки: {[sorted(candidate_blocks[i], key=int) for i in result.essential]}")
+    log_msg(f"Нижняя граница числа блоков: {result.lower_bound}")
+    if result.blocks is None:
         best = candidate_blocks
         log_msg("Не удалось найти оптимальное покрытие, используем все блоки.")
+    else:
+        best = [candidate_blocks[i] for i in result.blocks]
+        log_msg(f"Найдено покрытие из {len(best)} блоков: {list(map(sorted, best))} "
+                f"(узлов поиска: {result.nodes}, время: {result.elapsed:.3f} с)")
+        if result.optimal:
+            log_msg("Оптимальность покрытия доказана.")
+        elif not complete:
+            log_msg("Покрытие найдено среди максимальных совместимых множеств; оптимальность среди всех "
+                    f"замкнутых покрытий не доказана (разрыв с нижней границей {result.gap} блок(ов)).")
+        else:
+            log_msg(f"Оптимальность не доказана: разрыв с нижней границей {result.gap} блок(ов).")
     final_sorted = [sorted(list(b), key=lambda x: int(x)) for b in best if b]
     final_sorted.sort(key=lambda block: int(block[0]) if block else 0)
     return final_sorted
@@ -263,8 +314,9 @@ def generate_report_docx(automata, max_cover, min_cover):
     for i, block in enumerate(min_cover):
         doc.add_paragraph(f"Блок {i + 1}: {block}")
 
-    doc.add_heading("Визуализация бинарной матрицы", level=2)
-    doc.add_picture("triangular_blocks_and_matrix_max.png", width=Inches(6))
+    if os.path.exists("triangular_blocks_and_matrix_max.png"):
+        doc.add_heading("Визуализация бинарной матрицы", level=2)
+        doc.add_picture("triangular_blocks_and_matrix_max.png", width=Inches(6))
 
     doc.add_heading("Логи хода решения", level=2)
     doc.add_paragraph("\n".join(LOGS))
@@ -341,82 +393,6 @@ def visualization(blocks, bin_matrix, identifier=""):
     plt.close(fig)
 
 
-def calculate(s0_, s1_, aut_):
-    s0 = deepcopy(s0_)
-    s1 = deepcopy(s1_)
-    aut = deepcopy(aut_)
-    a0 = aut.table[s0]
-    a1 = aut.table[s1]
-    log_msg(f"Вычисление совместимости для {s0} и {s1} ...")
-
-    for inp in aut.alphabet:
-        if a0[inp][1] != a1[inp][1] and a0[inp][1] != "-" and a1[inp][1] != "-":
-            log_msg(f"Несовместимость по символу '{inp}' для {s0} и {s1}")
-            return (min(s0, s1), max(s0, s1)), 0
-
-    Yav_Soot = True
-    for inp in aut.alphabet:
-        for i in range(2):
-            if not (a0[inp][i] == a1[inp][i] or a0[inp][i] == "-" or a1[inp][i] == "-"):
-                Yav_Soot = False
-                log_msg(f"Отличие (позиция {i}) по '{inp}' для {s0} и {s1}")
-                break
-        if not Yav_Soot:
-            break
-
-    if Yav_Soot:
-        log_msg(f"Состояния {s0} и {s1} явно совместимы.")
-        return (min(s0, s1), max(s0, s1)), 1
-
-    global way
-    if (min(s0, s1), max(s0, s1)) in way:
-        log_msg(f"Состояния {s0} и {s1} уже проверялись – считаем совместимыми.")
-        return (min(s0, s1), max(s0, s1)), 1
-    else:
-        way.add((min(s0, s1), max(s0, s1)))
-
-    coord = get_way(a0, a1)
-    log_msg(f"Переходы для {s0} и {s1}: {coord}")
-    ans = []
-    for c in coord:
-        res = calculate(*c, aut)[1]
-        ans.append(res)
-        log_msg(f"Рекурсивное вычисление для перехода {c}: {res}")
-    final_val = int(all(ans))
-    log_msg(f"Итоговая совместимость для {s0} и {s1}: {final_val}")
-    return (min(s0, s1), max(s0, s1)), final_val
-
-
-def get_way(a0_, a1_):
-    a0 = deepcopy(a0_)
-    a1 = deepcopy(a1_)
-    ans = []
-    for inp, res in a0.items():
-        if res[0] != '-' and a1[inp][0] != '-' and res[0] != a1[inp][0]:
-            ans.append((min(res[0], a1[inp][0]), max(res[0], a1[inp][0])))
-    return ans
-
-
-def is_block(block, binMatrix):
-    incor = [pair for pair in combinations(block, 2) if binMatrix.get(pair, 0) != 1]
-    if not incor:
-        log_msg(f"Все пары в блоке {block} совместимы.")
-        return [block]
-    max_blocks = set()
-    for s in block:
-        temp = block.copy()
-        temp.remove(s)
-        for sub in is_block(temp, binMatrix):
-            if sub:
-                max_blocks.add(tuple(sub))
-    final_blocks = []
-    for candidate in max_blocks:
-        if not any(set(candidate).issubset(set(other)) and candidate != other for other in max_blocks):
-            final_blocks.append(candidate)
-    log_msg(f"Подблоки для {block}: {final_blocks}")
-    return final_blocks
-
-
 # -------------------- Классы автомата -------------------- #
 class BaseAutomata:
     def __init__(self, states, initial_state, alphabet):
@@ -440,12 +416,32 @@ class MealyAutomata(BaseAutomata):
 
 # -------------------- Статистика + Формула-калькулятор -------------------- #
 def show_statistics():
-    global LAST_AUTOMATA, LAST_MAX_COVER, LAST_MIN_COVER
+    global LAST_AUTOMATA, LAST_MAX_COVER, LAST_MIN_COVER, LAST_COVER_RESULT
     if LAST_AUTOMATA is None or LAST_MAX_COVER is None or LAST_MIN_COVER is None:
         return "<html><body><p>Нет данных для статистики.</p></body></html>"
     num_states = len(LAST_AUTOMATA.states)
     num_max_blocks = len(LAST_MAX_COVER)
     num_min_blocks = len(LAST_MIN_COVER)
+    cover_rows = ""
+    if LAST_COVER_RESULT is not None:
+        r = LAST_COVER_RESULT
+        cover_rows = f"""
+          <tr>
+            <td>Стратегия покрытия</td>
+            <td>{r.strategy}</td>
+          </tr>
+          <tr>
+            <td>Время поиска покрытия, с</td>
+            <td>{r.elapsed:.3f}</td>
+          </tr>
+          <tr>
+            <td>Нижняя граница (блоков)</td>
+            <td>{r.lower_bound}</td>
+          </tr>
+          <tr>
+            <td>Разрыв с нижней границей</td>
+            <td>{r.gap if r.gap is not None else '-'}{'' if r.optimal else ' (оптимальность не доказана)'}</td>
+          </tr>"""
     html = f"""
     <html>
       <head>
@@ -474,7 +470,7 @@ def show_statistics():
           <tr>
             <td>Блоков (мин. покрытие)</td>
             <td>{num_min_blocks}</td>
-          </tr>
+          </tr>{cover_rows}
         </table>
         <h3>Максимальное покрытие</h3>
         <p>{LAST_MAX_COVER}</p>
@@ -486,6 +482,55 @@ def show_statistics():
     return html
 
 
+# -------------------- Фоновое вычисление покрытия -------------------- #
+class CoverageCancelled(Exception):
+    pass
+
+
+class CoverageWorkerSignals(QtCore.QObject):
+    progress = QtCore.pyqtSignal(int, str)
+    finished = QtCore.pyqtSignal()
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+
+
+class CoverageWorker(QtCore.QRunnable):
+    """
+    Запускает anger_pohl (вычисления, графики и отчёт) в пуле потоков.
+    Ход вычислений передаётся сигналом progress; отмена срабатывает
+    на границе этапов алгоритма.
+    """
+    def __init__(self, automata, enforce_closure, time_limit, strategy):
+        super().__init__()
+        self.automata = automata
+        self.enforce_closure = enforce_closure
+        self.time_limit = time_limit
+        self.strategy = strategy
+        self.signals = CoverageWorkerSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _progress(self, value, message):
+        if self._cancelled:
+            raise CoverageCancelled
+        self.signals.progress.emit(value, message)
+
+    def run(self):
+        try:
+            anger_pohl(self.automata, self.enforce_closure, self.time_limit, self.strategy,
+                       progress=self._progress)
+        except CoverageCancelled:
+            log_msg("Вычисление покрытия отменено.")
+            self.signals.cancelled.emit()
+            return
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit()
+
+
 # -------------------- Плавающая кнопка (FAB) -------------------- #
 class FloatingActionButton(QtWidgets.QToolButton):
     """
@@ -548,12 +593,12 @@ class MainWindow(QtWidgets.QMainWindow):
                 font-weight: bold;
                 border-bottom: 2px solid #42a3f5;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #ffffff;
                 gridline-color: #ccc;
                 alternate-background-color: #f7f7f7;
             }
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background-color: #e3f2fd;
             }
             QHeaderView::section {
@@ -613,10 +658,15 @@ class MainWindow(QtWidgets.QMainWindow):
         self.setupCalcTab()
         self.tabs.addTab(self.calc_tab, "Калькулятор")
 
+        self.coverage_worker = None  # Текущее фоновое вычисление (CoverageWorker)
         self.progress_bar = QtWidgets.QProgressBar()
-        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setRange(0, 100)
         self.progress_bar.setVisible(False)
         self.statusBar().addWidget(self.progress_bar)
+        self.cancel_button = QtWidgets.QPushButton("Отмена")
+        self.cancel_button.setVisible(False)
+        self.cancel_button.clicked.connect(self.cancelCoverage)
+        self.statusBar().addWidget(self.cancel_button)
 
         self.fab = FloatingActionButton("fab_icon.png", self)
         self.fab.setToolTip("Дополнительные действия")
@@ -658,7 +708,7 @@ class MainWindow(QtWidgets.QMainWindow):
         dim_layout = QtWidgets.QHBoxLayout()
         dim_layout.addWidget(QtWidgets.QLabel("Число состояний:"))
         self.num_states_spin = QtWidgets.QSpinBox()
-        self.num_states_spin.setRange(1, 50)
+        self.num_states_spin.setRange(1, 10000)
         self.num_states_spin.setValue(9)  # по умолчанию
         dim_layout.addWidget(self.num_states_spin)
 
@@ -694,9 +744,32 @@ class MainWindow(QtWidgets.QMainWindow):
         top_layout.addWidget(self.gif_label, alignment=QtCore.Qt.AlignRight | QtCore.Qt.AlignTop)
         layout.addLayout(top_layout)
 
-        # Создаём таблицу (по умолчанию 9 строк, 2 столбца + 1 для State)
-        self.table_widget = QtWidgets.QTableWidget()
-        layout.addWidget(self.table_widget)
+        # Таблица (по умолчанию 9 строк, 2 столбца + 1 для State); данные
+        # хранит модель, представление отрисовывает только видимые ячейки
+        self.table_model = AutomatonTableModel(parent=self)
+        self.table_view = QtWidgets.QTableView()
+        self.table_view.setModel(self.table_model)
+        self.table_view.verticalHeader().setVisible(False)
+        self.table_view.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.table_view.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        layout.addWidget(self.table_view)
+
+        # Параметры поиска минимального покрытия
+        cover_layout = QtWidgets.QHBoxLayout()
+        self.closure_checkbox = QtWidgets.QCheckBox("Учитывать замкнутость покрытия")
+        self.closure_checkbox.setToolTip("Каждое множество, порождаемое блоком по входу, должно входить в блок покрытия")
+        cover_layout.addWidget(self.closure_checkbox)
+        cover_layout.addWidget(QtWidgets.QLabel("Стратегия:"))
+        self.strategy_combo = QtWidgets.QComboBox()
+        self.strategy_combo.addItems(STRATEGIES)
+        self.strategy_combo.setToolTip("exact - точный поиск, greedy - жадный, greedy+local - жадный с локальным поиском")
+        cover_layout.addWidget(self.strategy_combo)
+        cover_layout.addWidget(QtWidgets.QLabel("Лимит времени поиска, с (0 - без лимита):"))
+        self.time_limit_spin = QtWidgets.QDoubleSpinBox()
+        self.time_limit_spin.setRange(0, 3600)
+        self.time_limit_spin.setValue(10)
+        cover_layout.addWidget(self.time_limit_spin)
+        layout.addLayout(cover_layout)
 
         # Кнопка "Вычислить покрытие"
         self.compute_button = QtWidgets.QPushButton("Вычислить покрытие")
@@ -713,25 +786,7 @@ class MainWindow(QtWidgets.QMainWindow):
         Остальные: входные символы (a,b,c,...).
         Ячейки изначально пустые, чтобы пользователь заполнял "состояние, реакция".
         """
-        row_count = self.num_states_spin.value()
-        col_count = self.num_cols_spin.value()
-
-        self.table_widget.clear()
-        self.table_widget.setRowCount(row_count)
-        self.table_widget.setColumnCount(col_count + 1)
-
-        # Задаём имена столбцов
-        alphabet = [chr(ord('a') + i) for i in range(col_count)]
-        headers = ["State"] + alphabet
-        self.table_widget.setHorizontalHeaderLabels(headers)
-        self.table_widget.verticalHeader().setVisible(False)
-        self.table_widget.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
-
-        # Заполняем первый столбец "State" (read-only)
-        for i in range(row_count):
-            state_item = QtWidgets.QTableWidgetItem(str(i + 1))
-            state_item.setFlags(QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled)
-            self.table_widget.setItem(i, 0, state_item)
+        self.table_model.resize(self.num_states_spin.value(), self.num_cols_spin.value())
 
     def setupResultTab(self):
         layout = QtWidgets.QVBoxLayout(self.result_tab)
@@ -814,79 +869,74 @@ class MainWindow(QtWidgets.QMainWindow):
     def computeCoverage(self):
         global LOGS
         LOGS = []
-        input_table = {}
-        states = []
-
-        # Собираем алфавит по числу столбцов (кроме первого)
-        col_count = self.table_widget.columnCount() - 1
-        alphabet = [chr(ord('a') + i) for i in range(col_count)]
-
-        def parse_cell(item, row_idx, col_name):
-            if item is None or not item.text().strip():
-                QtWidgets.QMessageBox.warning(
-                    self,
-                    "Ошибка ввода",
-                    f"Пустое или некорректное значение в строке {row_idx+1}, столбец '{col_name}'.\n"
-                    "Формат: 'состояние, реакция' (например: '5, x')."
-                )
-                raise ValueError("Некорректный формат ячейки")
-            text = item.text().strip()
-            parts = [p.strip() for p in text.split(",")]
-            if len(parts) < 2:
-                QtWidgets.QMessageBox.warning(
-                    self,
-                    "Ошибка ввода",
-                    f"Некорректный формат в строке {row_idx+1}, столбец '{col_name}'. "
-                    "Ожидается два элемента, разделённые запятой."
-                )
-                raise ValueError("Некорректный формат ячейки")
-            return parts[:2]
-
-        try:
-            row_count = self.table_widget.rowCount()
-            for i in range(row_count):
-                state_item = self.table_widget.item(i, 0)
-                if not state_item or not state_item.text().strip():
-                    continue
-
-                st = state_item.text().strip()
-                states.append(st)
-                input_table[st] = {}
-
-                for c_i, col_sym in enumerate(alphabet, start=1):
-                    cell_item = self.table_widget.item(i, c_i)
-                    parsed = parse_cell(cell_item, i, col_sym)
-                    input_table[st][col_sym] = parsed
-
-            if not states:
-                QtWidgets.QMessageBox.warning(self, "Ошибка ввода", "Таблица не содержит состояний.")
-                return
-
-            log_msg("Начато чтение таблицы из интерфейса.")
-            self.progress_bar.setVisible(True)
-            QtWidgets.QApplication.processEvents()
-
-            automata = MealyAutomata(states, states[0], alphabet, input_table)
-            log_msg("Таблица автомата успешно считана.")
-
-            anger_pohl(automata)
-
-            self.progress_bar.setVisible(False)
-            self.result_text.setPlainText("\n".join(LOGS))
-            QtWidgets.QMessageBox.information(
-                self, "Выполнено",
-                "Расчёты завершены. Отчёт сохранён в 'coverage_report.docx'."
-            )
-            self.tabs.setCurrentWidget(self.result_tab)
 
-        except ValueError:
-            self.progress_bar.setVisible(False)
+        error = self.table_model.validate()
+        if error is not None:
+            row, col, message = error
+            self.table_view.setCurrentIndex(self.table_model.index(row, col + 1))
+            self.table_view.scrollTo(self.table_model.index(row, col + 1))
+            QtWidgets.QMessageBox.warning(self, "Ошибка ввода", message)
             return
-        except Exception as e:
-            self.progress_bar.setVisible(False)
-            QtWidgets.QMessageBox.critical(
-                self, "Ошибка", f"Произошла непредвиденная ошибка:\n{str(e)}"
-            )
+
+        log_msg("Начато чтение таблицы из интерфейса.")
+        states, alphabet, input_table = self.table_model.to_automaton()
+        automata = MealyAutomata(states, states[0], alphabet, input_table)
+        log_msg("Таблица автомата успешно считана.")
+
+        time_limit = self.time_limit_spin.value() or None
+        worker = CoverageWorker(automata, self.closure_checkbox.isChecked(), time_limit,
+                                self.strategy_combo.currentText())
+        worker.signals.progress.connect(self.onCoverageProgress)
+        worker.signals.finished.connect(self.onCoverageFinished)
+        worker.signals.failed.connect(self.onCoverageFailed)
+        worker.signals.cancelled.connect(self.onCoverageCancelled)
+        self.coverage_worker = worker
+        self.compute_button.setEnabled(False)
+        self.cancel_button.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def onCoverageProgress(self, value, message):
+        self.progress_bar.setValue(value)
+        self.statusBar().showMessage(message)
+
+    def cancelCoverage(self):
+        if self.coverage_worker is not None:
+            self.coverage_worker.cancel()
+            self.statusBar().showMessage("Отмена вычислений...")
+
+    def finishCoverage(self, message):
+        self.coverage_worker = None
+        self.compute_button.setEnabled(True)
+        self.cancel_button.setVisible(False)
+        self.progress_bar.setVisible(False)
+        self.statusBar().showMessage(message, 5000)
+        self.result_text.setPlainText("\n".join(LOGS))
+
+    def onCoverageFinished(self):
+        self.finishCoverage("Расчёты завершены")
+        QtWidgets.QMessageBox.information(
+            self, "Выполнено",
+            "Расчёты завершены. Отчёт сохранён в 'coverage_report.docx'."
+        )
+        self.tabs.setCurrentWidget(self.result_tab)
+
+    def onCoverageCancelled(self):
+        self.finishCoverage("Вычисление покрытия отменено")
+
+    def onCoverageFailed(self, error):
+        self.finishCoverage("Ошибка вычислений")
+        QtWidgets.QMessageBox.critical(
+            self, "Ошибка", f"Произошла непредвиденная ошибка:\n{error}"
+        )
+
+    def closeEvent(self, event):
+        # Дожидаемся фоновых вычислений перед выходом
+        if self.coverage_worker is not None:
+            self.coverage_worker.cancel()
+        QtCore.QThreadPool.globalInstance().waitForDone()
+        super().closeEvent(event)
 
     def showLogs(self):
         dlg = QtWidgets.QDialog(self)
@@ -996,6 +1046,13 @@ class MainWindow(QtWidgets.QMainWindow):
                 "Сначала вычислите покрытие, чтобы получить автомат и бинарную матрицу."
             )
             return
+        if len(LAST_AUTOMATA.states) > VISUALIZATION_STATES_LIMIT:
+            QMessageBox.information(
+                self,
+                "Граф не строится",
+                f"Граф совместимых пар строится для автоматов не более чем из {VISUALIZATION_STATES_LIMIT} состояний."
+            )
+            return
 
         draw_compatibility_graph(LAST_AUTOMATA, LAST_BIN_MATRIX)
 
@@ -1069,13 +1126,13 @@ class MainWindow(QtWidgets.QMainWindow):
                     font-weight: bold;
                     border-bottom: 2px solid #88c0d0;
                 }
-                QTableWidget {
+                QTableView {
                     background-color: #3b3b3b;
                     color: #eee;
                     gridline-color: #666;
                     alternate-background-color: #4c4c4c;
                 }
-                QTableWidget::item:hover {
+                QTableView::item:hover {
                     background-color: #616161;
                 }
                 QHeaderView::section {
@@ -1152,12 +1209,12 @@ class MainWindow(QtWidgets.QMainWindow):
                     font-weight: bold;
                     border-bottom: 2px solid #42a3f5;
                 }
-                QTableWidget {
+                QTableView {
                     background-color: #ffffff;
                     gridline-color: #ccc;
                     alternate-background-color: #f7f7f7;
                 }
-                QTableWidget::item:hover {
+                QTableView::item:hover {
                     background-color: #e3f2fd;
                 }
                 QHeaderView::section {
@@ -0,0 +1,273 @@
+"""
+Поиск минимального покрытия множества состояний блоками.
+
+Блоки и множества состояний кодируются битовыми масками (int). Точный
+поиск - метод ветвей и границ:
+  - ветвление по непокрытому состоянию с наименьшим числом блоков-кандидатов
+    (состояние с единственным кандидатом делает этот блок обязательным);
+  - среди кандидатов отбрасываются доминируемые: блок, чья непокрытая часть
+    содержится в непокрытой части другого кандидата;
+  - нижняя граница - максимум из числа попарно "независимых" состояний
+    (никакой блок не покрывает два из них) и ceil(|U| / max|B|);
+  - ограничение по времени: по его исчерпании возвращается лучшее
+    найденное покрытие.
+
+Дополнительно может требоваться замкнутость покрытия: для каждого
+выбранного блока все порождаемые им по входам множества состояний
+должны содержаться в каком-либо выбранном блоке.
+
+Для интерактивной работы есть быстрые стратегии: жадная (приближение
+в ln n раз) и жадная с локальным поиском (удаление избыточных блоков и
+замена двух блоков одним). Любая стратегия сообщает доказанную нижнюю
+границу, так что разрыв до оптимума виден в каждом результате.
+"""
+
+import time
+
+
+class CoverResult:
+    """
+    Результат поиска покрытия.
+
+    strategy    - стратегия поиска ('exact', 'greedy', 'greedy+local')
+    blocks      - номера выбранных блоков
+    lower_bound - доказанная нижняя граница размера покрытия
+    optimal     - True, если оптимальность доказана (поиск не прерван)
+    essential   - номера обязательных блоков (единственных для какого-то состояния)
+    nodes       - число просмотренных узлов дерева поиска
+    elapsed     - время поиска, с
+    """
+
+    def __init__(self, strategy, blocks, lower_bound, optimal, essential, nodes, elapsed):
+        self.strategy = strategy
+        self.blocks = blocks
+        self.lower_bound = lower_bound
+        self.optimal = optimal
+        self.essential = essential
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    @property
+    def gap(self):
+        """
+        Разрыв между размером найденного покрытия и нижней границей.
+        """
+        return None if self.blocks is None else len(self.blocks) - self.lower_bound
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _popcount(mask):
+    return bin(mask).count('1')
+
+
+class _CoverSearch:
+    def __init__(self, universe, masks, implications, time_limit):
+        self.universe = universe
+        self.masks = masks
+        # implications[b] - маски множеств, которые порождает блок b
+        self.implications = implications
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self.max_size = max((_popcount(m & universe) for m in masks), default=0)
+        # covering[e] - битовая маска номеров блоков, содержащих состояние e
+        self.covering = {}
+        for b, mask in enumerate(masks):
+            for e in _bits(mask & universe):
+                self.covering[e] = self.covering.get(e, 0) | (1 << b)
+        self.best = None
+        self.nodes = 0
+
+    # ------------------------------------------------------------------ #
+
+    def unsatisfied(self, chosen):
+        """
+        Первое порождённое множество, не содержащееся ни в одном выбранном блоке.
+        """
+        if self.implications is None:
+            return 0
+        for b in chosen:
+            for implied in self.implications[b]:
+                if not any(implied & ~self.masks[c] == 0 for c in chosen):
+                    return implied
+        return 0
+
+    def lower_bound(self, uncovered, allowed):
+        if not uncovered:
+            return 0
+        used = 0
+        independent = 0
+        for e in sorted(_bits(uncovered), key=lambda e: _popcount(self.covering.get(e, 0) & allowed)):
+            owners = self.covering.get(e, 0) & allowed
+            if not owners & used:
+                independent += 1
+                used |= owners
+        by_size = -(-_popcount(uncovered) // self.max_size) if self.max_size else 0
+        return max(independent, by_size)
+
+    def requirement(self, chosen, covered, allowed):
+        """
+        Очередное требование (маска, которая должна войти в выбранный блок)
+        и блоки-кандидаты для него.
+        """
+        uncovered = self.universe & ~covered
+        if uncovered:
+            element = min(_bits(uncovered), key=lambda e: _popcount(self.covering.get(e, 0) & allowed))
+            return 1 << element, self.covering.get(element, 0) & allowed
+        implied = self.unsatisfied(chosen)
+        if implied:
+            return implied, sum(1 << b for b in _bits(allowed) if implied & ~self.masks[b] == 0)
+        return 0, 0
+
+    def ordered_candidates(self, candidates, uncovered):
+        gains = {b: self.masks[b] & uncovered for b in _bits(candidates)}
+        order = sorted(gains, key=lambda b: -_popcount(gains[b]))
+        if self.implications is not None:
+            return order
+        # Доминирование: блок, чья непокрытая часть покрывается другим кандидатом, не нужен
+        kept = []
+        for b in order:
+            if not any(gains[b] & ~gains[c] == 0 for c in kept):
+                kept.append(b)
+        return kept
+
+    # ------------------------------------------------------------------ #
+
+    def feasible(self, chosen):
+        covered = 0
+        for b in chosen:
+            covered |= self.masks[b]
+        return self.universe & ~covered == 0 and not self.unsatisfied(chosen)
+
+    def greedy(self):
+        """
+        Жадное покрытие: пока есть непокрытые состояния, берётся блок
+        с наибольшим числом новых состояний; затем добираются блоки
+        для невыполненных условий замкнутости.
+        """
+        chosen = []
+        covered = 0
+        allowed = (1 << len(self.masks)) - 1
+        while True:
+            required, candidates = self.requirement(chosen, covered, allowed)
+            if not required:
+                return chosen
+            if not candidates:
+                return None
+            uncovered = self.universe & ~covered
+            if uncovered:
+                candidates = allowed
+            b = max(_bits(candidates), key=lambda c: _popcount(self.masks[c] & uncovered))
+            chosen.append(b)
+            covered |= self.masks[b]
+            allowed &= ~(1 << b)
+
+    def local_search(self, chosen):
+        """
+        Улучшение покрытия: удаление избыточных блоков и замена пары
+        выбранных блоков одним невыбранным, пока это возможно.
+        """
+        chosen = list(chosen)
+        improved = True
+        while improved:
+            self.nodes += 1
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                break
+            improved = False
+            for b in sorted(chosen, key=lambda c: _popcount(self.masks[c])):
+                rest = [c for c in chosen if c != b]
+                if self.feasible(rest):
+                    chosen = rest
+                    improved = True
+                    break
+            if improved:
+                continue
+            unused = [b for b in range(len(self.masks)) if b not in chosen]
+            for i in range(len(chosen)):
+                for j in range(i + 1, len(chosen)):
+                    rest = chosen[:i] + chosen[i + 1:j] + chosen[j + 1:]
+                    for b in unused:
+                        if self.feasible(rest + [b]):
+                            chosen = rest + [b]
+                            improved = True
+                            break
+                    if improved:
+                        break
+                if improved:
+                    break
+        return chosen
+
+    def search(self, chosen, covered, allowed):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % 256 == 0 and time.perf_counter() > self.deadline:
+            raise _Timeout
+        required, candidates = self.requirement(chosen, covered, allowed)
+        if not required:
+            if self.best is None or len(chosen) < len(self.best):
+                self.best = list(chosen)
+            return
+        uncovered = self.universe & ~covered
+        bound = len(chosen) + max(1, self.lower_bound(uncovered, allowed))
+        if self.best is not None and bound >= len(self.best):
+            return
+        for b in self.ordered_candidates(candidates, uncovered):
+            allowed &= ~(1 << b)
+            chosen.append(b)
+            self.search(chosen, covered | self.masks[b], allowed)
+            chosen.pop()
+
+
+STRATEGIES = ('exact', 'greedy', 'greedy+local')
+
+
+def find_cover(universe, masks, implications=None, strategy='exact', time_limit=None, complete=True):
+    """
+    Покрытие маски universe блоками masks выбранной стратегией.
+
+    implications - None (замкнутость не требуется) или список, где
+    implications[b] - маски множеств, порождаемых блоком b.
+    strategy     - 'exact' (ветви и границы), 'greedy' или 'greedy+local'.
+    time_limit   - ограничение по времени в секундах (None - без ограничения).
+    complete     - False, если среди masks может не быть блоков оптимального
+                   покрытия: тогда оптимальность не заявляется, а нижняя
+                   граница считается только по условию покрытия.
+
+    Возвращает CoverResult; blocks равен None, если покрытие не найдено:
+    для 'exact' без прерывания по времени это значит, что его не существует,
+    жадные стратегии могут не найти существующее покрытие при условиях
+    замкнутости.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Неизвестная стратегия покрытия: {strategy}")
+    started = time.perf_counter()
+    search = _CoverSearch(universe, masks, implications, time_limit)
+    all_blocks = (1 << len(masks)) - 1
+    essential = sorted({next(_bits(owners)) for owners in search.covering.values()
+                        if owners and owners & (owners - 1) == 0})
+    root_bound = search.lower_bound(universe, all_blocks)
+    search.best = search.greedy()
+    optimal = search.best is not None and len(search.best) == root_bound
+    if strategy == 'exact' and not optimal:
+        # Поиск нужен и тогда, когда жадный алгоритм зашёл в тупик
+        try:
+            search.search([], 0, all_blocks)
+            optimal = True
+        except _Timeout:
+            pass
+    elif strategy == 'greedy+local' and search.best is not None and not optimal:
+        search.best = search.local_search(search.best)
+        optimal = len(search.best) == root_bound
+    best = sorted(search.best) if search.best is not None else None
+    optimal = optimal and complete
+    lower_bound = len(best) if best is not None and optimal else root_bound
+    return CoverResult(strategy, best, lower_bound, optimal, essential, search.nodes,
+                       time.perf_counter() - started)
+
@@ -0,0 +1,183 @@
+"""
+Модель таблицы частичного автомата Мили для QTableView.
+
+Вместо QTableWidgetItem на каждую ячейку таблица хранится в двух массивах
+int32 (n_states, n_symbols): номер состояния-приёмника и номер реакции
+в списке интернированных реакций. Особые коды: DONT_CARE ('-'),
+EMPTY (ячейка не заполнена) и INVALID (текст не разобран; сам текст
+хранится отдельно, только для таких ячеек).
+
+Ячейка разбирается при вводе, а ошибки показываются подсветкой только
+у отрисовываемых ячеек; полная проверка (validate) и сборка таблицы для
+MealyAutomata и anger_pohl (to_automaton) выполняются одним проходом
+по массивам перед вычислением покрытия.
+"""
+
+import numpy as np
+from PyQt5 import QtCore, QtGui
+
+from compatibility import DONT_CARE
+
+EMPTY = -2
+INVALID = -3
+_DONT_CARE_CODE = -1
+
+CELL_FORMAT_HINT = "Формат: 'состояние, реакция' (например: '5, x')."
+
+
+class AutomatonTableModel(QtCore.QAbstractTableModel):
+    """
+    Таблица автомата: столбец 0 - номер состояния (только чтение),
+    столбцы 1..k - ячейки 'состояние, реакция' по входным символам.
+    Состояния называются '1'..'n', символы - 'a', 'b', ...
+    """
+
+    def __init__(self, n_states=9, n_symbols=2, parent=None):
+        super().__init__(parent)
+        self.resize(n_states, n_symbols)
+
+    # ------------------------------------------------------------------ #
+    # Размеры и коды
+    # ------------------------------------------------------------------ #
+
+    def resize(self, n_states, n_symbols):
+        """
+        Новая пустая таблица.
+        """
+        self.beginResetModel()
+        self.states = [str(i + 1) for i in range(n_states)]
+        self.alphabet = [chr(ord('a') + i) for i in range(n_symbols)]
+        self.dest = np.full((n_states, n_symbols), EMPTY, dtype=np.int32)
+        self.out = np.full((n_states, n_symbols), EMPTY, dtype=np.int32)
+        self.reactions = []
+        self._reaction_index = {}
+        self._invalid = {}
+        self.endResetModel()
+
+    def _reaction_code(self, reaction):
+        if reaction == DONT_CARE:
+            return _DONT_CARE_CODE
+        code = self._reaction_index.get(reaction)
+        if code is None:
+            code = self._reaction_index[reaction] = len(self.reactions)
+            self.reactions.append(reaction)
+        return code
+
+    def _parse(self, text):
+        """
+        Коды (приёмник, реакция) для текста ячейки; (INVALID, INVALID),
+        если текст не разобран, и (EMPTY, EMPTY) для пустой ячейки.
+        """
+        text = text.strip()
+        if not text:
+            return EMPTY, EMPTY
+        parts = [p.strip() for p in text.split(",")]
+        if len(parts) < 2 or not parts[1]:
+            return INVALID, INVALID
+        dest = parts[0]
+        if dest == DONT_CARE:
+            dest_code = _DONT_CARE_CODE
+        elif dest.isdigit() and 1 <= int(dest) <= len(self.states) and dest == str(int(dest)):
+            dest_code = int(dest) - 1
+        else:
+            return INVALID, INVALID
+        return dest_code, self._reaction_code(parts[1])
+
+    def _text(self, row, col):
+        dest, out = int(self.dest[row, col]), int(self.out[row, col])
+        if dest == EMPTY:
+            return ""
+        if dest == INVALID:
+            return self._invalid[(row, col)]
+        dest_text = DONT_CARE if dest == _DONT_CARE_CODE else self.states[dest]
+        out_text = DONT_CARE if out == _DONT_CARE_CODE else self.reactions[out]
+        return f"{dest_text}, {out_text}"
+
+    def set_cell(self, row, col, text):
+        """
+        Записывает текст в ячейку row, col (col - номер символа, с нуля).
+        """
+        dest, out = self._parse(text)
+        self.dest[row, col] = dest
+        self.out[row, col] = out
+        if dest == INVALID:
+            self._invalid[(row, col)] = text.strip()
+        else:
+            self._invalid.pop((row, col), None)
+
+    # ------------------------------------------------------------------ #
+    # Интерфейс QAbstractTableModel
+    # ------------------------------------------------------------------ #
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.states)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.alphabet) + 1
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return self.states[row] if col == 0 else self._text(row, col - 1)
+        if role == QtCore.Qt.BackgroundRole and col > 0 and self.dest[row, col - 1] == INVALID:
+            return QtGui.QBrush(QtGui.QColor("#ffcccc"))
+        if role == QtCore.Qt.ToolTipRole and col > 0 and self.dest[row, col - 1] == INVALID:
+            return f"Некорректная ячейка. {CELL_FORMAT_HINT}"
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if not index.isValid() or index.column() == 0 or role != QtCore.Qt.EditRole:
+            return False
+        self.set_cell(index.row(), index.column() - 1, str(value))
+        self.dataChanged.emit(index, index)
+        return True
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole or orientation != QtCore.Qt.Horizontal:
+            return None
+        return "State" if section == 0 else self.alphabet[section - 1]
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        flags = QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
+        return flags if index.column() == 0 else flags | QtCore.Qt.ItemIsEditable
+
+    # ------------------------------------------------------------------ #
+    # Проверка и сборка автомата
+    # ------------------------------------------------------------------ #
+
+    def validate(self):
+        """
+        Первая незаполненная или некорректная ячейка: (строка, символ,
+        сообщение) или None, если таблица заполнена верно.
+        """
+        bad = np.argwhere(self.dest < _DONT_CARE_CODE)
+        if not len(bad):
+            return None
+        row, col = (int(v) for v in bad[0])
+        symbol = self.alphabet[col]
+        if self.dest[row, col] == EMPTY:
+            return row, col, f"Пустое значение в строке {row + 1}, столбец '{symbol}'.\n{CELL_FORMAT_HINT}"
+        return row, col, (f"Некорректное значение в строке {row + 1}, столбец '{symbol}': "
+                          f"'{self._invalid[(row, col)]}'.\n{CELL_FORMAT_HINT}")
+
+    def to_automaton(self):
+        """
+        Таблица для MealyAutomata и anger_pohl: (states, alphabet, table),
+        где table[state][symbol] = [приёмник, реакция], '-' - неопределённое
+        значение. Таблица должна проходить validate.
+        """
+        dest_names = self.states + [DONT_CARE]
+        out_names = self.reactions + [DONT_CARE]
+        # Код -1 (DONT_CARE) указывает на последний элемент списков имён
+        dest_rows = self.dest.tolist()
+        out_rows = self.out.tolist()
+        alphabet = list(self.alphabet)
+        table = {
+            state: {symbol: [dest_names[d], out_names[o]] for symbol, d, o in zip(alphabet, dests, outs)}
+            for state, dests, outs in zip(self.states, dest_rows, out_rows)
+        }
+        return list(self.states), alphabet, table
@@ -0,0 +1,13 @@
+import os
+import random
+import sys
+
+import pytest
+
+# Модули лабораторной работы импортируются как соседние скрипты
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+
+@pytest.fixture
+def rng():
+    return random.Random(2024)
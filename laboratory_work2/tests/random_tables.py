@@ -0,0 +1,17 @@
+"""
+Случайные частичные автоматы Мили для сравнения с полным перебором.
+"""
+
+
+def random_partial_mealy(rng, n_states, alphabet='ab', outputs='xy', dont_care=0.3):
+    """
+    Случайный частичный автомат: (states, table), где
+    table[state][symbol] = [приёмник, реакция], '-' - неопределённое значение.
+    """
+    states = [str(i) for i in range(1, n_states + 1)]
+
+    def cell(values):
+        return '-' if rng.random() < dont_care else rng.choice(values)
+
+    table = {s: {inp: [cell(states), cell(outputs)] for inp in alphabet} for s in states}
+    return states, table
@@ -0,0 +1,133 @@
+from collections import deque
+from itertools import combinations
+
+from compatibility import DONT_CARE, compatibility_matrix, implied_sets, iter_maximal_compatibles, prime_compatibles
+from random_tables import random_partial_mealy
+from set_cover import find_cover
+
+
+def compatible(table, alphabet, s0, s1):
+    """
+    Совместимость пары обходом пар состояний, достижимых из (s0, s1):
+    пара несовместима, если среди них есть пара с различными реакциями.
+    """
+    seen = {(s0, s1)}
+    queue = deque(seen)
+    while queue:
+        p, q = queue.popleft()
+        for inp in alphabet:
+            (dp, op), (dq, oq) = table[p][inp], table[q][inp]
+            if op != oq and DONT_CARE not in (op, oq):
+                return False
+            if dp != dq and DONT_CARE not in (dp, dq) and (dp, dq) not in seen:
+                seen.add((dp, dq))
+                queue.append((dp, dq))
+    return True
+
+
+def all_compatibles(states, bin_matrix):
+    return [set(block) for size in range(1, len(states) + 1) for block in combinations(states, size)
+            if all(bin_matrix[(min(a, b), max(a, b))] for a, b in combinations(block, 2))]
+
+
+def closed_cover_size(states, alphabet, table, blocks):
+    """
+    Размер минимального замкнутого покрытия из блоков blocks полным перебором.
+    """
+    implied = [implied_sets(block, alphabet, table) for block in blocks]
+    for size in range(1, len(states) + 1):
+        for chosen in combinations(range(len(blocks)), size):
+            if set().union(*(blocks[b] for b in chosen)) != set(states):
+                continue
+            if all(any(d <= blocks[c] for c in chosen) for b in chosen for d in implied[b]):
+                return size
+    return None
+
+
+def test_matrix_matches_pair_search(rng):
+    for _ in range(300):
+        alphabet = 'abc'[:rng.randint(1, 3)]
+        states, table = random_partial_mealy(rng, rng.randint(1, 10), alphabet)
+        bin_matrix = compatibility_matrix(states, alphabet, table)
+        assert set(bin_matrix) == {(min(a, b), max(a, b)) for a, b in combinations(states, 2)}
+        for (s0, s1), value in bin_matrix.items():
+            assert value == compatible(table, alphabet, s0, s1)
+
+
+def test_single_state_and_conflicting_pair():
+    table = {'1': {'a': ['1', 'x']}, '2': {'a': ['2', 'y']}}
+    assert compatibility_matrix(['1'], 'a', {'1': table['1']}) == {}
+    assert compatibility_matrix(['1', '2'], 'a', table) == {('1', '2'): 0}
+
+
+def test_empty_alphabet():
+    states = ['1', '2', '3']
+    bin_matrix = compatibility_matrix(states, (), {s: {} for s in states})
+    assert set(bin_matrix.values()) == {1}
+
+
+def test_maximal_compatibles_match_brute_force(rng):
+    for _ in range(300):
+        states, table = random_partial_mealy(rng, rng.randint(1, 9))
+        bin_matrix = compatibility_matrix(states, 'ab', table)
+        cliques = all_compatibles(states, bin_matrix)
+        expected = {frozenset(c) for c in cliques if not any(c < other for other in cliques)}
+        found = list(iter_maximal_compatibles(states, bin_matrix))
+        assert len(found) == len(expected)
+        assert {frozenset(block) for block in found} == expected
+        for block in found:
+            assert block == [s for s in states if s in block]
+
+
+def test_fully_specified_machine_has_disjoint_classes(rng):
+    # Для полностью определённого автомата совместимость - эквивалентность
+    for _ in range(50):
+        states, table = random_partial_mealy(rng, 7, dont_care=0)
+        found = list(iter_maximal_compatibles(states, compatibility_matrix(states, 'ab', table)))
+        assert sorted(s for block in found for s in block) == sorted(states)
+
+
+def test_maximal_compatibles_edge_cases():
+    assert list(iter_maximal_compatibles([], {})) == []
+    assert list(iter_maximal_compatibles(['1'], {})) == [['1']]
+    assert list(iter_maximal_compatibles(['1', '2'], {('1', '2'): 0})) == [['1'], ['2']]
+    assert list(iter_maximal_compatibles(['1', '2', '3'], {('1', '2'): 1, ('1', '3'): 1, ('2', '3'): 1})) \
+        == [['1', '2', '3']]
+
+
+def test_implied_sets():
+    table = {
+        '1': {'a': ['2', 'x'], 'b': ['1', '-']},
+        '2': {'a': ['3', '-'], 'b': ['-', 'y']},
+        '3': {'a': ['3', 'x'], 'b': ['2', 'y']},
+    }
+    assert implied_sets(['1', '2'], 'ab', table) == [{'2', '3'}]
+    # Множество, содержащееся в самом блоке, условий не создаёт
+    assert implied_sets(['2', '3'], 'ab', table) == []
+    assert implied_sets(['1'], 'ab', table) == []
+
+
+def test_closed_cover_among_primes_is_minimal(rng):
+    for _ in range(100):
+        states, table = random_partial_mealy(rng, rng.randint(1, 5), dont_care=0.4)
+        bin_matrix = compatibility_matrix(states, 'ab', table)
+        maximal = list(iter_maximal_compatibles(states, bin_matrix))
+        primes = prime_compatibles(states, 'ab', table, maximal)
+        compatibles = all_compatibles(states, bin_matrix)
+        assert all(prime in compatibles for prime in primes)
+        assert [len(p) for p in primes] == sorted((len(p) for p in primes), reverse=True)
+
+        index = {s: i for i, s in enumerate(states)}
+        masks = [sum(1 << index[s] for s in block) for block in primes]
+        implications = [[sum(1 << index[s] for s in d) for d in implied_sets(block, 'ab', table)]
+                        for block in primes]
+        result = find_cover((1 << len(states)) - 1, masks, implications)
+        assert result.optimal
+        assert len(result.blocks) == closed_cover_size(states, 'ab', table, compatibles)
+
+
+def test_prime_compatibles_limit(rng):
+    states, table = random_partial_mealy(rng, 8, dont_care=0.8)
+    maximal = list(iter_maximal_compatibles(states, compatibility_matrix(states, 'ab', table)))
+    assert prime_compatibles(states, 'ab', table, maximal, limit=0) is None
+    assert prime_compatibles(states, 'ab', table, maximal, limit=None) is not None
@@ -0,0 +1,101 @@
+from itertools import combinations
+
+import pytest
+
+from set_cover import STRATEGIES, find_cover
+
+
+def feasible(universe, masks, implications, chosen):
+    covered = 0
+    for b in chosen:
+        covered |= masks[b]
+    if universe & ~covered:
+        return False
+    return implications is None or all(any(d & ~masks[c] == 0 for c in chosen)
+                                       for b in chosen for d in implications[b])
+
+
+def minimum_cover(universe, masks, implications=None):
+    """
+    Размер минимального покрытия полным перебором или None.
+    """
+    for size in range(len(masks) + 1):
+        if any(feasible(universe, masks, implications, chosen) for chosen in combinations(range(len(masks)), size)):
+            return size
+    return None
+
+
+def random_instance(rng, closure):
+    n = rng.randint(1, 8)
+    universe = (1 << n) - 1
+    masks = [rng.randrange(1, 1 << n) for _ in range(rng.randint(1, 10))]
+    implications = None
+    if closure:
+        implications = [[rng.randrange(1, 1 << n) for _ in range(rng.randint(0, 2))] for _ in masks]
+    return universe, masks, implications
+
+
+@pytest.mark.parametrize("closure", [False, True])
+def test_exact_matches_brute_force(rng, closure):
+    for _ in range(300):
+        universe, masks, implications = random_instance(rng, closure)
+        expected = minimum_cover(universe, masks, implications)
+        result = find_cover(universe, masks, implications, 'exact')
+        assert result.optimal
+        if expected is None:
+            assert result.blocks is None
+            continue
+        assert len(result.blocks) == expected == result.lower_bound
+        assert result.gap == 0
+        assert feasible(universe, masks, implications, result.blocks)
+
+
+@pytest.mark.parametrize("strategy", [s for s in STRATEGIES if s != 'exact'])
+@pytest.mark.parametrize("closure", [False, True])
+def test_heuristics_are_feasible_and_bounded(rng, strategy, closure):
+    for _ in range(300):
+        universe, masks, implications = random_instance(rng, closure)
+        expected = minimum_cover(universe, masks, implications)
+        result = find_cover(universe, masks, implications, strategy)
+        if result.blocks is None:
+            continue
+        assert feasible(universe, masks, implications, result.blocks)
+        assert result.lower_bound <= expected <= len(result.blocks)
+        assert result.optimal == (len(result.blocks) == result.lower_bound)
+
+
+def test_essential_blocks(rng):
+    for _ in range(200):
+        universe, masks, _ = random_instance(rng, False)
+        result = find_cover(universe, masks)
+        for b in result.essential:
+            assert any(masks[b] >> e & 1 and not any(m >> e & 1 for c, m in enumerate(masks) if c != b)
+                       for e in range(universe.bit_length()))
+            if result.blocks is not None:
+                assert b in result.blocks
+
+
+def test_incomplete_candidates_never_claim_optimality():
+    result = find_cover(0b111, [0b011, 0b110, 0b100], complete=False)
+    assert result.blocks == [0, 1]
+    assert not result.optimal
+    assert result.lower_bound == 2
+
+
+def test_exact_search_runs_when_greedy_fails():
+    # Жадный выбор берёт самый большой блок 0, после чего условие замкнутости
+    # невыполнимо; покрытие из блоков 1 и 2 находит только точный поиск
+    masks = [0b0111, 0b0011, 0b1100, 0b1000, 0b0100]
+    implications = [[0b1001], [], [], [], []]
+    result = find_cover(0b1111, masks, implications, 'exact')
+    assert result.blocks == [1, 2]
+    assert result.optimal
+
+
+def test_edge_cases():
+    assert find_cover(0, []).blocks == []
+    assert find_cover(0b1, [0b1]).blocks == [0]
+    result = find_cover(0b11, [0b01])
+    assert result.blocks is None and result.gap is None
+    with pytest.raises(ValueError):
+        find_cover(0b1, [0b1], strategy='unknown')
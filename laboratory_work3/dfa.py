@@ -0,0 +1,268 @@
+"""Deterministic finite automata and output-sensitive word enumeration."""
+
+from __future__ import annotations
+
+import random
+from typing import Iterator, Sequence
+
+
+class DFA:
+    """Deterministic finite automaton over an ordered alphabet.
+
+    ``delta[q][i]`` is the successor of state ``q`` on ``alphabet[i]``, or
+    ``None`` when the transition leads to the (implicit) dead state.
+    Words are enumerated in the order of ``alphabet``.
+    """
+
+    def __init__(
+        self,
+        alphabet: Sequence[str],
+        delta: Sequence[Sequence[int | None]],
+        accepting: Sequence[bool],
+        start: int = 0,
+    ) -> None:
+        self.alphabet = tuple(alphabet)
+        self.delta = [tuple(row) for row in delta]
+        self.accepting = [bool(a) for a in accepting]
+        self.start = start
+        if len(self.delta) != len(self.accepting):
+            raise ValueError("delta and accepting must describe the same states")
+        if any(len(row) != len(self.alphabet) for row in self.delta):
+            raise ValueError("every state needs one transition slot per symbol")
+
+    @property
+    def n_states(self) -> int:
+        return len(self.delta)
+
+    def accepts(self, word: str) -> bool:
+        index = {a: i for i, a in enumerate(self.alphabet)}
+        q: int | None = self.start
+        for ch in word:
+            if ch not in index:
+                return False
+            q = self.delta[q][index[ch]]
+            if q is None:
+                return False
+        return self.accepting[q]
+
+    def trimmed(self) -> DFA:
+        """Equivalent DFA without unreachable states and states that cannot reach acceptance."""
+        reachable = {self.start}
+        stack = [self.start]
+        while stack:
+            for t in self.delta[stack.pop()]:
+                if t is not None and t not in reachable:
+                    reachable.add(t)
+                    stack.append(t)
+        predecessors: list[list[int]] = [[] for _ in self.delta]
+        for q in reachable:
+            for t in self.delta[q]:
+                if t is not None:
+                    predecessors[t].append(q)
+        useful = {q for q in reachable if self.accepting[q]}
+        stack = list(useful)
+        while stack:
+            for p in predecessors[stack.pop()]:
+                if p not in useful:
+                    useful.add(p)
+                    stack.append(p)
+        if self.start not in useful:
+            return DFA(self.alphabet, [[None] * len(self.alphabet)], [False])
+        order = [q for q in range(self.n_states) if q in useful]
+        renumber = {q: i for i, q in enumerate(order)}
+        return DFA(
+            self.alphabet,
+            [[renumber.get(t) for t in self.delta[q]] for q in order],
+            [self.accepting[q] for q in order],
+            renumber[self.start],
+        )
+
+    def live_table(self, max_len: int) -> list[list[bool]]:
+        """``live[k][q]`` tells whether some word of length ``k`` leads from ``q`` to acceptance."""
+        live = [list(self.accepting)]
+        for _ in range(max_len):
+            prev = live[-1]
+            live.append([any(t is not None and prev[t] for t in row) for row in self.delta])
+        return live
+
+    def transition_matrix(self) -> list[list[int]]:
+        """``m[q][t]`` is the number of symbols leading from ``q`` to ``t``."""
+        m = [[0] * self.n_states for _ in range(self.n_states)]
+        for q, row in enumerate(self.delta):
+            for t in row:
+                if t is not None:
+                    m[q][t] += 1
+        return m
+
+    def _step(self, counts: list[int]) -> list[int]:
+        return [sum(counts[t] for t in row if t is not None) for row in self.delta]
+
+    def count_vector(self, length: int) -> list[int]:
+        """``c[q]`` is the number of words of length ``length`` leading from ``q`` to acceptance.
+
+        Uses repeated squaring of the transition matrix, so the cost grows with
+        ``log(length)``; counts are exact Python integers.
+        """
+        counts = [int(a) for a in self.accepting]
+        power = self.transition_matrix()
+        while length:
+            if length & 1:
+                counts = _mat_vec(power, counts)
+            length >>= 1
+            if length:
+                power = _mat_mul(power, power)
+        return counts
+
+    def counts(self, min_len: int, max_len: int) -> Iterator[tuple[int, int]]:
+        """``(n, number of accepted words of length n)`` for ``n`` in ``min_len..max_len``."""
+        counts = self.count_vector(min_len)
+        for n in range(min_len, max_len + 1):
+            yield n, counts[self.start]
+            if n < max_len:
+                counts = self._step(counts)
+
+    def path_counts(self, max_len: int) -> list[list[int]]:
+        """``table[k][q]`` is the number of words of length ``k`` leading from ``q`` to acceptance."""
+        table = [[int(a) for a in self.accepting]]
+        for _ in range(max_len):
+            table.append(self._step(table[-1]))
+        return table
+
+    def random_words(self, length: int, count: int, rng: random.Random) -> Iterator[str]:
+        """``count`` independent words drawn uniformly among accepted words of length ``length``.
+
+        Each word costs ``O(length * len(alphabet))`` steps after the path-count table is built.
+        """
+        table = self.path_counts(length)
+        total = table[length][self.start]
+        if not total:
+            raise ValueError(f"the language has no words of length {length}")
+        for _ in range(count):
+            yield self._word_at(rng.randrange(total), length, table)
+
+    def _word_at(self, index: int, length: int, table: list[list[int]]) -> str:
+        # Descend from the start state: each symbol covers as many indices
+        # as it has accepted continuations of the remaining length.
+        q = self.start
+        word = []
+        for rest in range(length - 1, -1, -1):
+            for symbol, t in zip(self.alphabet, self.delta[q]):
+                if t is None:
+                    continue
+                if index < table[rest][t]:
+                    word.append(symbol)
+                    q = t
+                    break
+                index -= table[rest][t]
+        return "".join(word)
+
+    def first_rank(self, length: int) -> int:
+        """Rank of the first accepted word of length ``length`` (number of shorter accepted words)."""
+        counts = [int(a) for a in self.accepting]
+        total = 0
+        for _ in range(length):
+            total += counts[self.start]
+            counts = self._step(counts)
+        return total
+
+    def rank(self, word: str) -> int:
+        """Position of ``word`` among accepted words ordered by length, then lexicographically.
+
+        The empty word (if accepted) has rank 0.
+        """
+        if not self.accepts(word):
+            raise ValueError(f"{word!r} is not in the language")
+        n = len(word)
+        table = self.path_counts(n)
+        rank = sum(table[m][self.start] for m in range(n))
+        index = {a: i for i, a in enumerate(self.alphabet)}
+        q = self.start
+        for depth, ch in enumerate(word):
+            row = self.delta[q]
+            rest = table[n - depth - 1]
+            rank += sum(rest[t] for t in row[:index[ch]] if t is not None)
+            q = row[index[ch]]
+        return rank
+
+    def unrank(self, rank: int) -> str:
+        """Accepted word with the given rank (inverse of :meth:`rank`)."""
+        if rank < 0:
+            raise ValueError("rank must be non-negative")
+        table = [[int(a) for a in self.accepting]]
+        while rank >= table[-1][self.start]:
+            rank -= table[-1][self.start]
+            if not any(table[-1]):
+                # No words of this length from any state: none of any longer length either
+                raise ValueError("rank exceeds the number of words in the language")
+            table.append(self._step(table[-1]))
+        return self._word_at(rank, len(table) - 1, table)
+
+    def words_by_rank(self, start: int, stop: int) -> Iterator[str]:
+        """Accepted words with ranks ``start <= rank < stop``, in rank order."""
+        if stop <= start:
+            return
+        first = self.unrank(start)
+        last_len = len(self.unrank(stop - 1))
+        live = self.live_table(last_len)
+        index = {a: i for i, a in enumerate(self.alphabet)}
+        remaining = stop - start
+        resume = [index[ch] for ch in first]
+        for n in range(len(first), last_len + 1):
+            for word in self._words_of_length(n, live, resume):
+                yield word
+                remaining -= 1
+                if not remaining:
+                    return
+            resume = None
+
+    def words(self, min_len: int, max_len: int) -> Iterator[str]:
+        """Accepted words ordered by length, then lexicographically by alphabet order."""
+        live = self.live_table(max_len)
+        for n in range(min_len, max_len + 1):
+            yield from self._words_of_length(n, live)
+
+    def _words_of_length(self, n: int, live: list[list[bool]],
+                         resume: list[int] | None = None) -> Iterator[str]:
+        # Iterative DFS: a symbol is taken only if the remaining length can still
+        # reach acceptance, so every visited prefix extends to at least one word.
+        # ``resume`` (symbol indices of an accepted word of length n) restarts
+        # the search at that word.
+        if not live[n][self.start]:
+            return
+        alphabet, delta, k = self.alphabet, self.delta, len(self.alphabet)
+        word = [""] * n
+        path = [self.start] * (n + 1)
+        next_symbol = [0] * (n + 1)
+        depth = 0
+        if resume is not None:
+            for depth, i in enumerate(resume):
+                word[depth] = alphabet[i]
+                path[depth + 1] = delta[path[depth]][i]
+                next_symbol[depth] = i + 1
+            depth = n
+        while depth >= 0:
+            if depth == n:
+                yield "".join(word)
+                depth -= 1
+                continue
+            row, rest = delta[path[depth]], live[n - depth - 1]
+            i = next_symbol[depth]
+            while i < k and (row[i] is None or not rest[row[i]]):
+                i += 1
+            if i == k:
+                depth -= 1
+                continue
+            next_symbol[depth] = i + 1
+            word[depth] = alphabet[i]
+            path[depth + 1] = row[i]
+            next_symbol[depth + 1] = 0
+            depth += 1
+
+
+def _mat_mul(a: list[list[int]], b: list[list[int]]) -> list[list[int]]:
+    columns = list(zip(*b))
+    return [[sum(x * y for x, y in zip(row, col)) for col in columns] for row in a]
+
+
+def _mat_vec(a: list[list[int]], v: list[int]) -> list[int]:
+    return [sum(x * y for x, y in zip(row, v)) for row in a]
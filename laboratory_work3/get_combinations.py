@@ -3,27 +3,63 @@
 from __future__ import annotations
 
 import argparse
-import itertools
+import random
 import re
 import sys
 from typing import Iterator
 
+from dfa import DFA
+from regex_compiler import compile_regex
+
 # (c* | bc)(b | aa)*(a | b)
 PATTERN = re.compile(r'^(?:c*|bc)(?:b|aa)*(?:a|b)$')
 ALPHABET = "abc"
 
+# Minimal DFA of PATTERN; drives enumeration of the default language.
+LANGUAGE = compile_regex(PATTERN.pattern, ALPHABET)
+
+
+def words(min_len: int, max_len: int, dfa: DFA = LANGUAGE) -> Iterator[str]:
+    return dfa.words(min_len, max_len)
+
+
+def rank(word: str, dfa: DFA = LANGUAGE) -> int:
+    """Position of ``word`` in the order of :func:`words` started at length 0."""
+    return dfa.rank(word)
+
+
+def unrank(r: int, dfa: DFA = LANGUAGE) -> str:
+    return dfa.unrank(r)
+
 
-def words(min_len: int, max_len: int) -> Iterator[str]:
-    for n in range(min_len, max_len + 1):
-        for tup in itertools.product(ALPHABET, repeat=n):
-            s = "".join(tup)
-            if PATTERN.fullmatch(s):
-                yield s
+def parse_shard(text: str) -> tuple[int, int]:
+    try:
+        index, total = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, got {text!r}") from None
+    if total < 1 or not 0 <= index < total:
+        raise argparse.ArgumentTypeError(f"shard index must satisfy 0 <= I < N, got {text!r}")
+    return index, total
+
+
+def shard_ranks(dfa: DFA, min_len: int, max_len: int, shard: tuple[int, int],
+                start: int = 0) -> tuple[int, int]:
+    """Rank range of shard ``(i, n)`` of the words of lengths ``min_len..max_len``.
+
+    The serial range is split into ``n`` contiguous slices of near-equal size;
+    ``start`` skips that many words at the beginning of the slice.
+    """
+    first, end = dfa.first_rank(min_len), dfa.first_rank(max_len + 1)
+    index, total = shard
+    lo = first + (end - first) * index // total
+    hi = first + (end - first) * (index + 1) // total
+    return min(lo + start, hi), hi
 
 
 def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(
-        description="Generate words of the language (c*|bc)(b|aa)*(a|b) up to a maximum length."
+        description="Generate words of the language (c*|bc)(b|aa)*(a|b), or of any regular "
+                    "expression given with --regex, up to a maximum length."
     )
     parser.add_argument(
         "--min", type=int, default=1, metavar="M",
@@ -33,14 +69,83 @@ def main(argv: list[str] | None = None) -> None:
         "--max", type=int, default=20, metavar="N",
         help="maximum word length to generate (default: 20)",
     )
+    parser.add_argument(
+        "--regex", metavar="EXPR",
+        help="regular expression to enumerate instead of the built-in language "
+             "(symbols, concatenation, |, *, +, ?, parentheses)",
+    )
+    parser.add_argument(
+        "--alphabet", default=ALPHABET, metavar="SYMBOLS",
+        help=f"alphabet of --regex in enumeration order (default: {ALPHABET})",
+    )
+    parser.add_argument(
+        "--count", action="store_true",
+        help="print the number of words of each length instead of the words "
+             "(exact, fast even for very large lengths)",
+    )
+    parser.add_argument(
+        "--sample", type=int, metavar="K",
+        help="print K words drawn uniformly at random among the words of length --length",
+    )
+    parser.add_argument(
+        "--length", type=int, metavar="N",
+        help="word length for --sample",
+    )
+    parser.add_argument(
+        "--seed", type=int, metavar="S",
+        help="random seed for --sample (default: unpredictable)",
+    )
+    parser.add_argument(
+        "--shard", type=parse_shard, default=(0, 1), metavar="I/N",
+        help="print only slice I (0-based) of N equal contiguous slices of the output; "
+             "concatenating slices 0..N-1 gives the full output",
+    )
+    parser.add_argument(
+        "--start-rank", type=int, default=0, metavar="R",
+        help="skip the first R words of the (shard's) output, e.g. to resume an "
+             "interrupted run after R written lines",
+    )
     ns = parser.parse_args(argv)
 
     if ns.min < 1 or ns.max < ns.min:
         print("Invalid length range: --min must be >=1 and --max >= --min", file=sys.stderr)
         sys.exit(1)
 
-    for w in words(ns.min, ns.max):
-        print(w)
+    if ns.sample is not None and (ns.sample < 0 or ns.length is None or ns.length < 1 or ns.count):
+        print("Invalid sampling options: --sample K needs K >= 0, --length N >= 1 and no --count",
+              file=sys.stderr)
+        sys.exit(1)
+
+    ranged = ns.shard != (0, 1) or ns.start_rank
+    if ns.start_rank < 0 or (ranged and (ns.count or ns.sample is not None)):
+        print("Invalid options: --start-rank must be >= 0; --shard/--start-rank "
+              "cannot be combined with --count or --sample", file=sys.stderr)
+        sys.exit(1)
+
+    dfa = LANGUAGE
+    if ns.regex is not None:
+        try:
+            dfa = compile_regex(ns.regex, ns.alphabet)
+        except ValueError as e:
+            print(f"Invalid --regex: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    if ns.sample is not None:
+        try:
+            sys.stdout.writelines(w + "\n" for w in dfa.random_words(ns.length, ns.sample, random.Random(ns.seed)))
+        except ValueError as e:
+            print(f"Cannot sample: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif ns.count:
+        # Counts grow exponentially with length; print them in full
+        if hasattr(sys, "set_int_max_str_digits"):
+            sys.set_int_max_str_digits(0)
+        sys.stdout.writelines(f"{n} {c}\n" for n, c in dfa.counts(ns.min, ns.max))
+    elif ranged:
+        start, stop = shard_ranks(dfa, ns.min, ns.max, ns.shard, ns.start_rank)
+        sys.stdout.writelines(w + "\n" for w in dfa.words_by_rank(start, stop))
+    else:
+        sys.stdout.writelines(w + "\n" for w in words(ns.min, ns.max, dfa))
 
 
 if __name__ == "__main__":
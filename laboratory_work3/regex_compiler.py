@@ -0,0 +1,204 @@
+"""Compile regular expressions to minimal DFAs.
+
+Supported syntax: symbols of the alphabet, concatenation, ``|``, ``*``,
+``+``, ``?``, parentheses (``(?:`` is read as ``(``) and ``\\`` escapes.
+An empty alternative such as ``(a|)`` denotes the empty word. Leading ``^``
+and trailing ``$`` anchors are accepted and ignored, so Python patterns
+written for ``re.fullmatch`` compile unchanged; if ``^`` or ``$`` belongs
+to the alphabet, it is an ordinary symbol instead. Whitespace is ignored
+unless it belongs to the alphabet.
+
+The expression is turned into a Glushkov (position) automaton, which has no
+epsilon transitions, determinized by subset construction and minimized with
+the partition refinement engine of laboratory_work1.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import Sequence
+
+from dfa import DFA
+
+_LAB1 = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "laboratory_work1")
+if _LAB1 not in sys.path:
+    sys.path.append(_LAB1)
+
+from mealy_core import IntMealy  # noqa: E402
+from minimization import minimize_int  # noqa: E402
+
+_OPERATORS = set("|*+?()")
+
+
+class _Parser:
+    """Recursive-descent parser producing a small tuple-based syntax tree.
+
+    Nodes: ``("sym", position)``, ``("eps",)``, ``("alt", a, b)``,
+    ``("cat", a, b)``, ``("star", a)``, ``("plus", a)``, ``("opt", a)``.
+    ``symbols[position]`` is the alphabet index of each symbol occurrence.
+    """
+
+    def __init__(self, text: str, alphabet: Sequence[str]) -> None:
+        self.text = text
+        self.index = {a: i for i, a in enumerate(alphabet)}
+        self.alphabet = alphabet
+        # Anchors are only recognised when they cannot be read as symbols
+        self.anchors = {c for c in "^$" if c not in self.index}
+        self.pos = 0
+        self.symbols: list[int] = []
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"{message} at position {self.pos} in regex {self.text!r}")
+
+    def peek(self) -> str | None:
+        while self.pos < len(self.text) and self.text[self.pos].isspace() and self.text[self.pos] not in self.index:
+            self.pos += 1
+        return self.text[self.pos] if self.pos < len(self.text) else None
+
+    def parse(self) -> tuple:
+        if self.peek() == "^" and "^" in self.anchors:
+            self.pos += 1
+        tree = self.alternation()
+        if self.peek() == "$" and "$" in self.anchors:
+            self.pos += 1
+        if self.peek() is not None:
+            raise self.error(f"unexpected {self.text[self.pos]!r}")
+        return tree
+
+    def alternation(self) -> tuple:
+        tree = self.concatenation()
+        while self.peek() == "|":
+            self.pos += 1
+            tree = ("alt", tree, self.concatenation())
+        return tree
+
+    def concatenation(self) -> tuple:
+        tree = None
+        while self.peek() not in (None, "|", ")") and not (self.peek() == "$" and "$" in self.anchors):
+            item = self.repetition()
+            tree = item if tree is None else ("cat", tree, item)
+        return ("eps",) if tree is None else tree
+
+    def repetition(self) -> tuple:
+        tree = self.atom()
+        while self.peek() in ("*", "+", "?"):
+            tree = ({"*": "star", "+": "plus", "?": "opt"}[self.text[self.pos]], tree)
+            self.pos += 1
+        return tree
+
+    def atom(self) -> tuple:
+        ch = self.peek()
+        if ch == "(":
+            self.pos += 1
+            if self.text.startswith("?:", self.pos):
+                self.pos += 2
+            tree = self.alternation()
+            if self.peek() != ")":
+                raise self.error("missing ')'")
+            self.pos += 1
+            return tree
+        if ch == "\\":
+            self.pos += 1
+            if self.pos == len(self.text):
+                raise self.error("dangling escape")
+            ch = self.text[self.pos]
+        elif ch in _OPERATORS:
+            raise self.error(f"unexpected {ch!r}")
+        if ch not in self.index:
+            raise self.error(f"symbol {ch!r} is not in the alphabet {''.join(self.alphabet)!r}")
+        self.pos += 1
+        self.symbols.append(self.index[ch])
+        return ("sym", len(self.symbols) - 1)
+
+
+def _glushkov(tree: tuple, follow: list[set[int]]) -> tuple[bool, set[int], set[int]]:
+    """Return (nullable, first, last) of ``tree`` and fill ``follow`` in place."""
+    kind = tree[0]
+    if kind == "sym":
+        return False, {tree[1]}, {tree[1]}
+    if kind == "eps":
+        return True, set(), set()
+    if kind in ("alt", "cat"):
+        n1, f1, l1 = _glushkov(tree[1], follow)
+        n2, f2, l2 = _glushkov(tree[2], follow)
+        if kind == "alt":
+            return n1 or n2, f1 | f2, l1 | l2
+        for p in l1:
+            follow[p] |= f2
+        return n1 and n2, f1 | f2 if n1 else f1, l1 | l2 if n2 else l2
+    nullable, first, last = _glushkov(tree[1], follow)
+    if kind in ("star", "plus"):
+        for p in last:
+            follow[p] |= first
+    return nullable or kind != "plus", first, last
+
+
+def _determinize(symbols: list[int], k: int, nullable: bool, first: set[int],
+                 last: set[int], follow: list[set[int]]) -> tuple[list[list[int | None]], list[bool]]:
+    # NFA state 0 is the start, state p + 1 is "just read position p".
+    successors = [first] + follow
+    start = frozenset([0])
+    index = {start: 0}
+    subsets = [start]
+    delta: list[list[int | None]] = []
+    accepting: list[bool] = []
+    for subset in subsets:
+        accepting.append(any(q - 1 in last for q in subset if q) or (0 in subset and nullable))
+        targets: list[set[int]] = [set() for _ in range(k)]
+        for q in subset:
+            for p in successors[q]:
+                targets[symbols[p]].add(p + 1)
+        row: list[int | None] = []
+        for target in targets:
+            if not target:
+                row.append(None)
+                continue
+            key = frozenset(target)
+            if key not in index:
+                index[key] = len(subsets)
+                subsets.append(key)
+            row.append(index[key])
+        delta.append(row)
+    return delta, accepting
+
+
+def minimize_dfa(dfa: DFA) -> DFA:
+    """Minimal trimmed DFA for the language of ``dfa``.
+
+    The DFA is completed with a dead state and minimized as a Mealy machine
+    whose output on ``q --a--> t`` is ``(accepting[q], accepting[t])``;
+    for a non-empty alphabet this separates exactly the states with
+    different residual languages.
+    """
+    k, n = len(dfa.alphabet), dfa.n_states
+    dead = n
+    delta = [dead if t is None else t for row in dfa.delta for t in row] + [dead] * k
+    accepting = dfa.accepting + [False]
+    out = [2 * accepting[q] + accepting[delta[q * k + a]] for q in range(n + 1) for a in range(k)]
+    machine = IntMealy(range(n + 1), dfa.alphabet, range(4), delta, out, dfa.start)
+    min_machine, rep_of, _, _ = minimize_int(machine)
+    min_accepting = [False] * min_machine.n_states
+    for q, r in enumerate(rep_of):
+        min_accepting[r] = accepting[q]
+    return DFA(
+        dfa.alphabet,
+        [min_machine.delta[r * k:(r + 1) * k] for r in range(min_machine.n_states)],
+        min_accepting,
+        rep_of[dfa.start],
+    ).trimmed()
+
+
+def compile_regex(text: str, alphabet: Sequence[str]) -> DFA:
+    """Minimal DFA accepting exactly the words of ``alphabet`` matched by ``text``."""
+    alphabet = tuple(alphabet)
+    if not alphabet:
+        raise ValueError("alphabet must not be empty")
+    if any(len(a) != 1 for a in alphabet) or len(set(alphabet)) != len(alphabet):
+        raise ValueError(f"alphabet must consist of distinct single characters, got {alphabet!r}")
+    parser = _Parser(text, alphabet)
+    tree = parser.parse()
+    follow: list[set[int]] = [set() for _ in parser.symbols]
+    nullable, first, last = _glushkov(tree, follow)
+    delta, accepting = _determinize(parser.symbols, len(alphabet), nullable, first, last, follow)
+    return minimize_dfa(DFA(alphabet, delta, accepting))
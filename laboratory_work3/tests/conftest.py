@@ -0,0 +1,13 @@
+import os
+import random
+import sys
+
+import pytest
+
+# The lab modules are flat scripts that import each other as siblings
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+
+@pytest.fixture
+def rng() -> random.Random:
+    return random.Random(2024)
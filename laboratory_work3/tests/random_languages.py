@@ -0,0 +1,39 @@
+"""Random automata and expressions for comparisons with brute-force enumeration."""
+
+from __future__ import annotations
+
+import itertools
+import random
+from typing import Iterator
+
+from dfa import DFA
+
+
+def random_dfa(rng: random.Random, n_states: int, alphabet: str) -> DFA:
+    """DFA with random (possibly missing) transitions and accepting states."""
+    delta = [[rng.choice([None, *range(n_states)]) for _ in alphabet] for _ in range(n_states)]
+    return DFA(alphabet, delta, [rng.random() < 0.4 for _ in range(n_states)])
+
+
+def all_words(alphabet: str, max_len: int) -> Iterator[str]:
+    """Every word up to ``max_len`` by length, then in alphabet order."""
+    for n in range(max_len + 1):
+        for letters in itertools.product(alphabet, repeat=n):
+            yield "".join(letters)
+
+
+def brute_force(dfa: DFA, max_len: int) -> list[str]:
+    """Accepted words in enumeration order, by testing every word."""
+    return [w for w in all_words("".join(dfa.alphabet), max_len) if dfa.accepts(w)]
+
+
+def random_regex(rng: random.Random, alphabet: str, depth: int = 3) -> str:
+    """Random expression over ``alphabet`` in the syntax shared by ``re`` and ``compile_regex``."""
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(alphabet)
+    kind = rng.choice(["cat", "cat", "alt", "star", "plus", "opt"])
+    if kind == "cat":
+        return random_regex(rng, alphabet, depth - 1) + random_regex(rng, alphabet, depth - 1)
+    if kind == "alt":
+        return f"({random_regex(rng, alphabet, depth - 1)}|{random_regex(rng, alphabet, depth - 1)})"
+    return f"({random_regex(rng, alphabet, depth - 1)}){dict(star='*', plus='+', opt='?')[kind]}"
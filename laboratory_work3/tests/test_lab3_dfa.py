@@ -0,0 +1,105 @@
+import random
+from collections import Counter
+
+import pytest
+
+from dfa import DFA
+from random_languages import brute_force, random_dfa
+
+
+def test_words_match_brute_force(rng):
+    for _ in range(300):
+        dfa = random_dfa(rng, rng.randint(1, 6), rng.choice(["ab", "abc", "ba"]))
+        expected = brute_force(dfa, 6)
+        assert list(dfa.words(0, 6)) == expected
+        assert list(dfa.words(2, 4)) == [w for w in expected if 2 <= len(w) <= 4]
+
+
+def test_counts_match_enumeration(rng):
+    for _ in range(300):
+        dfa = random_dfa(rng, rng.randint(1, 6), rng.choice(["ab", "abc"]))
+        by_length = Counter(len(w) for w in brute_force(dfa, 6))
+        assert list(dfa.counts(0, 6)) == [(n, by_length[n]) for n in range(7)]
+        assert list(dfa.counts(3, 6)) == [(n, by_length[n]) for n in range(3, 7)]
+        assert [dfa.count_vector(n)[dfa.start] for n in range(7)] == [by_length[n] for n in range(7)]
+
+
+def test_large_counts_are_exact():
+    dfa = DFA("abc", [[0, 0, None]], [True])
+    assert dict(dfa.counts(1000, 1000)) == {1000: 2 ** 1000}
+
+
+def test_random_words_are_uniform():
+    dfa = DFA("ab", [[0, 1], [0, None]], [True, True])
+    words = list(dfa.words(6, 6))
+    draws = Counter(dfa.random_words(6, 200 * len(words), random.Random(7)))
+    assert set(draws) == set(words)
+    # Every word is expected 200 times; the bounds are far beyond chance deviations
+    assert all(120 < c < 280 for c in draws.values())
+
+
+def test_random_words_are_reproducible(rng):
+    for _ in range(100):
+        dfa = random_dfa(rng, rng.randint(1, 6), "abc")
+        length = rng.randint(1, 6)
+        if not dict(dfa.counts(length, length))[length]:
+            with pytest.raises(ValueError):
+                next(dfa.random_words(length, 1, random.Random(0)))
+            continue
+        first = list(dfa.random_words(length, 20, random.Random(1)))
+        assert first == list(dfa.random_words(length, 20, random.Random(1)))
+        assert all(len(w) == length and dfa.accepts(w) for w in first)
+
+
+def test_rank_and_unrank_are_inverse(rng):
+    for _ in range(200):
+        dfa = random_dfa(rng, rng.randint(1, 6), rng.choice(["ab", "abc", "ba"]))
+        expected = brute_force(dfa, 5)
+        for r, word in enumerate(expected):
+            assert dfa.rank(word) == r
+            assert dfa.unrank(r) == word
+        for n in range(6):
+            assert dfa.first_rank(n) == sum(len(w) < n for w in expected)
+
+
+def test_words_by_rank_slices(rng):
+    for _ in range(200):
+        dfa = random_dfa(rng, rng.randint(1, 6), "abc").trimmed()
+        expected = brute_force(dfa, 6)
+        start = rng.randint(0, len(expected))
+        stop = rng.randint(start, len(expected))
+        assert list(dfa.words_by_rank(start, stop)) == expected[start:stop]
+
+
+def test_finite_language_rank_overflow():
+    dfa = DFA("ab", [[1, 2], [None, None], [None, 1]], [False, True, False])
+    assert [dfa.unrank(r) for r in range(2)] == ["a", "bb"]
+    with pytest.raises(ValueError):
+        dfa.unrank(2)
+    with pytest.raises(ValueError):
+        dfa.rank("b")
+
+
+def test_empty_word_and_single_state():
+    dfa = DFA("ab", [[0, 0]], [True])
+    assert list(dfa.words(0, 0)) == [""]
+    assert list(dfa.counts(0, 0)) == [(0, 1)]
+    assert list(dfa.random_words(0, 3, random.Random(0))) == ["", "", ""]
+    assert list(dfa.words(2, 2)) == ["aa", "ab", "ba", "bb"]
+    assert dfa.rank("") == 0 and dfa.unrank(4) == "ab"
+    assert list(dfa.words_by_rank(3, 7)) == ["aa", "ab", "ba", "bb"]
+
+
+def test_empty_language():
+    dfa = DFA("ab", [[1, None], [1, 1]], [False, False])
+    assert list(dfa.words(0, 5)) == []
+    assert list(dfa.counts(0, 3)) == [(0, 0), (1, 0), (2, 0), (3, 0)]
+    with pytest.raises(ValueError):
+        dfa.unrank(0)
+
+
+def test_empty_alphabet():
+    dfa = DFA("", [[]], [True])
+    assert list(dfa.words(0, 3)) == [""]
+    assert list(dfa.counts(0, 2)) == [(0, 1), (1, 0), (2, 0)]
+    assert dfa.unrank(0) == ""
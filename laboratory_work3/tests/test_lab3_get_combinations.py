@@ -0,0 +1,88 @@
+import argparse
+import re
+
+import pytest
+
+import get_combinations
+from get_combinations import ALPHABET, LANGUAGE, PATTERN, main, parse_shard, shard_ranks
+from random_languages import all_words
+
+
+def run(capsys, *argv: str) -> list[str]:
+    main(list(argv))
+    return capsys.readouterr().out.splitlines()
+
+
+def test_default_language_matches_generate_and_filter():
+    expected = [w for w in all_words(ALPHABET, 8) if w and PATTERN.match(w)]
+    assert list(get_combinations.words(1, 8)) == expected
+
+
+def test_main_prints_the_words(capsys):
+    assert run(capsys, "--min", "2", "--max", "6") == list(get_combinations.words(2, 6))
+
+
+def test_rank_round_trip():
+    for r, word in enumerate(get_combinations.words(0, 8)):
+        assert get_combinations.rank(word) == r
+        assert get_combinations.unrank(r) == word
+
+
+@pytest.mark.parametrize("total", [1, 2, 3, 7])
+def test_shards_concatenate_to_serial_output(capsys, total):
+    serial = run(capsys, "--min", "2", "--max", "9")
+    sharded = []
+    for index in range(total):
+        sharded += run(capsys, "--min", "2", "--max", "9", "--shard", f"{index}/{total}")
+    assert sharded == serial
+
+
+def test_start_rank_resumes_a_shard(capsys):
+    shard = run(capsys, "--max", "9", "--shard", "1/3")
+    assert run(capsys, "--max", "9", "--shard", "1/3", "--start-rank", "5") == shard[5:]
+    assert run(capsys, "--max", "9", "--shard", "1/3", "--start-rank", str(10 ** 6)) == []
+
+
+def test_shard_ranks_cover_the_range():
+    first, end = LANGUAGE.first_rank(3), LANGUAGE.first_rank(13)
+    bounds = [shard_ranks(LANGUAGE, 3, 12, (i, 5)) for i in range(5)]
+    assert bounds[0][0] == first and bounds[-1][1] == end
+    assert all(hi == lo for (_, hi), (lo, _) in zip(bounds, bounds[1:]))
+
+
+@pytest.mark.parametrize("text", ["1", "a/b", "2/2", "-1/3", "0/0"])
+def test_parse_shard_errors(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_shard(text)
+
+
+def test_count_option(capsys):
+    assert run(capsys, "--count", "--min", "1", "--max", "8") == [
+        f"{n} {sum(len(w) == n for w in get_combinations.words(n, n))}" for n in range(1, 9)
+    ]
+
+
+def test_sample_option(capsys):
+    sample = run(capsys, "--sample", "5", "--length", "7", "--seed", "3")
+    assert len(sample) == 5 and all(len(w) == 7 and PATTERN.match(w) for w in sample)
+    assert run(capsys, "--sample", "5", "--length", "7", "--seed", "3") == sample
+
+
+def test_regex_option(capsys):
+    words = run(capsys, "--regex", "a(b|c)*", "--max", "3")
+    assert words == [w for w in all_words("abc", 3) if re.fullmatch("a(b|c)*", w)]
+
+
+@pytest.mark.parametrize("argv", [
+    ["--min", "0"],
+    ["--min", "5", "--max", "4"],
+    ["--regex", "(a"],
+    ["--sample", "3"],
+    ["--sample", "3", "--length", "4", "--count"],
+    ["--count", "--shard", "0/2"],
+    ["--start-rank", "-1"],
+    ["--regex", "a", "--alphabet", "aa"],
+])
+def test_invalid_options(capsys, argv):
+    with pytest.raises(SystemExit):
+        main(argv)
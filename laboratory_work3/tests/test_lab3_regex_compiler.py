@@ -0,0 +1,93 @@
+import re
+
+import pytest
+
+from dfa import DFA
+from random_languages import all_words, random_regex
+from regex_compiler import compile_regex, minimize_dfa
+
+
+def residual_signature(dfa: DFA, q: int, max_len: int) -> frozenset[str]:
+    start = DFA(dfa.alphabet, dfa.delta, dfa.accepting, q)
+    return frozenset(w for w in all_words("".join(dfa.alphabet), max_len) if start.accepts(w))
+
+
+def assert_minimal(dfa: DFA) -> None:
+    # In a DFA with n states, distinct residuals differ on a word shorter than n
+    signatures = {residual_signature(dfa, q, dfa.n_states) for q in range(dfa.n_states)}
+    if any(dfa.accepting):
+        assert len(signatures) == dfa.n_states
+        assert frozenset() not in signatures
+    assert dfa.trimmed().n_states == dfa.n_states
+
+
+@pytest.mark.parametrize("alphabet, max_len", [("ab", 7), ("abc", 5)])
+def test_matches_re(rng, alphabet, max_len):
+    for _ in range(150):
+        pattern = random_regex(rng, alphabet)
+        dfa = compile_regex(pattern, alphabet)
+        compiled = re.compile(pattern)
+        for word in all_words(alphabet, max_len):
+            assert dfa.accepts(word) == bool(compiled.fullmatch(word)), (pattern, word)
+        assert_minimal(dfa)
+
+
+def test_default_language_is_minimal():
+    dfa = compile_regex(r"^(?:c*|bc)(?:b|aa)*(?:a|b)$", "abc")
+    assert_minimal(dfa)
+    assert dfa.n_states == 6
+
+
+def test_minimize_dfa_merges_equivalent_states():
+    # States 0 and 2 are equivalent: both accept exactly a^n with odd n
+    dfa = DFA("ab", [[1, None], [2, None], [1, None]], [False, True, False])
+    minimal = minimize_dfa(dfa)
+    assert minimal.n_states == 2
+    assert [w for w in all_words("ab", 5) if minimal.accepts(w)] == ["a", "aaa", "aaaaa"]
+
+
+def test_unreachable_states_are_dropped():
+    dfa = DFA("a", [[0], [0], [1]], [True, True, False])
+    assert minimize_dfa(dfa).n_states == 1
+
+
+def test_syntax():
+    assert compile_regex(r"(?:a|)\*", "a*").accepts("*")
+    assert compile_regex("a b", "ab").accepts("ab")
+    assert compile_regex("a b", "ab ").accepts("a b")
+    assert compile_regex("()", "a").accepts("")
+    assert not compile_regex("()", "a").accepts("a")
+
+
+def test_anchors_in_alphabet_are_symbols():
+    assert [w for w in all_words("ab", 3) if compile_regex("^ab*$", "ab").accepts(w)] == ["a", "ab", "abb"]
+    dollar = compile_regex("a$", "a$")
+    assert dollar.accepts("a$") and not dollar.accepts("a")
+    caret = compile_regex("^a*", "^a")
+    assert caret.accepts("^aa") and not caret.accepts("aa")
+    both = compile_regex("^(a|$)*$", "a$^")
+    assert both.accepts("^a$$") and not both.accepts("a$")
+    with pytest.raises(ValueError):
+        compile_regex("a$b", "ab")
+
+
+@pytest.mark.parametrize("pattern", ["(a", "a)", "*a", "c", "a\\", "a|*"])
+def test_syntax_errors(pattern):
+    with pytest.raises(ValueError):
+        compile_regex(pattern, "ab")
+
+
+@pytest.mark.parametrize("alphabet", ["", ("ab",), "aa"])
+def test_invalid_alphabet(alphabet):
+    with pytest.raises(ValueError):
+        compile_regex("a", alphabet)
+
+
+def test_trimmed_drops_dead_and_unreachable_states():
+    # 1 is unreachable, 2 cannot reach acceptance
+    dfa = DFA("ab", [[0, 2], [0, 0], [2, 2]], [True, False, False])
+    trimmed = dfa.trimmed()
+    assert trimmed.n_states == 1
+    assert trimmed.delta == [(0, None)]
+    empty = DFA("ab", [[1, None], [1, 1]], [False, False]).trimmed()
+    assert empty.n_states == 1 and not any(empty.accepting)